@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import json
+import os
 import shutil
 import subprocess
 import sys
@@ -44,6 +45,13 @@ def get_if_should_use_git():
     return bool(get_cookiecutter_data().get("initialize_git", True))
 
 
+def get_if_offline():
+    """
+    Whether to skip the steps that need the network, as the render matrix of the template does.
+    """
+    return bool(os.environ.get("COOKIECUTTER_NEOPY_OFFLINE"))
+
+
 def remove_git_related_files():
     """
     Removes git related files from the project.
@@ -153,6 +161,11 @@ if __name__ == "__main__":
     else:
         print("Installing Poetry dependencies w/o git repository initialization...")
         remove_git_related_files()
+
+    if get_if_offline():
+        print("Offline, skipping the installation and validation of the project.")
+        sys.exit(0)
+
     poetry_install()
     if get_if_verification_required():
         pre_commit_install()
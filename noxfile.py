@@ -21,7 +21,7 @@ def prepare_release(session: Session) -> None:
         *[f"--label={label}" for label in labels],
         *session.posargs,
     ]
-    session.install("click", "github3.py")
+    session.install("click")
     session.run("python", "tools/prepare-github-release.py", *args, external=True)
 
 
@@ -29,10 +29,17 @@ def prepare_release(session: Session) -> None:
 def publish_release(session: Session) -> None:
     """Publish a GitHub release."""
     args = [f"--owner={owner}", f"--repository={repository}", *session.posargs]
-    session.install("click", "github3.py")
+    session.install("click")
     session.run("python", "tools/publish-github-release.py", *args, external=True)
 
 
+@nox.session(name="release-benchmark")
+def release_benchmark(session: Session) -> None:
+    """Prepare and publish a release against a fake GitHub API, and time both steps."""
+    session.install("click")
+    session.run("python", "tools/release-benchmark.py", *session.posargs, external=True)
+
+
 nox.options.sessions = ["linkcheck"]
 
 
@@ -58,20 +65,80 @@ def docs(session: Session) -> None:
 
 @nox.session
 def linkcheck(session: Session) -> None:
-    """Build the documentation."""
-    args = session.posargs or ["-b", "linkcheck", "-W", "--keep-going", "docs", "docs/_build"]
-
-    builddir = Path("docs", "_build")
-    if builddir.exists():
-        shutil.rmtree(builddir)
-
-    session.install("-r", "docs/requirements.txt")
-
-    session.run("sphinx-build", *args)
+    """Check the links of the documentation, e.g. ``-- check --changed=origin/main``.
+
+    Pass ``-- sphinx`` to run the slower, uncached link checker of Sphinx instead.
+    """
+    args = session.posargs or ["check"]
+    if args[0] == "sphinx":
+        session.install("-r", "docs/requirements.txt")
+        session.run(
+            "sphinx-build",
+            "-b",
+            "linkcheck",
+            *args[1:],
+            "docs",
+            "docs/_build/linkcheck",
+        )
+        return
+    session.install("click")
+    session.run("python", "tools/linkcheck.py", *args, external=True)
 
 
 @nox.session(name="dependencies-table")
 def dependencies_table(session: Session) -> None:
     """Print the dependencies table."""
-    session.install("tomli")
+    session.install("click", "tomli")
     session.run("python", "tools/dependencies-table.py", external=True)
+
+
+@nox.session
+def lockfile(session: Session) -> None:
+    """Query the lock file of the project template, e.g. ``-- rdeps click`` or ``-- benchmark``."""
+    args = session.posargs or ["--help"]
+    session.install("click", "tomli")
+    session.run("python", "tools/lockfile.py", *args, external=True)
+
+
+@nox.session(name="render-matrix")
+def render_matrix(session: Session) -> None:
+    """Render the template across its options, test and time each project.
+
+    Pass ``-- --full`` for every combination, and ``-- --update-snapshot`` after
+    changing the template on purpose.
+    """
+    session.install("click", "cookiecutter", "tomli")
+
+    # The rendered projects share their dependencies, so install them once, before their
+    # tests run offline. The tests need the locked versions of the CLI packages, and the
+    # projects compiled with mypyc the locked mypy.
+    tmp = Path(session.create_tmp())
+    constraints = session.run(
+        "python",
+        "tools/lockfile.py",
+        "constraints",
+        "click",
+        "typer",
+        "pytest",
+        "mypy",
+        silent=True,
+    )
+    (tmp / "constraints.txt").write_text(constraints)
+    session.run(
+        "cookiecutter",
+        "--no-input",
+        "--accept-hooks=no",
+        "--overwrite-if-exists",
+        f"--output-dir={tmp}",
+        ".",
+    )
+    session.install(
+        f"--constraint={tmp / 'constraints.txt'}",
+        str(tmp / "cookiecut"),
+        "pytest",
+        "mypy",
+        "poetry-core",
+        "setuptools",
+    )
+
+    session.run("python", "tools/render-matrix.py", *session.posargs)
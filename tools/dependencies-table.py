@@ -3,20 +3,19 @@ from pathlib import Path
 
 import tomli
 
+from lockfile import LockfileIndex
+from lockfile import canonicalize_name
+
 
 PROJECT = Path("{{cookiecutter.project_name}}")
 JINJA_PATTERN = re.compile(r"{%.*%}")
 JINJA_PATTERN2 = re.compile(r"{{[^{]*}}")
+# Unquoted values like ``line-length = {{...}}`` would not be valid TOML after substitution.
+JINJA_VALUE_PATTERN = re.compile(r"= {{[^{]*}}$", re.MULTILINE)
 LINE_FORMAT = "   {name:{width}} {description}"
-CANONICALIZE_PATTERN = re.compile(r"[-_.]+")
 DESCRIPTION_PATTERN = re.compile(r"\. .*")
 
 
-def canonicalize_name(name: str) -> str:
-    # From ``packaging.utils.canonicalize_name`` (PEP 503)
-    return CANONICALIZE_PATTERN.sub("-", name).lower()
-
-
 def truncate_description(description: str) -> str:
     """Truncate the description to the first sentence."""
     return DESCRIPTION_PATTERN.sub(".", description)
@@ -32,29 +31,41 @@ def main() -> None:
     path = PROJECT / "pyproject.toml"
     text = path.read_text()
     text = JINJA_PATTERN.sub("", text)
+    text = JINJA_VALUE_PATTERN.sub("= 0", text)
     text = JINJA_PATTERN2.sub("x", text)
     data = tomli.loads(text)
 
+    poetry = data["tool"]["poetry"]
+    sections = [
+        poetry.get("dependencies", {}),
+        poetry.get("dev-dependencies", {}),
+        *[group["dependencies"] for group in poetry.get("group", {}).values()],
+    ]
     dependencies = {
         canonicalize_name(dependency)
-        for section in ["dependencies", "dev-dependencies"]
-        for dependency in data["tool"]["poetry"][section].keys()
+        for section in sections
+        for dependency in section.keys()
         if dependency != "python"
     }
 
-    path = PROJECT / "poetry.lock"
-    text = path.read_text()
-    data = tomli.loads(text)
+    index = LockfileIndex.load(PROJECT / "poetry.lock")
+
+    missing = sorted(
+        dependency for dependency in dependencies if dependency not in index
+    )
+    if missing:
+        raise RuntimeError(
+            f"dependencies missing from poetry.lock: {', '.join(missing)}"
+        )
 
     descriptions = {
-        canonicalize_name(package["name"]): truncate_description(package["description"])
-        for package in data["package"]
-        if package["name"] in dependencies
+        dependency: truncate_description(index[dependency]["description"])
+        for dependency in dependencies
     }
 
     table = {
         format_dependency(dependency): descriptions[dependency]
-        for dependency in sorted(dependencies)
+        for dependency in sorted(descriptions)
     }
 
     width = max(len(name) for name in table)
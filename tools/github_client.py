@@ -0,0 +1,240 @@
+"""A small client for the GitHub REST API, shared by the release tools."""
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+
+T = TypeVar("T")
+
+API_URL = "https://api.github.com"
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "cookiecutter-neopy"
+    / "github"
+)
+NEXT_PATTERN = re.compile(r'<([^>]+)>;\s*rel="next"')
+HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "User-Agent": "cookiecutter-neopy-release",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+
+class GitHubError(RuntimeError):
+    """A request to the GitHub API failed."""
+
+    def __init__(self, method: str, url: str, status: int, message: str) -> None:
+        super().__init__(f"{method} {url}: {status} {message}")
+        self.status = status
+
+
+class GitHub:
+    """Sends requests to the GitHub API, revalidating cached responses with ETags.
+
+    GitHub answers a request carrying the ETag of a cached response with 304 Not
+    Modified if nothing changed, and such answers don't count against the rate limit.
+    Independent requests can be sent concurrently with :meth:`submit`.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        api_url: str = API_URL,
+        cache_dir: Optional[Path] = CACHE_DIR,
+        workers: int = 4,
+    ) -> None:
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        # Responses depend on who asks, like draft releases, so each token gets its own.
+        digest = hashlib.sha256(token.encode()).hexdigest()[:16]
+        self.cache_dir = cache_dir / digest if cache_dir else None
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+    def __enter__(self) -> "GitHub":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.executor.shutdown()
+
+    def url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        return f"{url}?{urllib.parse.urlencode(params)}" if params else url
+
+    def request(
+        self, method: str, url: str, body: Optional[Any] = None
+    ) -> Tuple[Any, Dict[str, str]]:
+        """Send a request, and return the decoded response and its Link header."""
+        headers = {**HEADERS, "Authorization": f"Bearer {self.token}"}
+        data = None if body is None else json.dumps(body).encode()
+        cache = None
+        cached = None
+
+        if method == "GET" and self.cache_dir is not None:
+            cache = self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+            if cache.exists():
+                cached = json.loads(cache.read_text())
+                headers["If-None-Match"] = cached["etag"]
+
+        request = urllib.request.Request(url, data=data, method=method, headers=headers)
+        with self.lock:
+            self.requests += 1
+
+        try:
+            with urllib.request.urlopen(request) as response:  # nosec
+                content = response.read()
+                etag = response.headers.get("ETag")
+                # Only pagination needs a header, so only that one is kept.
+                link = {"Link": response.headers.get("Link", "")}
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and cached is not None:
+                with self.lock:
+                    self.not_modified += 1
+                return cached["data"], cached["headers"]
+            try:
+                message = json.loads(error.read())["message"]
+            except (ValueError, KeyError):
+                message = error.reason
+            raise GitHubError(method, url, error.code, message) from None
+
+        result = json.loads(content) if content else None
+
+        if cache is not None and etag is not None:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            # Replace the file in one step, so an interrupted run can't corrupt it.
+            entry = {"etag": etag, "data": result, "headers": link}
+            temporary = cache.with_suffix(f".{threading.get_ident()}.tmp")
+            temporary.write_text(json.dumps(entry))
+            temporary.replace(cache)
+
+        return result, link
+
+    def get(self, path: str, **params: Any) -> Any:
+        return self.request("GET", self.url(path, params))[0]
+
+    def post(self, path: str, body: Any) -> Any:
+        return self.request("POST", self.url(path), body)[0]
+
+    def patch(self, path: str, body: Any) -> Any:
+        return self.request("PATCH", self.url(path), body)[0]
+
+    def put(self, path: str, body: Any) -> Any:
+        return self.request("PUT", self.url(path), body)[0]
+
+    def delete(self, path: str) -> None:
+        self.request("DELETE", self.url(path))
+
+    def paginate(
+        self, path: str, *, per_page: int = 100, **params: Any
+    ) -> Iterator[Any]:
+        """Yield the items of a listing, fetching the next page only when it's reached.
+
+        Stop iterating to stop fetching, so looking for an item near the start of a long
+        listing costs a single request.
+        """
+        url: Optional[str] = self.url(path, {**params, "per_page": per_page})
+        while url is not None:
+            items, headers = self.request("GET", url)
+            yield from items
+            match = NEXT_PATTERN.search(headers.get("Link", ""))
+            url = match.group(1) if match else None
+
+    def submit(
+        self, function: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> "Future[T]":
+        """Run a function in the background, to send independent requests at once."""
+        return self.executor.submit(function, *args, **kwargs)
+
+
+class Repository:
+    """The queries and changes the release tools make to a repository."""
+
+    def __init__(self, github: GitHub, owner: str, name: str) -> None:
+        self.github = github
+        self.owner = owner
+        self.path = f"/repos/{owner}/{name}"
+
+    def draft_release(self) -> Dict[str, Any]:
+        """Return the only draft release.
+
+        GitHub lists draft releases before published ones, so the search stops at the
+        first published release instead of reading the whole release history.
+        """
+        drafts = []
+        for release in self.github.paginate(f"{self.path}/releases", per_page=10):
+            if not release["draft"]:
+                break
+            drafts.append(release)
+
+        if len(drafts) != 1:
+            raise RuntimeError("there should be exactly one draft release")
+
+        return drafts[0]
+
+    def release_pull_request(self, branch: str) -> Dict[str, Any]:
+        """Return the only open pull request for a branch of the owner."""
+        head = f"{self.owner}:{branch}"
+        pulls = list(
+            islice(self.github.paginate(f"{self.path}/pulls", per_page=2, head=head), 2)
+        )
+
+        if len(pulls) != 1:
+            raise RuntimeError(f"there should be exactly one pull request for {head}")
+
+        # The listing lacks some details, like whether the pull request can be merged.
+        return self.pull_request(pulls[0]["number"])
+
+    def pull_request(self, number: int) -> Dict[str, Any]:
+        return self.github.get(f"{self.path}/pulls/{number}")
+
+    def create_pull_request(
+        self, *, title: str, base: str, head: str, body: str
+    ) -> Dict[str, Any]:
+        return self.github.post(
+            f"{self.path}/pulls",
+            {"title": title, "base": base, "head": head, "body": body},
+        )
+
+    def add_labels(self, number: int, names: List[str]) -> List[str]:
+        """Label an issue or pull request, and return all of its labels."""
+        labels = self.github.post(
+            f"{self.path}/issues/{number}/labels", {"labels": names}
+        )
+        return [label["name"] for label in labels]
+
+    def commit_state(self, sha: str) -> str:
+        """Return the combined state of the checks of a commit, like ``success``."""
+        return self.github.get(f"{self.path}/commits/{sha}/status")["state"]
+
+    def merge(self, number: int, *, title: str, method: str = "squash") -> bool:
+        result = self.github.put(
+            f"{self.path}/pulls/{number}/merge",
+            {"commit_title": title, "merge_method": method},
+        )
+        return bool(result["merged"])
+
+    def delete_branch(self, branch: str) -> None:
+        self.github.delete(f"{self.path}/git/refs/heads/{branch}")
+
+    def edit_release(self, release_id: int, **fields: Any) -> Dict[str, Any]:
+        return self.github.patch(f"{self.path}/releases/{release_id}", fields)
@@ -0,0 +1,415 @@
+"""Check the external links of the documentation, caching the results between runs.
+
+Links are found by scanning the Markdown sources for URLs, without building the
+documentation. Unlike ``sphinx-build -b linkcheck``, this doesn't check the intersphinx
+inventories, URLs that MyST substitutions or roles produce, or the ``#fragment`` anchors
+of the pages it fetches. Run ``nox --session=linkcheck -- sphinx`` for Sphinx's own,
+uncached check.
+"""
+import hashlib
+import http.server
+import json
+import os
+import re
+import runpy
+import subprocess  # nosec
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from itertools import zip_longest
+from pathlib import Path
+from typing import Any
+from typing import DefaultDict
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import click
+
+
+# The sources of the documentation, including the files it includes.
+DOCUMENTS = ["README.md", "CONTRIBUTING.md", "CODE_OF_CONDUCT.md", "docs"]
+SPHINX_CONFIG = Path("docs") / "conf.py"
+CACHE = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "cookiecutter-neopy"
+    / "linkcheck.json"
+)
+URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]{}\"'`]+")
+USER_AGENT = "cookiecutter-neopy-linkcheck/1.0"
+DAY = 24 * 60 * 60
+# How long a result stays fresh. Broken links and transient errors aren't cached, so
+# they're checked again on every run until they're fixed.
+TTLS = {"ok": 7 * DAY, "redirected": 1 * DAY}
+# Bump this when the layout of the cache changes.
+CACHE_FORMAT = 1
+
+
+def find_links(paths: Iterable[Path]) -> Dict[str, List[str]]:
+    """Map every external URL in the given files to where it appears, as file:line."""
+    links: DefaultDict[str, List[str]] = defaultdict(list)
+
+    for path in paths:
+        for number, line in enumerate(path.read_text().splitlines(), 1):
+            for match in URL_PATTERN.finditer(line):
+                url = match.group().rstrip(".,;:!?*_")
+                links[url].append(f"{path}:{number}")
+
+    return dict(links)
+
+
+def documents(changed_since: Optional[str] = None) -> List[Path]:
+    """Return the sources of the documentation, or those changed since a git revision."""
+    paths = sorted(
+        chain.from_iterable(
+            Path(name).rglob("*.md") if Path(name).is_dir() else [Path(name)]
+            for name in DOCUMENTS
+        )
+    )
+    if changed_since is None:
+        return paths
+
+    def git(*args: str) -> List[str]:
+        output = subprocess.run(  # nosec
+            ["git", *args], check=True, capture_output=True, text=True
+        ).stdout
+        return output.splitlines()
+
+    changed = {
+        Path(name)
+        for name in git("diff", "--name-only", changed_since, "--")
+        + git("ls-files", "--others", "--exclude-standard")
+    }
+    return [path for path in paths if path in changed]
+
+
+def ignore_patterns(config: Path = SPHINX_CONFIG) -> List["re.Pattern[str]"]:
+    """Return the URLs the Sphinx configuration excludes from link checking."""
+    if not config.exists():
+        return []
+    return [
+        re.compile(pattern)
+        for pattern in runpy.run_path(str(config)).get("linkcheck_ignore", [])
+    ]
+
+
+def ttl(url: str, outcome: str) -> float:
+    """Return how long a result stays fresh, or zero if it mustn't be cached.
+
+    The time varies between half and one and a half times the one configured for the
+    outcome, depending on the URL, so links checked together don't expire together.
+    """
+    spread = int(hashlib.sha256(url.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return TTLS.get(outcome, 0) * (0.5 + spread)
+
+
+def check(url: str, timeout: float) -> Dict[str, Any]:
+    """Request a URL, trying HEAD and falling back to GET like Sphinx does."""
+    result: Dict[str, Any] = {"checked": time.time()}
+    target = urllib.parse.urldefrag(url).url
+
+    for method in ["HEAD", "GET"]:
+        request = urllib.request.Request(
+            target, method=method, headers={"User-Agent": USER_AGENT}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:  # nosec
+                result["code"] = response.status
+                final = response.geturl()
+        except urllib.error.HTTPError as error:
+            result["code"] = error.code
+            if method == "HEAD":
+                continue
+            transient = error.code == 429 or error.code >= 500
+            result.update(
+                outcome="error" if transient else "broken", detail=error.reason
+            )
+        except (urllib.error.URLError, OSError) as error:
+            reason = getattr(error, "reason", error)
+            result.update(outcome="error", detail=str(reason))
+        else:
+            if final != target:
+                result.update(outcome="redirected", detail=final)
+            else:
+                result["outcome"] = "ok"
+        break
+
+    result["expires"] = result["checked"] + ttl(url, result["outcome"])
+    return result
+
+
+class LinkCache:
+    """Results of earlier link checks, kept in a JSON file until they expire."""
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+        if path is not None and path.exists():
+            data = json.loads(path.read_text())
+            if data.get("format") == CACHE_FORMAT:
+                self.results = data["results"]
+
+    def get(self, url: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a URL, unless it expired."""
+        result = self.results.get(url)
+        return result if result is not None and result["expires"] > now else None
+
+    def save(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """Store the cacheable results, dropping the expired ones."""
+        now = time.time()
+        self.results.update(results)
+        self.results = {
+            url: result
+            for url, result in self.results.items()
+            if result["expires"] > now
+        }
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Replace the file in one step, so an interrupted run can't corrupt it.
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps({"format": CACHE_FORMAT, "results": self.results})
+        )
+        temporary.replace(self.path)
+
+
+class LinkChecker:
+    """Checks URLs concurrently, but only a few at a time per host."""
+
+    def __init__(
+        self,
+        cache: LinkCache,
+        workers: int = 16,
+        per_host: int = 2,
+        timeout: float = 30,
+    ) -> None:
+        self.cache = cache
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.hits = 0
+        self.requests = 0
+
+    def run(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Check the URLs that have no fresh result in the cache, and update it."""
+        now = time.time()
+        results: Dict[str, Dict[str, Any]] = {}
+        by_host: DefaultDict[str, List[str]] = defaultdict(list)
+
+        for url in urls:
+            cached = self.cache.get(url, now)
+            if cached is not None:
+                results[url] = cached
+                self.hits += 1
+            else:
+                by_host[urllib.parse.urlsplit(url).netloc].append(url)
+
+        # Alternate between hosts, so workers rarely wait for a host's semaphore while
+        # URLs of other hosts are pending.
+        semaphores = {host: threading.Semaphore(self.per_host) for host in by_host}
+        pending = [
+            url
+            for urls in zip_longest(*by_host.values())
+            for url in urls
+            if url is not None
+        ]
+
+        def check_limited(url: str) -> Tuple[str, Dict[str, Any]]:
+            with semaphores[urllib.parse.urlsplit(url).netloc]:
+                return url, check(url, self.timeout)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            checked = dict(executor.map(check_limited, pending))
+
+        self.requests += len(checked)
+        results.update(checked)
+        self.cache.save(
+            {url: result for url, result in checked.items() if result["expires"] > now}
+        )
+        return results
+
+
+def report(links: Dict[str, List[str]], results: Dict[str, Dict[str, Any]]) -> int:
+    """Print the links that aren't ok, and return how many are broken."""
+    broken = 0
+
+    for url in sorted(links):
+        result = results[url]
+        if result["outcome"] == "ok":
+            continue
+        for place in links[url]:
+            detail = f" - {result['detail']}" if result.get("detail") else ""
+            code = f" {result['code']}" if result.get("code") else ""
+            click.echo(f"{place}: {result['outcome']}{code} {url}{detail}")
+        broken += result["outcome"] in ("broken", "error")
+
+    return broken
+
+
+@click.group()
+def main() -> None:
+    """Check the external links of the documentation."""
+
+
+@main.command(name="check")
+@click.option(
+    "--changed",
+    metavar="REVISION",
+    help="only check the documents changed since this git revision, like origin/main",
+)
+@click.option("--workers", default=16, show_default=True, help="requests in flight")
+@click.option(
+    "--per-host", default=2, show_default=True, help="requests in flight per host"
+)
+@click.option("--timeout", default=30.0, show_default=True, help="seconds per request")
+@click.option("--refresh", is_flag=True, help="ignore cached results")
+@click.option(
+    "--cache",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=CACHE,
+    show_default=True,
+    help="file to keep results in",
+)
+def check_command(
+    changed: Optional[str],
+    workers: int,
+    per_host: int,
+    timeout: float,
+    refresh: bool,
+    cache: Path,
+) -> None:
+    """Check every external link, or those in changed documents, with cached results."""
+    start = time.perf_counter()
+    ignored = ignore_patterns()
+    links = {
+        url: places
+        for url, places in find_links(documents(changed)).items()
+        if not any(pattern.match(url) for pattern in ignored)
+    }
+
+    link_cache = LinkCache(cache)
+    if refresh:
+        link_cache.results.clear()
+    checker = LinkChecker(
+        link_cache, workers=workers, per_host=per_host, timeout=timeout
+    )
+    broken = report(links, checker.run(links))
+
+    elapsed = time.perf_counter() - start
+    click.echo(
+        f"{len(links)} links, {checker.hits} cached, {checker.requests} checked,"
+        f" {broken} broken in {elapsed:.1f}s",
+        err=True,
+    )
+    if broken:
+        raise click.ClickException(f"{broken} broken links")
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the pages of the benchmark, counting concurrent requests per host."""
+
+    latency = 0.05
+    lock = threading.Lock()
+    in_flight: DefaultDict[str, int] = defaultdict(int)
+    peak: DefaultDict[str, int] = defaultdict(int)
+    requests = 0
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        host = self.headers["Host"]
+        with self.lock:
+            type(self).requests += 1
+            self.in_flight[host] += 1
+            self.peak[host] = max(self.peak[host], self.in_flight[host])
+        try:
+            time.sleep(self.latency)
+            if self.path.startswith("/ok/"):
+                self.send_response(200)
+            elif self.path == "/moved":
+                self.send_response(301)
+                self.send_header("Location", "/ok/moved")
+            elif self.path == "/no-head" and self.command == "HEAD":
+                self.send_response(405)
+            elif self.path == "/no-head":
+                self.send_response(200)
+            else:
+                self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+
+    do_GET = do_HEAD  # noqa: N815
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def benchmark(pages: int, per_host: int, latency: float) -> None:
+    """Check links against a local stand-in server, without and then with the cache."""
+    StandInHandler.latency = latency
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    # Two names for the server, to check that each host gets its own limit.
+    hosts = [f"127.0.0.1:{port}", f"localhost:{port}"]
+    urls = [f"http://{host}/ok/{number}" for host in hosts for number in range(pages)]
+    urls += [f"http://{hosts[0]}/{path}" for path in ["moved", "no-head", "missing"]]
+    expected = {"moved": "redirected", "no-head": "ok", "missing": "broken"}
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = Path(directory) / "linkcheck.json"
+            for label in ["cold cache", "warm cache"]:
+                StandInHandler.requests = 0
+                StandInHandler.peak.clear()
+                checker = LinkChecker(LinkCache(cache), per_host=per_host)
+                start = time.perf_counter()
+                results = checker.run(urls)
+                elapsed = time.perf_counter() - start
+                peak = max(StandInHandler.peak.values(), default=0)
+                requests = StandInHandler.requests
+                click.echo(
+                    f"{label:12} {elapsed * 1000:8.1f} ms, {requests} requests,"
+                    f" at most {peak} in flight per host"
+                )
+                if peak > per_host:
+                    raise click.ClickException(f"{peak} requests in flight to one host")
+                for url, result in results.items():
+                    outcome = expected.get(url.rsplit("/", 1)[1], "ok")
+                    if result["outcome"] != outcome:
+                        raise click.ClickException(
+                            f"{url}: {result['outcome']} != {outcome}"
+                        )
+            # Only the broken link is requested again, with HEAD and then GET.
+            if StandInHandler.requests != 2:
+                raise click.ClickException("the warm run didn't use the cache")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@main.command(name="benchmark")
+@click.option("--pages", default=50, show_default=True, help="links per host")
+@click.option(
+    "--per-host", default=4, show_default=True, help="requests in flight per host"
+)
+@click.option("--latency", default=0.05, show_default=True, help="seconds per response")
+def benchmark_command(pages: int, per_host: int, latency: float) -> None:
+    """Time checking links served locally, and verify the cache and the host limits."""
+    benchmark(pages, per_host, latency)
+
+
+if __name__ == "__main__":
+    main(prog_name="linkcheck")
@@ -0,0 +1,232 @@
+"""Name-keyed index of a poetry.lock file, cached on disk by file hash."""
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.request
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+
+import click
+import tomli
+
+
+LOCKFILE = Path("{{cookiecutter.project_name}}") / "poetry.lock"
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "cookiecutter-neopy"
+    / "lockfile"
+)
+CANONICALIZE_PATTERN = re.compile(r"[-_.]+")
+PYPI_URL = "https://pypi.org/pypi/{name}/{version}/json"
+# Bump this when the layout of the cached index changes.
+INDEX_FORMAT = 1
+
+
+def canonicalize_name(name: str) -> str:
+    # From ``packaging.utils.canonicalize_name`` (PEP 503)
+    return CANONICALIZE_PATTERN.sub("-", name).lower()
+
+
+def build_index(text: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the lock file into a dictionary keyed by canonical package name."""
+    data = tomli.loads(text)
+    index = {
+        canonicalize_name(package["name"]): {
+            "name": package["name"],
+            "version": package["version"],
+            "description": package.get("description", ""),
+            "dependencies": sorted(
+                canonicalize_name(dependency)
+                for dependency in package.get("dependencies", {})
+            ),
+            "files": [file["file"] for file in package.get("files", [])],
+            "required_by": [],
+        }
+        for package in data["package"]
+    }
+
+    for name, package in index.items():
+        for dependency in package["dependencies"]:
+            if dependency in index:
+                index[dependency]["required_by"].append(name)
+
+    return index
+
+
+class LockfileIndex:
+    """Queries against a poetry.lock file."""
+
+    def __init__(self, packages: Dict[str, Dict[str, Any]]) -> None:
+        self.packages = packages
+
+    @classmethod
+    def load(
+        cls, path: Path = LOCKFILE, cache_dir: Optional[Path] = CACHE_DIR
+    ) -> "LockfileIndex":
+        """Load the index, parsing the lock file only if it changed since the last run."""
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        cache = cache_dir / f"{digest}-v{INDEX_FORMAT}.json" if cache_dir else None
+
+        if cache is not None and cache.exists():
+            return cls(json.loads(cache.read_text()))
+
+        packages = build_index(content.decode())
+
+        if cache is not None:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            cache.write_text(json.dumps(packages))
+
+        return cls(packages)
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self.packages
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self.packages[canonicalize_name(name)]
+
+    def reverse_dependencies(self, name: str) -> List[str]:
+        """Return the packages that depend directly on the given package."""
+        return sorted(self[name]["required_by"])
+
+    def transitive_closure(self, names: Iterable[str]) -> Set[str]:
+        """Return the given packages and everything they depend on, directly or not."""
+        queue = deque(canonicalize_name(name) for name in names)
+        closure: Set[str] = set()
+
+        while queue:
+            name = queue.popleft()
+            if name in closure or name not in self.packages:
+                continue
+            closure.add(name)
+            queue.extend(self.packages[name]["dependencies"])
+
+        return closure
+
+    def download_size(self, name: str, cache_dir: Optional[Path] = CACHE_DIR) -> int:
+        """Return the size of the file pip would most likely download for a package.
+
+        The lock file doesn't record sizes, so they are looked up on PyPI. Released
+        files never change, so the answer is cached per name and version.
+        """
+        package = self[name]
+        key = f"{canonicalize_name(name)}-{package['version']}"
+        cache = cache_dir / "sizes" / f"{key}.json" if cache_dir else None
+
+        if cache is not None and cache.exists():
+            sizes = json.loads(cache.read_text())
+        else:
+            url = PYPI_URL.format(name=package["name"], version=package["version"])
+            with urllib.request.urlopen(url) as response:  # nosec
+                release = json.load(response)
+            sizes = {file["filename"]: file["size"] for file in release["urls"]}
+            if cache is not None:
+                cache.parent.mkdir(parents=True, exist_ok=True)
+                cache.write_text(json.dumps(sizes))
+
+        files = [file for file in package["files"] if file in sizes]
+        preferred = [file for file in files if file.endswith("-none-any.whl")]
+        return sizes[(preferred or files)[0]] if files else 0
+
+    def install_size(self, names: Iterable[str]) -> int:
+        """Return the total download size of the given packages and their dependencies."""
+        return sum(self.download_size(name) for name in self.transitive_closure(names))
+
+
+def benchmark(path: Path, repeat: int) -> None:
+    """Compare reparsing and linearly scanning the lock file with the cached index."""
+    text = path.read_text()
+    names = [package["name"] for package in tomli.loads(text)["package"]]
+
+    def parse_and_scan() -> None:
+        data = tomli.loads(text)
+        for name in names:
+            next(package for package in data["package"] if package["name"] == name)
+
+    def load_and_lookup() -> None:
+        index = LockfileIndex.load(path)
+        for name in names:
+            index[name]
+
+    LockfileIndex.load(path)  # warm the cache
+
+    for label, function in [
+        ("parse + linear scan", parse_and_scan),
+        ("cached index + lookup", load_and_lookup),
+    ]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = (time.perf_counter() - start) / repeat
+        click.echo(f"{label:24} {elapsed * 1000:8.2f} ms per run ({len(names)} lookups)")
+
+
+@click.group()
+@click.option(
+    "--lockfile",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=LOCKFILE,
+    show_default=True,
+    help="poetry.lock file to index",
+)
+@click.pass_context
+def main(context: click.Context, lockfile: Path) -> None:
+    """Query the poetry.lock file of the project template."""
+    context.obj = lockfile
+
+
+@main.command(name="rdeps")
+@click.argument("name")
+@click.pass_obj
+def rdeps(lockfile: Path, name: str) -> None:
+    """List the packages that depend directly on NAME."""
+    for dependent in LockfileIndex.load(lockfile).reverse_dependencies(name):
+        click.echo(dependent)
+
+
+@main.command()
+@click.argument("names", nargs=-1, required=True)
+@click.pass_obj
+def closure(lockfile: Path, names: List[str]) -> None:
+    """List NAMES and all of their dependencies."""
+    for name in sorted(LockfileIndex.load(lockfile).transitive_closure(names)):
+        click.echo(name)
+
+
+@main.command()
+@click.argument("names", nargs=-1, required=True)
+@click.pass_obj
+def size(lockfile: Path, names: List[str]) -> None:
+    """Print the total download size of NAMES and all of their dependencies."""
+    total = LockfileIndex.load(lockfile).install_size(names)
+    click.echo(f"{total / 1024 / 1024:.1f} MiB")
+
+
+@main.command()
+@click.argument("names", nargs=-1)
+@click.pass_obj
+def constraints(lockfile: Path, names: List[str]) -> None:
+    """Print the locked versions of NAMES, or of every package, as pip constraints."""
+    index = LockfileIndex.load(lockfile)
+    for package in [index[name] for name in names] or index.packages.values():
+        click.echo(f"{package['name']}=={package['version']}")
+
+
+@main.command(name="benchmark")
+@click.option("--repeat", default=20, show_default=True, help="runs per measurement")
+@click.pass_obj
+def benchmark_command(lockfile: Path, repeat: int) -> None:
+    """Time lookups of every package with and without the cached index."""
+    benchmark(lockfile, repeat)
+
+
+if __name__ == "__main__":
+    main(prog_name="lockfile")
@@ -8,7 +8,9 @@ from typing import List
 from typing import Optional
 
 import click
-import github3
+from github_client import API_URL
+from github_client import GitHub
+from github_client import Repository
 
 
 def git(*args: str, **kwargs: Any) -> str:
@@ -39,47 +41,48 @@ def prepare_release(
     base: str,
     bump_paths: List[Path],
     label_names: List[str],
+    api_url: str = API_URL,
 ) -> None:
     branch = f"release-{tag}"
     title = f"Release {tag}"
     oldtag = git("describe", "--tags", "--abbrev=0").strip()
 
-    git("switch", f"--create={branch}", base)
+    with GitHub(token, api_url=api_url) as github:
+        repository = Repository(github, owner, repository_name)
+        # Look up the release notes while the branch is committed and pushed.
+        draft = github.submit(repository.draft_release)
 
-    for path in bump_paths:
-        replace_text(path, oldtag, tag)
-        git("add", str(path))
+        git("switch", f"--create={branch}", base)
 
-    git("commit", f"--message={title}")
-    git("push", "--set-upstream", remote, branch)
+        for path in bump_paths:
+            replace_text(path, oldtag, tag)
+            git("add", str(path))
 
-    click.echo(f"pushed {branch}")
+        git("commit", f"--message={title}")
+        git("push", "--set-upstream", remote, branch)
 
-    github = github3.login(token=token)
-    repository = github.repository(owner, repository_name)
+        click.echo(f"pushed {branch}")
 
-    try:
-        [release] = [release for release in repository.releases() if release.draft]
-    except ValueError:
-        raise RuntimeError("there should be exactly one draft release")
+        pull_request = repository.create_pull_request(
+            title=title,
+            base=base,
+            head=f"{owner}:{branch}",
+            body=draft.result()["body"],
+        )
+        number = pull_request["number"]
 
-    pull_request = repository.create_pull(
-        title=title,
-        base=base,
-        head=f"{owner}:{branch}",
-        body=release.body,
-    )
+        click.echo(f"opened #{number}")
 
-    click.echo(f"opened #{pull_request.number}")
+        if not label_names:
+            return
 
-    pull_request = repository.pull_request(pull_request.number)
-    labels = pull_request.issue().add_labels(*label_names)
+        labels = repository.add_labels(number, label_names)
 
-    for name in label_names:
-        if name not in {label.name for label in labels}:
-            raise RuntimeError(f"label {name} missing from #{pull_request.number}")
+        for name in label_names:
+            if name not in labels:
+                raise RuntimeError(f"label {name} missing from #{number}")
 
-    click.echo(f"added labels {', '.join(label_names)} to #{pull_request.number}")
+        click.echo(f"added labels {', '.join(label_names)} to #{number}")
 
 
 @click.command()
@@ -104,6 +107,14 @@ def prepare_release(
     envvar="GITHUB_TOKEN",
     help="GitHub API token",
 )
+@click.option(
+    "--api-url",
+    metavar="URL",
+    default=API_URL,
+    envvar="GITHUB_API_URL",
+    show_default=True,
+    help="GitHub API endpoint",
+)
 @click.option(
     "--remote",
     metavar="REMOTE",
@@ -134,6 +145,7 @@ def main(
     owner: str,
     repository: str,
     token: str,
+    api_url: str,
     remote: str,
     base: str,
     bump: Iterable[str],
@@ -158,6 +170,7 @@ def main(
             owner=owner,
             repository_name=repository,
             token=token,
+            api_url=api_url,
             remote=remote,
             base=base,
             bump_paths=[Path(path) for path in bump],
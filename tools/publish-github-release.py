@@ -3,72 +3,56 @@ import sys
 from typing import Optional
 
 import click
-import github3
-
-
-def publish_release(*, owner: str, repository_name: str, token: str, tag: str) -> None:
-    github = github3.login(token=token)
-    repository = github.repository(owner, repository_name)
-
-    try:
-        [pull_request] = list(repository.pull_requests(head=f"{owner}:release-{tag}"))
-    except ValueError:
-        raise RuntimeError(
-            f"there should be exactly one pull request for {owner}:release-{tag}"
-        )
-
-    pull_request = repository.pull_request(pull_request.number)
-
-    try:
-        [*_, commit] = pull_request.commits()
-    except ValueError:
-        raise RuntimeError(
-            f"there should be at least one commit associated with #{pull_request.number}"
+from github_client import API_URL
+from github_client import GitHub
+from github_client import Repository
+
+
+def publish_release(
+    *, owner: str, repository_name: str, token: str, tag: str, api_url: str = API_URL
+) -> None:
+    with GitHub(token, api_url=api_url) as github:
+        repository = Repository(github, owner, repository_name)
+        draft = github.submit(repository.draft_release)
+        pull_request = repository.release_pull_request(f"release-{tag}")
+        number = pull_request["number"]
+        # The pull request knows its last commit, so its commits needn't be listed.
+        state = github.submit(repository.commit_state, pull_request["head"]["sha"])
+        release = draft.result()
+
+        if state.result() != "success":
+            raise RuntimeError(f"checks for #{number} have failed")
+
+        if pull_request["merged"]:
+            raise RuntimeError(f"#{number} has been merged already")
+
+        if not pull_request["mergeable"]:
+            raise RuntimeError(f"#{number} is not mergeable")
+
+        title = f"{pull_request['title']} (#{number})"
+
+        if not repository.merge(number, title=title, method="squash"):
+            raise RuntimeError(f"cannot merge #{number}")
+
+        click.echo(f"merged #{number}")
+
+        # Removing the branch and publishing the release don't depend on each other.
+        branch = pull_request["head"]["ref"]
+        removed = github.submit(repository.delete_branch, branch)
+        published = github.submit(
+            repository.edit_release,
+            release["id"],
+            tag_name=tag,
+            name=tag,
+            body=pull_request["body"],
+            draft=False,
+            prerelease=False,
         )
 
-    try:
-        [release] = [release for release in repository.releases() if release.draft]
-    except ValueError:
-        raise RuntimeError("there should be exactly one draft release")
-
-    if commit.status().state != "success":
-        raise RuntimeError(f"checks for #{pull_request.number} have failed")
-
-    if pull_request.is_merged():
-        raise RuntimeError(f"#{pull_request.number} has been merged already")
-
-    if not pull_request.mergeable:
-        raise RuntimeError(f"#{pull_request.number} is not mergeable")
+        removed.result()
+        click.echo(f"removed refs/heads/{branch}")
 
-    title = f"{pull_request.title} (#{pull_request.number})"
-
-    if not pull_request.merge(commit_title=title, merge_method="squash"):
-        raise RuntimeError(f"cannot merge #{pull_request.number}")
-
-    pull_request.refresh()
-
-    if not pull_request.is_merged():
-        raise RuntimeError(f"#{pull_request.number} was not merged")
-
-    click.echo(f"merged #{pull_request.number}")
-
-    branch = repository.ref(f"heads/{pull_request.head.ref}")
-
-    if not branch.delete():
-        raise RuntimeError(f"cannot remove {branch.ref}")
-
-    click.echo(f"removed {branch.ref}")
-
-    if not release.edit(
-        tag_name=tag,
-        name=tag,
-        body=pull_request.body,
-        draft=False,
-        prerelease=False,
-    ):
-        raise RuntimeError(f"cannot publish {release.name}")
-
-    click.echo(f"published {release.name}")
+        click.echo(f"published {published.result()['name']}")
 
 
 @click.command()
@@ -93,8 +77,18 @@ def publish_release(*, owner: str, repository_name: str, token: str, tag: str) -
     envvar="GITHUB_TOKEN",
     help="GitHub API token",
 )
+@click.option(
+    "--api-url",
+    metavar="URL",
+    default=API_URL,
+    envvar="GITHUB_API_URL",
+    show_default=True,
+    help="GitHub API endpoint",
+)
 @click.argument("tag", required=False)
-def main(owner: str, repository: str, token: str, tag: Optional[str]) -> None:
+def main(
+    owner: str, repository: str, token: str, api_url: str, tag: Optional[str]
+) -> None:
     """Publish a GitHub release for this project.
 
     If no release tag is specified, YYYY.MM.DD is used with the current date.
@@ -112,6 +106,7 @@ def main(owner: str, repository: str, token: str, tag: Optional[str]) -> None:
             repository_name=repository,
             token=token,
             tag=tag,
+            api_url=api_url,
         )
     except Exception as error:
         click.secho(f"error: {error}", fg="red")
@@ -0,0 +1,304 @@
+"""Run the release tools against a local fake GitHub API, checking and timing them."""
+import hashlib
+import http.server
+import importlib.util
+import json
+import os
+import re
+import subprocess  # nosec
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import click
+
+
+TOOLS = Path(__file__).resolve().parent
+OWNER, NAME = "octocat", "example"
+OLD_TAG = "2024.1.1"
+TAG = "2024.2.1"
+LABELS = ["release"]
+
+
+class FakeGitHub:
+    """The state of a repository on the fake GitHub, and the requests made to it."""
+
+    def __init__(self, releases: int, latency: float) -> None:
+        self.latency = latency
+        # Like GitHub, list the draft before the published releases, newest first.
+        self.releases: List[Dict[str, Any]] = [
+            {"id": 0, "name": "Draft", "tag_name": "", "body": "Notes", "draft": True}
+        ] + [
+            {
+                "id": number,
+                "name": f"v{number}",
+                "tag_name": f"v{number}",
+                "body": "",
+                "draft": False,
+            }
+            for number in range(releases, 0, -1)
+        ]
+        self.pulls: Dict[int, Dict[str, Any]] = {}
+        self.branches = {f"release-{TAG}"}
+        self.lock = threading.Lock()
+        self.requests: Counter[str] = Counter()
+        self.not_modified = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def route(
+        self, method: str, path: str, query: Dict[str, str], body: Any
+    ) -> Tuple[int, Any]:
+        """Answer a request with a status and a JSON document."""
+        repository = f"/repos/{OWNER}/{NAME}"
+        if not path.startswith(repository):
+            return 404, {"message": "Not Found"}
+        path = path[len(repository) :]
+
+        if method == "GET" and path == "/releases":
+            return 200, self.releases
+        if method == "PATCH" and re.fullmatch(r"/releases/\d+", path):
+            [release] = [
+                item for item in self.releases if item["id"] == int(path.split("/")[2])
+            ]
+            release.update(body)
+            return 200, release
+        if method == "GET" and path == "/pulls":
+            pulls = [
+                pull
+                for pull in self.pulls.values()
+                if pull["state"] == "open" and pull["label"] == query.get("head")
+            ]
+            return 200, pulls
+        if method == "POST" and path == "/pulls":
+            _, branch = body["head"].split(":")
+            number = len(self.pulls) + 1
+            self.pulls[number] = {
+                "number": number,
+                "title": body["title"],
+                "body": body["body"],
+                "label": body["head"],
+                "head": {
+                    "ref": branch,
+                    "sha": hashlib.sha1(branch.encode()).hexdigest(),
+                },
+                "state": "open",
+                "merged": False,
+                "mergeable": True,
+                "labels": [],
+            }
+            return 201, self.pulls[number]
+        match = re.fullmatch(r"/pulls/(\d+)(/merge)?", path)
+        if match and int(match.group(1)) in self.pulls:
+            pull = self.pulls[int(match.group(1))]
+            if method == "GET" and not match.group(2):
+                return 200, pull
+            if method == "PUT" and match.group(2):
+                pull.update(merged=True, mergeable=False, state="closed")
+                return 200, {
+                    "merged": True,
+                    "message": "Pull Request successfully merged",
+                }
+        match = re.fullmatch(r"/issues/(\d+)/labels", path)
+        if method == "POST" and match:
+            pull = self.pulls[int(match.group(1))]
+            pull["labels"] += [{"name": name} for name in body["labels"]]
+            return 200, pull["labels"]
+        if method == "GET" and re.fullmatch(r"/commits/\w+/status", path):
+            return 200, {"state": "success"}
+        match = re.fullmatch(r"/git/refs/heads/(.+)", path)
+        if method == "DELETE" and match and match.group(1) in self.branches:
+            self.branches.remove(match.group(1))
+            return 204, None
+
+        return 404, {"message": "Not Found"}
+
+
+class FakeGitHubHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the fake GitHub API, with pagination and ETags like the real one."""
+
+    github: FakeGitHub
+
+    def handle_request(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        github = self.github
+        # Count requests per endpoint, like "GET /repos/octocat/example/pulls/:id".
+        endpoint = re.sub(r"/[0-9a-f]{40}|/\d+", "/:id", url.path)
+
+        with github.lock:
+            github.in_flight += 1
+            github.peak = max(github.peak, github.in_flight)
+            github.requests[f"{self.command} {endpoint}"] += 1
+            status, data = github.route(self.command, url.path, query, body)
+
+        time.sleep(github.latency)
+        headers = {}
+
+        if isinstance(data, list):
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            if page * per_page < len(data):
+                next_query = urllib.parse.urlencode({**query, "page": page + 1})
+                next_url = f"http://{self.headers['Host']}{url.path}?{next_query}"
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            data = data[(page - 1) * per_page : page * per_page]
+
+        content = b"" if data is None else json.dumps(data).encode()
+
+        if self.command == "GET":
+            etag = f'"{hashlib.sha256(content).hexdigest()}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, content = 304, b""
+                with github.lock:
+                    github.not_modified += 1
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+        with github.lock:
+            github.in_flight -= 1
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = handle_request  # noqa: N815
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def load(name: str) -> ModuleType:
+    """Import one of the release tools, whose file names aren't valid module names."""
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"), TOOLS / f"{name}.py"
+    )
+    assert spec is not None and spec.loader is not None  # nosec
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git(*args: str, cwd: Optional[Path] = None) -> None:
+    subprocess.run(["git", *args], check=True, capture_output=True, cwd=cwd)  # nosec
+
+
+def create_repository(directory: Path) -> Path:
+    """Create a clone with a tagged commit, and the remote it was cloned from."""
+    remote = directory / "remote.git"
+    clone = directory / "clone"
+    git("init", "--quiet", "--bare", "--initial-branch=main", str(remote))
+    git("clone", "--quiet", str(remote), str(clone))
+    for key, value in [
+        ("user.name", "Release Benchmark"),
+        ("user.email", "release-benchmark@example.com"),
+        ("commit.gpgsign", "false"),
+        ("tag.gpgsign", "false"),
+    ]:
+        git("config", key, value, cwd=clone)
+    (clone / "README.md").write_text(f"Version {OLD_TAG}\n")
+    git("add", "README.md", cwd=clone)
+    git("commit", "--quiet", "--message=Initial commit", cwd=clone)
+    git("tag", OLD_TAG, cwd=clone)
+    git("push", "--quiet", "origin", "main", "--tags", cwd=clone)
+    return clone
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise click.ClickException(message)
+
+
+@click.command()
+@click.option("--releases", default=1000, show_default=True, help="published releases")
+@click.option("--latency", default=0.05, show_default=True, help="seconds per response")
+def main(releases: int, latency: float) -> None:
+    """Prepare and publish a release against a fake GitHub API, and time both steps.
+
+    The repository has a long release history, and every response takes a while,
+    like the real API. The run fails unless the release ends up published.
+    """
+    github = FakeGitHub(releases, latency)
+    FakeGitHubHandler.github = github
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    workdir = Path.cwd()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            # The client reads the cache location on import, so set it first.
+            os.environ["XDG_CACHE_HOME"] = directory
+            prepare = load("prepare-github-release")
+            publish = load("publish-github-release")
+            clone = create_repository(Path(directory))
+            options = {
+                "owner": OWNER,
+                "repository_name": NAME,
+                "token": "benchmark",
+                "tag": TAG,
+                "api_url": api_url,
+            }
+            os.chdir(clone)
+            steps = [
+                (
+                    "prepare",
+                    lambda: prepare.prepare_release(
+                        remote="origin",
+                        base="main",
+                        bump_paths=[Path("README.md")],
+                        label_names=LABELS,
+                        **options,
+                    ),
+                ),
+                ("publish", lambda: publish.publish_release(**options)),
+            ]
+
+            for label, step in steps:
+                github.requests.clear()
+                github.not_modified = github.peak = 0
+                start = time.perf_counter()
+                step()
+                elapsed = time.perf_counter() - start
+                click.echo(
+                    f"{label:8} {elapsed * 1000:8.1f} ms, {sum(github.requests.values())}"
+                    f" requests ({github.not_modified} not modified),"
+                    f" at most {github.peak} at once"
+                )
+                for request, count in sorted(github.requests.items()):
+                    click.echo(f"         {count:3} {request}")
+    finally:
+        os.chdir(workdir)
+        server.shutdown()
+        server.server_close()
+
+    [pull] = github.pulls.values()
+    release = github.releases[0]
+    check(pull["merged"], "the pull request wasn't merged")
+    check(
+        [label["name"] for label in pull["labels"]] == LABELS, "the labels are missing"
+    )
+    check(f"release-{TAG}" not in github.branches, "the branch wasn't removed")
+    check(
+        not release["draft"] and release["tag_name"] == TAG,
+        "the release wasn't published",
+    )
+    check(release["body"] == "Notes", "the release notes were lost")
+
+
+if __name__ == "__main__":
+    main(prog_name="release-benchmark")
@@ -0,0 +1,429 @@
+"""Render the template across its options in parallel, check and time the results."""
+import hashlib
+import itertools
+import json
+import os
+import statistics
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import click
+from cookiecutter.main import cookiecutter
+
+
+TEMPLATE = Path(__file__).resolve().parent.parent
+HOOK = TEMPLATE / "hooks" / "post_gen_project.py"
+SNAPSHOT = TEMPLATE / "tools" / "render-matrix.json"
+# Fixed, so that the snapshot doesn't change at the turn of the year.
+COPYRIGHT_YEAR = "2024"
+# Makes the hook skip ``poetry install`` and the nox sessions, which need the network.
+OFFLINE_VARIABLE = "COOKIECUTTER_NEOPY_OFFLINE"
+# Commits made by the hook mustn't depend on the git configuration of the machine.
+GIT_ENVIRONMENT = {
+    "GIT_AUTHOR_NAME": "Render Matrix",
+    "GIT_AUTHOR_EMAIL": "render-matrix@example.com",
+    "GIT_COMMITTER_NAME": "Render Matrix",
+    "GIT_COMMITTER_EMAIL": "render-matrix@example.com",
+    "GIT_CONFIG_COUNT": "1",
+    "GIT_CONFIG_KEY_0": "commit.gpgsign",
+    "GIT_CONFIG_VALUE_0": "false",
+}
+IGNORED_DIRECTORIES = {".git", "__pycache__", ".pytest_cache"}
+
+
+def combinations(full: bool) -> Iterator[Dict[str, Any]]:
+    """Yield the option combinations to render, the template defaults first.
+
+    The full matrix is every combination of the options. The reduced one renders every
+    license, development status, Docker base and allocator once, and every value of the
+    toggles, including every pair of ``initialize_git`` and ``enforce_checks_on_creation``.
+    """
+    options = json.loads((TEMPLATE / "cookiecutter.json").read_text())
+    licenses = options["license"]
+    statuses = options["development_status"]
+    bases = options["docker_base"]
+    allocators = options["docker_allocator"]
+
+    if full:
+        for license, status, git, checks, mypyc, base, allocator in itertools.product(
+            licenses,
+            statuses,
+            [True, False],
+            [True, False],
+            [False, True],
+            bases,
+            allocators,
+        ):
+            yield combination(license, status, git, checks, mypyc, base, allocator)
+        return
+
+    for number in range(max(len(licenses), len(statuses))):
+        yield combination(
+            licenses[number % len(licenses)],
+            statuses[number % len(statuses)],
+            number % 2 == 0,
+            number // 2 % 2 == 0,
+            number // 4 % 2 == 1,
+            bases[number % len(bases)],
+            allocators[number % len(allocators)],
+        )
+
+
+def combination(
+    license: str,
+    status: str,
+    git: bool,
+    checks: bool,
+    mypyc: bool,
+    base: str,
+    allocator: str,
+) -> Dict[str, Any]:
+    return {
+        "license": license,
+        "development_status": status,
+        "initialize_git": git,
+        "enforce_checks_on_creation": checks,
+        "compile_with_mypyc": mypyc,
+        "docker_base": base,
+        "docker_allocator": allocator,
+    }
+
+
+def name(combination: Dict[str, Any]) -> str:
+    """Name a combination, like ``MIT-4-git-checks-mypyc-slim-jemalloc``."""
+    status = combination["development_status"].split("::")[1].split("-")[0].strip()
+    git = "git" if combination["initialize_git"] else "nogit"
+    checks = "checks" if combination["enforce_checks_on_creation"] else "nochecks"
+    mypyc = "mypyc" if combination["compile_with_mypyc"] else "nomypyc"
+    return (
+        f"{combination['license']}-{status}-{git}-{checks}-{mypyc}"
+        f"-{combination['docker_base']}-{combination['docker_allocator']}"
+    )
+
+
+def manifest(project: Path, output: Path) -> Dict[str, str]:
+    """Hash every file of a rendered project.
+
+    The temporary directory and the template directory are replaced by placeholders,
+    because ``.cookiecutter.json`` records them.
+    """
+    replacements = [
+        (str(output).encode(), b"<output>"),
+        (str(TEMPLATE).encode(), b"<template>"),
+    ]
+    digests = {}
+
+    for directory, subdirectories, files in os.walk(project):
+        subdirectories[:] = [
+            name for name in subdirectories if name not in IGNORED_DIRECTORIES
+        ]
+        for file in files:
+            path = Path(directory, file)
+            content = path.read_bytes()
+            for old, new in replacements:
+                content = content.replace(old, new)
+            digests[path.relative_to(project).as_posix()] = hashlib.sha256(
+                content
+            ).hexdigest()[:16]
+
+    return dict(sorted(digests.items()))
+
+
+def render(combination: Dict[str, Any], root: Path, tests: bool) -> Dict[str, Any]:
+    """Render one combination, run its hook and optionally its tests, timing each step."""
+    output = Path(tempfile.mkdtemp(prefix=f"{name(combination)}-", dir=root))
+    context = {**combination, "copyright_year": COPYRIGHT_YEAR}
+    result: Dict[str, Any] = {"name": name(combination), "errors": []}
+
+    start = time.perf_counter()
+    project = Path(
+        cookiecutter(
+            str(TEMPLATE),
+            no_input=True,
+            extra_context=context,
+            output_dir=str(output),
+            accept_hooks=False,
+        )
+    )
+    result["render"] = time.perf_counter() - start
+
+    # Run the hook the way Cookiecutter does, in the project with the current interpreter.
+    start = time.perf_counter()
+    hook = subprocess.run(  # nosec
+        [sys.executable, str(HOOK)],
+        cwd=project,
+        env={**os.environ, **GIT_ENVIRONMENT, OFFLINE_VARIABLE: "1"},
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    result["hook"] = time.perf_counter() - start
+    if hook.returncode:
+        result["errors"].append(f"post_gen_project.py failed:\n{hook.stdout}")
+
+    result["manifest"] = manifest(project, output)
+
+    if tests:
+        # The dependencies are installed in this environment, so nothing is downloaded.
+        start = time.perf_counter()
+        if combination["compile_with_mypyc"]:
+            # Compiled next to the sources, the extension modules are imported instead of them.
+            build = subprocess.run(  # nosec
+                [sys.executable, "build_mypyc.py", "build_ext", "--inplace"],
+                cwd=project,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            if build.returncode:
+                result["errors"].append(f"build_mypyc.py failed:\n{build.stdout}")
+        run = subprocess.run(  # nosec
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"],
+            cwd=project,
+            env={**os.environ, "PYTHONPATH": str(project / "src"), "PIP_NO_INDEX": "1"},
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        result["tests"] = time.perf_counter() - start
+        if run.returncode:
+            result["errors"].append(f"tests failed:\n{run.stdout}")
+
+    return result
+
+
+def delta(base: Dict[str, str], manifest: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Return the files that differ from the base, with None for the removed ones."""
+    return {
+        path: manifest.get(path)
+        for path in sorted(base.keys() | manifest.keys())
+        if base.get(path) != manifest.get(path)
+    }
+
+
+def expand(snapshot: Dict[str, Any], key: str) -> Optional[Dict[str, str]]:
+    """Return the manifest of a combination recorded in the snapshot, if there is one."""
+    if key == snapshot["base"]["name"]:
+        return snapshot["base"]["files"]
+    if key not in snapshot["combinations"]:
+        return None
+    files = {**snapshot["base"]["files"], **snapshot["combinations"][key]}
+    return {path: digest for path, digest in files.items() if digest is not None}
+
+
+def write_snapshot(
+    path: Path,
+    snapshot: Optional[Dict[str, Any]],
+    base: str,
+    manifests: Dict[str, Dict[str, str]],
+) -> None:
+    """Record the manifests, keeping the combinations that weren't rendered this time.
+
+    Each combination is stored as its differences from the template defaults.
+    """
+    recorded = {}
+    if snapshot is not None:
+        recorded = {key: expand(snapshot, key) for key in snapshot["combinations"]}
+    recorded.update(manifests)
+    files = recorded.pop(base)
+    data = {
+        "base": {"name": base, "files": files},
+        "combinations": {key: delta(files, recorded[key]) for key in sorted(recorded)},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def compare_snapshot(
+    snapshot: Dict[str, Any], key: str, manifest: Dict[str, str]
+) -> List[str]:
+    """Describe how a rendered project differs from its snapshot."""
+    expected = expand(snapshot, key)
+    if expected is None:
+        return []
+    differences = []
+    for path, digest in delta(expected, manifest).items():
+        if digest is None:
+            differences.append(f"{path}: missing")
+        elif path not in expected:
+            differences.append(f"{path}: unexpected")
+        else:
+            differences.append(f"{path}: changed")
+    return differences
+
+
+def compare_timings(
+    baseline: Dict[str, Dict[str, float]],
+    results: List[Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """Compare the median time of each step with a baseline, reporting slowdowns.
+
+    Medians are compared, rather than single combinations, because a single rendering
+    is too short to time reliably on a busy machine.
+    """
+    regressions = []
+    for step in ["render", "hook"]:
+        before = statistics.median(timings[step] for timings in baseline.values())
+        after = statistics.median(result[step] for result in results)
+        if after > before * (1 + tolerance):
+            regressions.append(
+                f"median {step} time went from {before * 1000:.0f} ms"
+                f" to {after * 1000:.0f} ms"
+            )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--full", is_flag=True, help="render every combination, not a covering subset"
+)
+@click.option(
+    "--tests/--no-tests",
+    default=True,
+    show_default=True,
+    help="run the tests of each project",
+)
+@click.option(
+    "--jobs",
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="renderings in parallel",
+)
+@click.option(
+    "--snapshot",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=SNAPSHOT,
+    show_default=True,
+    help="manifests of the rendered projects to compare with",
+)
+@click.option(
+    "--update-snapshot",
+    is_flag=True,
+    help="record the rendered projects in the snapshot",
+)
+@click.option(
+    "--save-timings",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="write the timings of this run, to use as a baseline",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="timings of an earlier run to compare with",
+)
+@click.option(
+    "--tolerance",
+    default=0.25,
+    show_default=True,
+    help="allowed slowdown of the median times",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="keep the rendered projects in this directory",
+)
+def main(
+    full: bool,
+    tests: bool,
+    jobs: int,
+    snapshot: Path,
+    update_snapshot: bool,
+    save_timings: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+    output_dir: Optional[Path],
+) -> None:
+    """Render the template with many combinations of its options, and time each one."""
+    matrix = list(combinations(full))
+    base = name(matrix[0])
+    recorded = json.loads(snapshot.read_text()) if snapshot.exists() else None
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="render-matrix-") as directory:
+        root = output_dir or Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(render, context, root, tests) for context in matrix
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if recorded is not None and not update_snapshot:
+                    result["errors"].extend(
+                        compare_snapshot(recorded, result["name"], result["manifest"])
+                    )
+                results.append(result)
+                status = "FAIL" if result["errors"] else "ok"
+                click.echo(
+                    f"[{len(results)}/{len(matrix)}] {result['name']} {status}",
+                    err=True,
+                )
+
+        elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda result: result["name"])
+    click.echo()
+    click.echo(f"{'combination':52} {'render':>9} {'hook':>9} {'tests':>9}  result")
+    for result in results:
+        render_ms, hook_ms = result["render"] * 1000, result["hook"] * 1000
+        tests_s = f"{result['tests']:8.1f}s" if "tests" in result else f"{'-':>9}"
+        status = "FAIL" if result["errors"] else "ok"
+        click.echo(
+            f"{result['name']:52} {render_ms:7.0f}ms {hook_ms:7.0f}ms {tests_s}  {status}"
+        )
+    render_ms = statistics.median(result["render"] for result in results) * 1000
+    hook_ms = statistics.median(result["hook"] for result in results) * 1000
+    click.echo(
+        f"{len(results)} combinations in {elapsed:.1f}s with {jobs} jobs,"
+        f" median render {render_ms:.0f}ms, median hook {hook_ms:.0f}ms"
+    )
+
+    failures = [result for result in results if result["errors"]]
+    for result in failures:
+        click.echo(f"\n{result['name']}:", err=True)
+        for error in result["errors"]:
+            click.echo(f"  {error}", err=True)
+
+    if update_snapshot:
+        manifests = {result["name"]: result["manifest"] for result in results}
+        write_snapshot(snapshot, recorded, base, manifests)
+        click.echo(f"Recorded {len(manifests)} combinations in {snapshot}.", err=True)
+
+    if save_timings is not None:
+        timings = {
+            result["name"]: {"render": result["render"], "hook": result["hook"]}
+            for result in results
+        }
+        save_timings.write_text(json.dumps(timings, indent=2) + "\n")
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare_timings(
+            json.loads(baseline.read_text()), results, tolerance
+        )
+        for regression in regressions:
+            click.echo(regression, err=True)
+
+    if failures or regressions:
+        raise click.ClickException(
+            f"{len(failures)} combinations failed, {len(regressions)} steps got slower"
+        )
+
+
+if __name__ == "__main__":
+    main(prog_name="render-matrix")
@@ -0,0 +1 @@
+"""Benchmarks for the {{cookiecutter.package_name}} package."""
@@ -0,0 +1,116 @@
+"""Run the benchmarks.
+
+Every ``bench_*`` callable in a ``bench_*.py`` module of this package is timed with
+:mod:`timeit`. Every ``metrics_*`` callable is called once and returns measurements of its
+own, like memory usage. The peak RSS of the whole run is reported last. Results can be saved
+as JSON and compared against an earlier run.
+"""
+
+import argparse
+import importlib
+import json
+import pkgutil
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from {{cookiecutter.package_name}}._memory import MIB
+from {{cookiecutter.package_name}}._memory import peak_rss
+
+
+def discover(pattern: str = "", prefix: str = "bench_") -> dict[str, Callable[[], Any]]:
+    """Collect the benchmarks whose name contains a pattern.
+
+    Args:
+        pattern: A substring of the benchmark names to collect.
+        prefix: The prefix of the functions to collect.
+
+    Returns:
+        The benchmarks, keyed by ``module.function`` without the prefixes.
+    """
+    benchmarks: dict[str, Callable[[], Any]] = {}
+    for module_info in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{__package__}.{module_info.name}")
+        for name, function in vars(module).items():
+            qualified = f"{module_info.name[6:]}.{name[len(prefix):]}"
+            if name.startswith(prefix) and callable(function) and pattern in qualified:
+                benchmarks[qualified] = function
+    return benchmarks
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    """Time a benchmark.
+
+    Args:
+        function: The benchmark.
+        repeat: How many timing runs to take the best of.
+
+    Returns:
+        The best time per call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a unit that keeps it readable.
+
+    Args:
+        seconds: The duration.
+
+    Returns:
+        The duration in seconds, milliseconds, microseconds or nanoseconds.
+    """
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.2f} ns"
+
+
+def main() -> None:
+    """Run the benchmarks and print a table of the results."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "-k", dest="pattern", default="", help="only run benchmarks containing this"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark")
+    parser.add_argument("--json", type=Path, help="save the results to this file")
+    parser.add_argument("--compare", type=Path, help="compare with results saved by --json")
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = json.loads(args.compare.read_text()) if args.compare else {}
+    results: dict[str, float] = {}
+    for name, function in sorted(discover(args.pattern).items()):
+        results[name] = measure(function, args.repeat)
+        line = f"{name:40} {format_time(results[name]):>12}"
+        if name in baseline:
+            line += f" {format_time(baseline[name]):>12} {baseline[name] / results[name]:6.2f}x"
+        print(line)
+
+    metrics = {
+        f"{name}.{key}": value
+        for name, function in sorted(discover(args.pattern, prefix="metrics_").items())
+        for key, value in function().items()
+    }
+    # The peak RSS of the whole run, which also reflects the allocator the interpreter uses.
+    rss = peak_rss()
+    if rss is not None:
+        metrics["process.peak_rss_mib"] = rss / MIB
+    for name, value in metrics.items():
+        results[name] = value
+        line = f"{name:40} {value:>12.2f}"
+        if name in baseline:
+            line += f" {baseline[name]:>12.2f}"
+        print(line)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmarks for resources shared between worker processes."""
+
+import json
+import mmap
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from pathlib import Path
+from statistics import mean
+
+from {{cookiecutter.package_name}}._assets import SharedResource
+from {{cookiecutter.package_name}}._memory import MIB
+from {{cookiecutter.package_name}}._memory import peak_rss
+
+
+ENTRIES = 200_000
+WORKERS = 4
+
+
+@cache
+def data() -> dict[str, str]:
+    """Build the resource lazily, so spawned workers don't build it when importing this module."""
+    return {f"key-{number:06d}": f"value number {number}" for number in range(ENTRIES)}
+
+
+@cache
+def shared() -> SharedResource:
+    """Publish the resource once for the lookup benchmarks."""
+    return SharedResource.create(data())
+
+
+@cache
+def keys() -> list[str]:
+    """Every 200th key of the resource."""
+    return list(data())[:: ENTRIES // 1000]
+
+
+def _current_rss() -> int:
+    """The current resident set size of this process.
+
+    Spawned workers inherit the peak RSS of their parent on Linux, so the current size is
+    read from ``/proc`` where it is available.
+    """
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        return int(statm.read_text().split()[1]) * mmap.PAGESIZE
+    return peak_rss() or 0
+
+
+def _parse_in_worker(path: str) -> float:
+    """Parse the resource in a worker and read every value, as each worker does without sharing."""
+    before = _current_rss()
+    with open(path) as json_fp:
+        data = json.load(json_fp)
+    sum(len(value) for value in data.values())
+    return (_current_rss() - before) / MIB
+
+
+def _attach_in_worker(name: str) -> float:
+    """Attach to the shared resource in a worker and read every value."""
+    before = _current_rss()
+    with SharedResource.attach(name) as shared:
+        sum(len(value) for value in shared.mapping.values())
+        return (_current_rss() - before) / MIB
+
+
+def metrics_worker_rss() -> dict[str, float]:
+    """Growth of the RSS of each worker, in MiB, when parsing vs. attaching.
+
+    Pages of the shared segment count towards the RSS of every worker that touches them,
+    but they are backed by the same physical memory.
+    """
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory, "data.json")
+        path.write_text(json.dumps(data()))
+        with ProcessPoolExecutor(max_workers=WORKERS, mp_context=context) as executor:
+            parsed = list(executor.map(_parse_in_worker, [str(path)] * WORKERS))
+        with ProcessPoolExecutor(max_workers=WORKERS, mp_context=context) as executor:
+            attached = list(executor.map(_attach_in_worker, [shared().name] * WORKERS))
+    return {"parsed_mib": mean(parsed), "shared_mib": mean(attached)}
+
+
+def bench_dict_lookup() -> None:
+    """Look keys up in a parsed dictionary."""
+    mapping = data()
+    for key in keys():
+        mapping[key]
+
+
+def bench_shared_lookup() -> None:
+    """Look keys up in the shared mapping."""
+    mapping = shared().mapping
+    for key in keys():
+        mapping[key]
@@ -0,0 +1,30 @@
+"""Benchmarks for the _batch module."""
+
+import io
+import time
+
+from {{cookiecutter.package_name}}._batch import process_records
+from {{cookiecutter.package_name}}._output import write_rows
+
+
+RECORDS = [f"record number {number}" for number in range(100_000)]
+CHUNK_SIZES = (1, 10, 100, 1000, 10_000)
+
+
+def _throughput(chunk_size: int, processes: bool) -> float:
+    start = time.perf_counter()
+    chunks = process_records(
+        RECORDS, str.upper, chunk_size=chunk_size, workers=4, processes=processes
+    )
+    write_rows(({"result": result} for chunk in chunks for result in chunk), stream=io.BytesIO())
+    return len(RECORDS) / (time.perf_counter() - start)
+
+
+def metrics_thread_throughput() -> dict[str, float]:
+    """Records per second through a thread pool, for each chunk size."""
+    return {f"chunk_{size}": _throughput(size, processes=False) for size in CHUNK_SIZES}
+
+
+def metrics_process_throughput() -> dict[str, float]:
+    """Records per second through a process pool, for each chunk size but the smallest."""
+    return {f"chunk_{size}": _throughput(size, processes=True) for size in CHUNK_SIZES[1:]}
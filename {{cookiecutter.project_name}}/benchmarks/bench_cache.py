@@ -0,0 +1,33 @@
+"""Benchmarks for the _cache module."""
+
+import tempfile
+from functools import cache
+from pathlib import Path
+
+from {{cookiecutter.package_name}}._cache import DiskCache
+from {{cookiecutter.package_name}}._cache import memoize
+
+
+@cache
+def disk_cache() -> DiskCache:
+    """Open a cache in a fresh directory once for every benchmark."""
+    return DiskCache(Path(tempfile.mkdtemp()))
+
+
+def _fibonacci(number: int) -> int:
+    return number if number < 2 else _fibonacci(number - 1) + _fibonacci(number - 2)
+
+
+def bench_compute() -> None:
+    """Compute a result that takes milliseconds, without a cache."""
+    _fibonacci(20)
+
+
+def bench_memoized_hit() -> None:
+    """Read the same result back from the cache."""
+    memoize(cache=disk_cache())(_fibonacci)(20)
+
+
+def bench_set() -> None:
+    """Write an entry, including the eviction pass every few writes."""
+    disk_cache().set(b"key", list(range(100)))
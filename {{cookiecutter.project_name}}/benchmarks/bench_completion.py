@@ -0,0 +1,61 @@
+"""Benchmarks for the _completion module."""
+
+import os
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from typer.main import get_command
+
+from {{cookiecutter.package_name}}.__main__ import cli
+from {{cookiecutter.package_name}}._completion import FULL_COMPLETION_VARIABLE
+from {{cookiecutter.package_name}}._completion import build_index
+from {{cookiecutter.package_name}}._completion import complete_variable
+from {{cookiecutter.package_name}}._completion import render_script
+
+
+PROG = "{{cookiecutter.project_name}}"
+REPEAT = 10
+
+
+def _latency(command: list[str], environ: dict[str, str]) -> float:
+    # The best of several runs, in milliseconds: what a Tab press costs on a warm cache.
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run(command, env=environ, check=True, capture_output=True)  # nosec
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def metrics_completion_latency() -> dict[str, float]:
+    """Milliseconds to complete a subcommand from the index, by importing the CLI, and statically.
+
+    Needs the package installed, for its console script.
+    """
+    script = Path(sys.executable).with_name(PROG)
+    if not script.exists():
+        return {}
+    environ = {
+        **os.environ,
+        complete_variable(PROG): "complete_bash",
+        "COMP_WORDS": f"{PROG} le",
+        "COMP_CWORD": "1",
+    }
+    results = {
+        "index_ms": _latency([str(script)], environ),
+        "full_ms": _latency([str(script)], {**environ, FULL_COMPLETION_VARIABLE: "1"}),
+    }
+
+    bash = shutil.which("bash")
+    if bash is not None:
+        function = f"_{PROG.replace('-', '_')}_static_completion"
+        with tempfile.TemporaryDirectory() as directory:
+            static = Path(directory, "completion.bash")
+            static.write_text(render_script(build_index(get_command(cli), PROG), "bash"))
+            command = f"source {static}; COMP_WORDS=({PROG} le); COMP_CWORD=1; {function}"
+            results["static_ms"] = _latency([bash, "-c", command], dict(os.environ))
+    return results
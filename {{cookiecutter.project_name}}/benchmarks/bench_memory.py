@@ -0,0 +1,21 @@
+"""Benchmarks for the _memory module."""
+
+from {{cookiecutter.package_name}}._memory import MIB
+from {{cookiecutter.package_name}}._memory import MemoryBudget
+from {{cookiecutter.package_name}}._memory import MemoryReport
+from {{cookiecutter.package_name}}._memory import format_size
+
+
+REPORT = MemoryReport(traced_peak=3 * MIB, rss_peak=200 * MIB, top=())
+BUDGET = MemoryBudget(traced_peak_mib=1)
+
+
+def bench_format_size() -> None:
+    """Format sizes across every unit."""
+    for size in (512, 4096, 3 * MIB, 5 * 1024 * MIB):
+        format_size(size)
+
+
+def bench_budget_violations() -> None:
+    """Check a report that exceeds every budget."""
+    BUDGET.violations(REPORT)
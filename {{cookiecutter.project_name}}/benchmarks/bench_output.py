@@ -0,0 +1,36 @@
+"""Benchmarks for the _output module."""
+
+import os
+import time
+from collections.abc import Iterator
+
+from {{cookiecutter.package_name}}._output import OutputFormat
+from {{cookiecutter.package_name}}._output import write_rows
+
+
+ROWS = 100_000
+
+
+def _rows() -> Iterator[dict[str, object]]:
+    for number in range(ROWS):
+        yield {"id": number, "name": f"row {number}", "ratio": number / ROWS}
+
+
+def metrics_rows_per_second() -> dict[str, float]:
+    """Rows per second written to /dev/null in each format, and with line-buffered print.
+
+    ``print`` on a line-buffered stream is what a terminal gets, one write per line.
+    """
+    results = {}
+    with open(os.devnull, "wb", buffering=0) as devnull:
+        for output in OutputFormat:
+            start = time.perf_counter()
+            write_rows(_rows(), output, devnull, color=False)
+            results[output.value] = ROWS / (time.perf_counter() - start)
+
+    with open(os.devnull, "w", buffering=1) as stream:
+        start = time.perf_counter()
+        for row in _rows():
+            print(str(row["id"]) + " " + str(row["name"]) + " " + str(row["ratio"]), file=stream)
+        results["print"] = ROWS / (time.perf_counter() - start)
+    return results
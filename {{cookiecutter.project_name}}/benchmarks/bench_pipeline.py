@@ -0,0 +1,85 @@
+"""Benchmarks for the _pipeline module."""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+from {{cookiecutter.package_name}}._memory import MIB
+from {{cookiecutter.package_name}}._pipeline import Pipeline
+from {{cookiecutter.package_name}}._pipeline import flatten
+from {{cookiecutter.package_name}}._pipeline import parse
+from {{cookiecutter.package_name}}._pipeline import stage
+
+
+DOCUMENTS = 500
+# Simulated latency of a remote lookup per document, like an API call or a database query.
+LATENCY = 0.001
+
+
+def _documents() -> Iterator[tuple[str, str]]:
+    for number in range(DOCUMENTS):
+        document = {
+            f"field{field}": {"value": f"{number}-{field}", "tags": [field, number]}
+            for field in range(20)
+        }
+        yield f"{number}.json", json.dumps(document)
+
+
+@stage(workers=16)
+async def lookup(documents: AsyncIterator[tuple[str, Any]]) -> AsyncIterator[tuple[str, Any]]:
+    """Wait for a simulated remote lookup per document."""
+    async for name, document in documents:
+        await asyncio.sleep(LATENCY)
+        yield name, document
+
+
+def _pipeline() -> int:
+    return sum(1 for _ in Pipeline(parse, lookup, flatten, batch_size=10).run(_documents()))
+
+
+def _lists() -> int:
+    # The same steps one after the other, each materializing its whole output.
+    parsed = [(name, json.loads(text)) for name, text in list(_documents())]
+    looked_up = []
+    for item in parsed:
+        time.sleep(LATENCY)
+        looked_up.append(item)
+
+    async def rows() -> list[dict[str, Any]]:
+        async def items() -> AsyncIterator[tuple[str, Any]]:
+            for item in looked_up:
+                yield item
+
+        return [row async for row in flatten.function(items())]
+
+    return len(asyncio.run(rows()))
+
+
+def _measure(run: Callable[[], int]) -> tuple[float, float]:
+    start = time.perf_counter()
+    rows = run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rows / elapsed, peak / MIB
+
+
+def metrics_pipeline_vs_lists() -> dict[str, float]:
+    """Rows per second and peak traced memory of the pipeline and of a list-based version."""
+    pipeline_rate, pipeline_peak = _measure(_pipeline)
+    lists_rate, lists_peak = _measure(_lists)
+    return {
+        "pipeline_rows_per_s": pipeline_rate,
+        "lists_rows_per_s": lists_rate,
+        "pipeline_peak_mib": pipeline_peak,
+        "lists_peak_mib": lists_peak,
+    }
@@ -0,0 +1,81 @@
+"""Benchmarks for the _scheduler module."""
+
+import asyncio
+import contextlib
+import io
+import statistics
+import subprocess  # nosec
+import sys
+import time
+from datetime import datetime
+
+from {{cookiecutter.package_name}}._scheduler import Cron
+from {{cookiecutter.package_name}}._scheduler import Interval
+from {{cookiecutter.package_name}}._scheduler import Scheduler
+from {{cookiecutter.package_name}}._scheduler import run_command
+
+
+COMMAND = ("-o", "json", "resources")
+REPEAT = 10
+INTERVAL = 0.01
+RUNS = 100
+CRON = Cron("*/20 9-17 1,15 6 1-5")
+START = datetime(2024, 7, 1)
+
+
+def metrics_command_runs() -> dict[str, float]:
+    """Milliseconds per run of a command, spawning the CLI as host cron does, and in process.
+
+    The spawned run pays for starting the interpreter and importing the package every time.
+    """
+    command = [sys.executable, "-m", "{{cookiecutter.package_name}}", *COMMAND]
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        subprocess.run(command, check=True, capture_output=True)  # nosec
+    spawned = (time.perf_counter() - start) / REPEAT
+
+    with contextlib.redirect_stdout(io.TextIOWrapper(io.BytesIO())):
+        # The first run imports the CLI, like the scheduler does once on its first job.
+        run_command(COMMAND)
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            run_command(COMMAND)
+    warm = (time.perf_counter() - start) / REPEAT
+    return {"spawned_ms": spawned * 1000, "in_process_ms": warm * 1000}
+
+
+def _gaps(jitter: float) -> list[float]:
+    scheduler = Scheduler()
+    starts: list[float] = []
+
+    @scheduler.job(Interval(INTERVAL), jitter=jitter)
+    async def tick() -> None:
+        starts.append(time.perf_counter())
+        if len(starts) == RUNS:
+            stop.set()
+
+    stop = asyncio.Event()
+    asyncio.run(scheduler.run(stop))
+    return [(later - earlier) * 1000 for earlier, later in zip(starts, starts[1:], strict=False)]
+
+
+def metrics_scheduling() -> dict[str, float]:
+    """Milliseconds between the starts of a job due every 10 ms, without and with jitter.
+
+    Due times don't drift, so the mean gap stays at the interval however late single runs
+    start, while jitter spreads the gaps out.
+    """
+    steady = _gaps(0.0)
+    jittered = _gaps(INTERVAL / 2)
+    return {
+        "mean_gap_ms": statistics.mean(steady),
+        "stdev_gap_ms": statistics.stdev(steady),
+        "max_gap_ms": max(steady),
+        "jittered_mean_gap_ms": statistics.mean(jittered),
+        "jittered_stdev_gap_ms": statistics.stdev(jittered),
+    }
+
+
+def bench_cron_next_after() -> None:
+    """Find the next time a cron expression restricting every field matches."""
+    CRON.next_after(START)
@@ -0,0 +1,59 @@
+"""Benchmarks for the _tracing module."""
+
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from {{cookiecutter.package_name}}._tracing import DEFAULT_CAPACITY
+from {{cookiecutter.package_name}}._tracing import Tracer
+from {{cookiecutter.package_name}}._tracing import default_tracer
+from {{cookiecutter.package_name}}._tracing import span
+
+
+SPANS = 100_000
+
+
+def _nanoseconds_per_span(rate: float) -> float:
+    tracer = default_tracer()
+    previous = tracer.rate
+    tracer.rate = rate
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(SPANS):
+            with span("benchmark"):
+                pass
+        return (time.perf_counter_ns() - start) / SPANS
+    finally:
+        tracer.rate = previous
+        tracer.clear()
+
+
+def _nanoseconds_per_null_context() -> float:
+    start = time.perf_counter_ns()
+    for _ in range(SPANS):
+        with nullcontext():
+            pass
+    return (time.perf_counter_ns() - start) / SPANS
+
+
+def metrics_span_overhead() -> dict[str, float]:
+    """Nanoseconds per span when tracing is off, when the trace isn't sampled, and when it is.
+
+    A ``nullcontext`` block is the baseline of what any context manager costs.
+    """
+    return {
+        "nullcontext_ns": _nanoseconds_per_null_context(),
+        "disabled_ns": _nanoseconds_per_span(0.0),
+        "unsampled_ns": _nanoseconds_per_span(1e-9),
+        "sampled_ns": _nanoseconds_per_span(1.0),
+    }
+
+
+def bench_export() -> None:
+    """Export a full ring buffer as a Chrome trace."""
+    tracer = Tracer(capacity=DEFAULT_CAPACITY)
+    for number in range(DEFAULT_CAPACITY):
+        tracer.record("benchmark", number, number + 1, {"number": number})
+    with tempfile.TemporaryDirectory() as directory:
+        tracer.export(Path(directory, "trace.json"))
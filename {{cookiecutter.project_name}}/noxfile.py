@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import shlex
 import shutil
 import sys
+import time
 from pathlib import Path
 from textwrap import dedent
 
@@ -32,6 +35,8 @@ except ImportError:
 package = "{{cookiecutter.package_name}}"
 python_versions = ["3.12", "3.11"]
 nox.needs_version = ">= 2023.4.22"
+# Written into the git hooks patched by activate_virtualenv_in_precommit_hooks.
+HOOK_MARKER = "# Patched by nox to activate its virtualenv."
 nox.options.sessions = (
     "pre-commit",
     "safety",
@@ -40,7 +45,8 @@ nox.options.sessions = (
     "typeguard",
     "xdoctest",
     "docs-build",
-    "pyinstaller",
+    "pyinstaller",{% if cookiecutter.compile_with_mypyc %}
+    "mypyc",{% endif %}
 )
 
 
@@ -71,6 +77,7 @@ def activate_virtualenv_in_precommit_hooks(session: Session) -> None:
     headers = {
         # pre-commit < 2.16.0
         "python": f"""\
+            {HOOK_MARKER}
             import os
             os.environ["VIRTUAL_ENV"] = {virtualenv!r}
             os.environ["PATH"] = os.pathsep.join((
@@ -80,11 +87,13 @@ def activate_virtualenv_in_precommit_hooks(session: Session) -> None:
             """,
         # pre-commit >= 2.16.0
         "bash": f"""\
+            {HOOK_MARKER}
             VIRTUAL_ENV={shlex.quote(virtualenv)}
             PATH={shlex.quote(session.bin)}"{os.pathsep}$PATH"
             """,
         # pre-commit >= 2.17.0 on Windows forces sh shebang
         "/bin/sh": f"""\
+            {HOOK_MARKER}
             VIRTUAL_ENV={shlex.quote(virtualenv)}
             PATH={shlex.quote(session.bin)}"{os.pathsep}$PATH"
             """,
@@ -94,19 +103,27 @@ def activate_virtualenv_in_precommit_hooks(session: Session) -> None:
     if not hookdir.is_dir():
         return
 
+    # Case-insensitive filesystems need case-insensitive matching. Decide this once, not per hook.
+    casefold = Path("A") == Path("a")
+    if casefold:
+        bindirs = [bindir.lower() for bindir in bindirs]
+
     for hook in hookdir.iterdir():
         if hook.name.endswith(".sample") or not hook.is_file():
             continue
 
-        if not hook.read_bytes().startswith(b"#!"):
+        # Read each hook once; anything that isn't a script can't be patched.
+        try:
+            text = hook.read_text()
+        except UnicodeDecodeError:
             continue
 
-        text = hook.read_text()
+        # Skip the hooks we patched before.
+        if not text.startswith("#!") or HOOK_MARKER in text:
+            continue
 
-        if not any(
-            Path("A") == Path("a") and bindir.lower() in text.lower() or bindir in text
-            for bindir in bindirs
-        ):
+        haystack = text.lower() if casefold else text
+        if not any(bindir in haystack for bindir in bindirs):
             continue
 
         lines = text.splitlines()
@@ -118,11 +135,96 @@ def activate_virtualenv_in_precommit_hooks(session: Session) -> None:
                 break
 
 
-@session(name="pre-commit", python=python_versions[0])
+def changed_files(session: Session, base: str) -> list[str]:
+    """List the files that differ from a git ref, including untracked files.
+
+    Args:
+        session: The Session object.
+        base: The ref to compare the working tree against.
+
+    Returns:
+        The paths of the added, modified and untracked files.
+    """
+    diff = session.run(
+        "git", "diff", "--name-only", "--diff-filter=d", base, external=True, silent=True
+    )
+    untracked = session.run(
+        "git", "ls-files", "--others", "--exclude-standard", external=True, silent=True
+    )
+    return sorted({*str(diff).splitlines(), *str(untracked).splitlines()})
+
+
+def install_cached(session: Session, *packages: str, key: str = "") -> None:
+    """Install packages unless the reused virtualenv already holds them.
+
+    The installed set is recorded in a stamp file inside the virtualenv together with
+    ``key`` and a hash of ``poetry.lock``, which pins the versions nox-poetry installs. When
+    the session reuses its virtualenv and none of them have changed, installation is skipped
+    entirely.
+
+    Args:
+        session: The Session object.
+        packages: The packages to install.
+        key: Extra input that invalidates the stamp, e.g. a hash of a configuration file.
+    """
+    lock = hashlib.sha256(Path("poetry.lock").read_bytes()).hexdigest()
+    digest = hashlib.sha256("\n".join((lock, key, *packages)).encode()).hexdigest()
+    stamp = Path(session.virtualenv.location, ".nox-install-stamp")
+    if stamp.exists() and stamp.read_text() == digest:
+        session.log(f"Reusing installed packages ({digest[:12]}).")
+        return
+    session.install(*packages)
+    stamp.write_text(digest)
+
+
+def run_incremental(session: Session, cache_dir: Path, *args: str) -> None:
+    """Run a command that keeps incremental state in a cache directory and report the time saved.
+
+    The duration of the first run against an empty cache is recorded in the cache directory,
+    so later runs can be compared against it.
+
+    Args:
+        session: The Session object.
+        cache_dir: The directory the command keeps its incremental state in.
+        args: The command and its arguments.
+    """
+    baseline = cache_dir / ".nox-cold-duration"
+    cold = not baseline.exists()
+    start = time.perf_counter()
+    session.run(*args)
+    elapsed = time.perf_counter() - start
+    if cold:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        baseline.write_text(f"{elapsed:.3f}")
+        session.log(f"{args[0]} took {elapsed:.1f}s (cold run, cache stored in {cache_dir})")
+    else:
+        saved = float(baseline.read_text()) - elapsed
+        session.log(f"{args[0]} took {elapsed:.1f}s ({saved:.1f}s saved compared to a cold run)")
+
+
+def pop_clean_flag(session: Session) -> tuple[list[str], bool]:
+    """Remove ``--clean`` from the positional arguments of a session.
+
+    Args:
+        session: The Session object.
+
+    Returns:
+        The remaining positional arguments and whether ``--clean`` was given.
+    """
+    posargs = [arg for arg in session.posargs if arg != "--clean"]
+    return posargs, len(posargs) != len(session.posargs)
+
+
+@session(name="pre-commit", python=python_versions[0], reuse_venv=True)
 def precommit(session: Session) -> None:
-    """Lint using pre-commit."""
+    """Lint using pre-commit.
+
+    Pass ``changed [REF]`` to lint only the files that differ from REF (default: HEAD),
+    e.g. ``nox --session=pre-commit -- changed origin/main``.
+    """
     # See if we have a pre-commit configuration file.
-    if not Path(".pre-commit-config.yaml").exists():
+    config = Path(".pre-commit-config.yaml")
+    if not config.exists():
         # if statically analyzed, this branch may never be executed.
         # however, this template is designed to work without a .pre-commit-config.yaml file,
         # and as such must accommodate for this case.
@@ -134,8 +236,17 @@ def precommit(session: Session) -> None:
         "--all-files",
         "--hook-stage=manual",
         "--show-diff-on-failure",
+        "--verbose",  # prints the duration of every hook
     ]
-    session.install(
+    if args[0] == "changed":
+        base = args[1] if len(args) > 1 else "HEAD"
+        files = changed_files(session, base)
+        if not files:
+            session.skip(f"No files changed since {base}.")
+        args = ["run", "--hook-stage=manual", "--show-diff-on-failure", "--verbose", "--files", *files]
+    # The hook environments of the local hooks are this virtualenv, so key it by the config.
+    install_cached(
+        session,
         "bandit",
         "black",
         "darglint",
@@ -148,10 +259,13 @@ def precommit(session: Session) -> None:
         "pre-commit",
         "pre-commit-hooks",
         "pyupgrade",
+        key=hashlib.sha256(config.read_bytes()).hexdigest(),
     )
     # if this is being run in the template initialization hook, we may not have an internet connection or data may
     # have changed. therefore, we need to skip relocking the poetry file.
+    start = time.perf_counter()
     session.run("pre-commit", *args, env={"SKIP": "poetry-lock"})
+    session.log(f"pre-commit finished in {time.perf_counter() - start:.1f}s")
     if args and args[0] == "install":
         activate_virtualenv_in_precommit_hooks(session)
 
@@ -164,25 +278,75 @@ def safety(session: Session) -> None:
     session.run("safety", "check", "--full-report", f"--file={requirements}")
 
 
-@session(python=python_versions)
+@session(python=python_versions, reuse_venv=True)
 def mypy(session: Session) -> None:
-    """Type-check using mypy."""
-    args = session.posargs or ["src", "tests", "docs/conf.py"]
+    """Type-check using mypy.
+
+    The mypy cache is kept per Python version between runs, so only changed modules are rechecked.
+    Pass ``--clean`` to start from an empty cache.
+    """
+    posargs, clean = pop_clean_flag(session)
+    args = posargs or ["src", "tests", "benchmarks", "docs/conf.py"]
+    cache_dir = Path(".mypy_cache", f"nox-{session.python}")
+    if clean and cache_dir.exists():
+        shutil.rmtree(cache_dir)
     session.install(".")
-    session.install("mypy", "pytest")
-    session.run("mypy", *args)
+    install_cached(session, "mypy", "pytest")
+    run_incremental(session, cache_dir, "mypy", f"--cache-dir={cache_dir}", "--sqlite-cache", *args)
+
+
+def select_affected_tests(session: Session) -> list[str]:
+    """Resolve ``affected [REF]`` positional arguments into the tests to run.
+
+    The selection comes from the impact map that a full run of the tests session records.
+    If no test is affected, the session is skipped.
+
+    Args:
+        session: The Session object.
+
+    Returns:
+        The node IDs of the affected tests, or an empty list if the full suite must run.
+    """
+    ref = session.posargs[1] if len(session.posargs) > 1 else "HEAD"
+    output = session.run("python", "tools/test-impact.py", "select", ref, silent=True)
+    lines = str(output).splitlines()
+    for reason in (line[2:] for line in lines if line.startswith("# ")):
+        session.log(reason)
+    nodeids = [line for line in lines if line and not line.startswith("#")]
+    if nodeids == ["all"]:
+        session.log("Running the full test suite.")
+        return []
+    if not nodeids:
+        session.skip(f"No tests are affected by changes since {ref}.")
+    session.log(f"Running {len(nodeids)} affected tests.")
+    return nodeids
 
 
 @session(python=python_versions)
 def tests(session: Session) -> None:
-    """Run the test suite."""
+    """Run the test suite.
+
+    Pass ``affected [REF]`` to run only the tests covering lines changed since REF (default: HEAD).
+    """
     session.install(".")
     session.install("coverage[toml]", "pytest", "pygments")
+    args = session.posargs
+    if args[:1] == ["affected"]:
+        selected = select_affected_tests(session)
+        if selected:
+            # A partial run can't satisfy the coverage threshold, so skip measuring it.
+            session.run("pytest", *selected)
+            return
+        args = []
+    data_files = set(Path().glob(".coverage.*"))
     try:
-        session.run("coverage", "run", "--parallel", "-m", "pytest", *session.posargs)
+        session.run("coverage", "run", "--parallel", "-m", "pytest", *args)
     finally:
         if session.interactive:
             session.notify("coverage", posargs=[])
+    if not args:
+        new_data_files = sorted(str(path) for path in set(Path().glob(".coverage.*")) - data_files)
+        session.run("python", "tools/test-impact.py", "record", *new_data_files)
 
 
 @session(python=python_versions[0])
@@ -200,10 +364,17 @@ def coverage(session: Session) -> None:
 
 @session(python=python_versions[0])
 def typeguard(session: Session) -> None:
-    """Runtime type checking using Typeguard."""
+    """Runtime type checking using Typeguard.
+
+    Pass ``affected [REF]`` to run only the tests covering lines changed since REF (default: HEAD).
+    """
     session.install(".")
     session.install("pytest", "typeguard", "pygments")
-    session.run("pytest", f"--typeguard-packages={package}", *session.posargs)
+    args = session.posargs
+    if args[:1] == ["affected"]:
+        session.install("coverage[toml]")
+        args = select_affected_tests(session)
+    session.run("pytest", f"--typeguard-packages={package}", *args)
 
 
 @session(python=python_versions)
@@ -223,30 +394,46 @@ def xdoctest(session: Session) -> None:
 
 @session(name="docs-build", python=python_versions[0])
 def docs_build(session: Session) -> None:
-    """Build the documentation."""
-    args = session.posargs or ["docs", "docs/_build"]
-    if not session.posargs and "FORCE_COLOR" in os.environ:
+    """Build the documentation.
+
+    Sphinx reuses its pickled environment in docs/_build, so only changed pages are rebuilt.
+    Pass ``--clean`` to start from an empty build directory. The time saved by the incremental
+    build is reported when no other arguments are given.
+    """
+    posargs, clean = pop_clean_flag(session)
+    args = posargs or ["docs", "docs/_build"]
+    if not posargs and "FORCE_COLOR" in os.environ:
         args.insert(0, "--color")
 
     session.install(".")
     session.install("sphinx", "sphinx-click", "furo", "myst-parser")
 
     build_dir = Path("docs", "_build")
-    if build_dir.exists():
+    if clean and build_dir.exists():
         shutil.rmtree(build_dir)
 
-    session.run("sphinx-build", *args)
+    if posargs:
+        # The arguments may choose other output or doctree directories, which the timing
+        # baseline in docs/_build doesn't describe.
+        session.run("sphinx-build", *args)
+    else:
+        # Keep the timing baseline next to the pickled environment rather than in the HTML output.
+        run_incremental(session, build_dir / ".doctrees", "sphinx-build", *args)
 
 
 @session(python=python_versions[0])
 def docs(session: Session) -> None:
-    """Build and serve the documentation with live reloading on file changes."""
-    args = session.posargs or ["--open-browser", "docs", "docs/_build"]
+    """Build and serve the documentation with live reloading on file changes.
+
+    Pass ``--clean`` to discard the incremental build in docs/_build first.
+    """
+    posargs, clean = pop_clean_flag(session)
+    args = posargs or ["--open-browser", "docs", "docs/_build"]
     session.install(".")
     session.install("sphinx", "sphinx-autobuild", "sphinx-click", "furo", "myst-parser")
 
     build_dir = Path("docs", "_build")
-    if build_dir.exists():
+    if clean and build_dir.exists():
         shutil.rmtree(build_dir)
 
     session.run("sphinx-autobuild", *args)
@@ -273,3 +460,116 @@ def pyinstaller(session: Session) -> None:
     args.append("--noconfirm")
 
     session.run("pyinstaller", *args, str(Path("src", "launcher.py")))
+
+
+@session(python=python_versions[0])
+def completions(session: Session) -> None:
+    """Regenerate the completion index, and write the static completion scripts to dist."""
+    session.install(".")
+    session.run(
+        "python", "tools/generate-completions.py", "--scripts", str(Path("dist", "completions"))
+    )
+
+
+@session(python=python_versions[0])
+def benchmarks(session: Session) -> None:
+    """Run the benchmarks, e.g. ``-- -k memory --json .benchmarks/baseline.json``."""
+    session.install(".")
+    session.run("python", "-m", "benchmarks", *session.posargs)
+
+
+@session(name="docker-benchmarks", python=False)
+def docker_benchmarks(session: Session) -> None:
+    """Build the image with each base and allocator, and run the benchmarks inside it.
+
+    Every variant is built once and compared with the first one. By default that is every
+    combination of base and allocator, so a variant whose allocator can't be installed fails
+    the session. Pass ``BASE:ALLOCATOR`` pairs to choose the variants, e.g.
+    ``-- alpine:none slim:jemalloc``.
+    """
+    variants = session.posargs or [
+        f"{base}:{allocator}"
+        for base in ("alpine", "slim")
+        for allocator in ("none", "jemalloc", "mimalloc")
+    ]
+    results = Path(".benchmarks", "docker").resolve()
+    results.mkdir(parents=True, exist_ok=True)
+    benchmarks_dir = Path("benchmarks").resolve()
+
+    summary = []
+    for variant in variants:
+        base, allocator = variant.split(":")
+        tag = f"{package}-benchmarks:{base}-{allocator}"
+        session.run(
+            "docker",
+            "build",
+            f"--build-arg=BASE={base}",
+            f"--build-arg=ALLOCATOR={allocator}",
+            f"--tag={tag}",
+            ".",
+            external=True,
+        )
+        inspect = session.run("docker", "image", "inspect", tag, external=True, silent=True)
+        size = json.loads(str(inspect))[0]["Size"]
+
+        # The benchmarks aren't part of the image, so mount them next to the installed package.
+        # The image runs as an unprivileged user, so the results are written inside the container
+        # and copied out afterwards instead of into a mounted directory it would need to own.
+        result = results / f"{base}-{allocator}.json"
+        written = f"/tmp/{result.name}"  # nosec: a path inside the container
+        args = ["--json", written]
+        if variant != variants[0]:
+            args += ["--compare", f"/results/{variants[0].replace(':', '-')}.json"]
+        container = f"{package}-benchmarks-{base}-{allocator}"
+        session.log(f"Benchmarking {variant}")
+        try:
+            session.run(
+                "docker",
+                "run",
+                f"--name={container}",
+                f"--volume={benchmarks_dir}:/opt/benchmarks/benchmarks:ro",
+                f"--volume={results}:/results:ro",
+                "--workdir=/opt/benchmarks",
+                "--entrypoint=python",
+                tag,
+                "-m",
+                "benchmarks",
+                *args,
+                external=True,
+            )
+            session.run("docker", "cp", f"{container}:{written}", str(result), external=True)
+        finally:
+            session.run("docker", "rm", "--force", container, external=True, silent=True)
+        measured = json.loads(result.read_text())
+        summary.append((variant, size, measured.get("process.peak_rss_mib", 0.0)))
+
+    session.log(f"{'variant':20} {'image size':>12} {'peak rss':>12}")
+    for variant, size, rss in summary:
+        session.log(f"{variant:20} {size / 1024 / 1024:>8.1f} MiB {rss:>8.1f} MiB")
+{%- if cookiecutter.compile_with_mypyc %}
+
+
+@session(python=python_versions)
+def mypyc(session: Session) -> None:
+    """Build a wheel compiled with mypyc, run the tests against it and benchmark it.
+
+    The benchmarks run against the pure-Python package first, so the compiled results are
+    printed next to the interpreted ones.
+    """
+    results = Path(".benchmarks", f"mypyc-{session.python}")
+    session.install(".")
+    session.install("pytest", "pygments")
+    session.run("python", "-m", "benchmarks", "--json", str(results / "interpreted.json"))
+
+    session.install("mypy", "poetry-core", "setuptools", "wheel")
+    shutil.rmtree("build", ignore_errors=True)
+    dist_dir = Path("dist", "mypyc")
+    session.run("python", "build_mypyc.py", "bdist_wheel", f"--dist-dir={dist_dir}")
+    wheel = max(dist_dir.glob("*.whl"), key=lambda path: path.stat().st_mtime)
+    session.install("--no-deps", "--force-reinstall", str(wheel))
+
+    session.run("pytest", *session.posargs)
+    session.run(
+        "python", "-m", "benchmarks", "--compare", str(results / "interpreted.json")
+    )
+{%- endif %}
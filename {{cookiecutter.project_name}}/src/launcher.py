@@ -7,8 +7,9 @@ SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AG
 
 from __future__ import annotations
 
-from {{cookiecutter.package_name}}.__main__ import cli
+# Answers shell completion requests before importing the command line.
+from {{cookiecutter.package_name}}._completion import main
 
 
 if __name__ == "__main__":  # pragma: no cover
-    cli()
+    main()
@@ -5,26 +5,120 @@ Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
 SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
 """  # noqa: E501, B950, D415
 
-from __future__ import annotations
-
-import json
+# Annotations are evaluated eagerly here, so pyupgrade keeps ``Optional`` in the command
+# signatures; typer 0.9 doesn't understand the ``float | None`` it would write instead.
+from pathlib import Path
+from typing import Optional
 
 import typer
 
-from ._assets import RESOURCES
+from ._assets import load_json
+from ._batch import batch_command
+from ._memory import MemoryTracker
 from ._metadata import __version__
+from ._output import OutputFormat
+from ._output import selected_format
+from ._output import write_rows
+from ._tracing import export_trace
+from ._tracing import in_span
+from ._tracing import span
 
 
 cli = typer.Typer()
 
 
+@cli.callback(invoke_without_command=True)
+def main(
+    context: typer.Context,
+    memory_report: bool = typer.Option(
+        False, "--memory-report", help="Print peak memory usage and top allocation sites to stderr."
+    ),
+    output: OutputFormat = typer.Option(
+        OutputFormat.TEXT, "--output", "-o", case_sensitive=False, help="How to format results."
+    ),
+) -> None:
+    tracker = MemoryTracker(enabled=memory_report)
+
+    def print_report() -> None:
+        if tracker.report is not None:
+            typer.echo(tracker.report.format(), err=True)
+
+    def write_trace() -> None:
+        path = export_trace()
+        if path is not None:
+            typer.echo(f"trace written to {path}", err=True)
+
+    # Callbacks run in reverse: the command's span ends first, then the tracker exits,
+    # then the memory report is printed and the trace is written. Commands run by the
+    # scheduler leave the trace to the invocation that runs them.
+    if not in_span():
+        context.call_on_close(write_trace)
+    context.call_on_close(print_report)
+    context.with_resource(tracker)
+    context.with_resource(span(f"cli.{context.invoked_subcommand or 'main'}"))
+    if context.invoked_subcommand is not None:
+        return
+    parsed = load_json("data.json")
+    write_rows(
+        [{"version": __version__, "status": parsed["status"]}],
+        output,
+        styles={"status": {"fg": typer.colors.GREEN, "bold": True}},
+    )
+
+
+@batch_command(cli)
+def length(record: str) -> str:
+    """Print the length of every record next to it."""
+    return f"{len(record)}\t{record}"
+
+
 @cli.command()
-def main() -> None:
-    data = RESOURCES / "data.json"
-    with data.open() as json_fp:
-        parsed = json.load(json_fp)
-    status = parsed["status"]
-    print(__version__ + " " + typer.style(status, fg=typer.colors.GREEN, bold=True))
+def resources(
+    context: typer.Context,
+    stats: bool = typer.Option(
+        False, "--stats", help="Print the counters of every stage to stderr."
+    ),
+) -> None:
+    """List every value in the JSON data files of the package."""
+    # The pipeline runs on asyncio, which the other commands needn't import.
+    from ._pipeline import resource_documents
+    from ._pipeline import resource_pipeline
+
+    pipeline = resource_pipeline()
+    write_rows(pipeline.run(resource_documents()), selected_format(context))
+    if stats:
+        for stage_stats in pipeline.stats:
+            typer.echo(stage_stats.format(), err=True)
+
+
+@cli.command()
+def schedule(
+    config: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="A TOML file with the jobs to run."
+    ),
+    run_for: Optional[float] = typer.Option(
+        None, "--run-for", min=0, help="Stop after this many seconds instead of on a signal."
+    ),
+) -> None:
+    """Run commands on a schedule in this process, until interrupted or terminated."""
+    # Imported here, so that the other commands don't pay for importing asyncio.
+    import asyncio
+
+    from ._scheduler import Scheduler
+    from ._scheduler import load_jobs
+
+    try:
+        jobs = load_jobs(config)
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="CONFIG") from None
+    scheduler = Scheduler()
+    for job in jobs:
+        scheduler.add(job)
+    try:
+        asyncio.run(scheduler.serve(run_for))
+    finally:
+        for job_stats in scheduler.stats.values():
+            typer.echo(job_stats.format(), err=True)
 
 
 if __name__ == "__main__":  # pragma: no cover
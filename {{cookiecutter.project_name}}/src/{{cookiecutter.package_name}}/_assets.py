@@ -7,12 +7,384 @@ SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AG
 
 from __future__ import annotations
 
+import atexit
+import json
+import multiprocessing
+import struct
+from bisect import bisect_left
+from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import Sequence
 from importlib.resources import files
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any
+from typing import overload
+
+from ._tracing import span
 
 
 # The root of the package. This may not be a path if the package is installed, so just access the Traversable.
-PACKAGE = files(__package__)
+# Named rather than taken from __package__, which mypyc sets only after the module has run.
+PACKAGE = files("{{cookiecutter.package_name}}")
 # If you use all of your files in a folder like `assets` or `resources` (recommended), use the following line.
 RESOURCES = PACKAGE / "resources"
 
-__all__ = ("RESOURCES",)
+# Layout of a shared resource: magic, kind, string count, count + 1 offsets, then the UTF-8 blob.
+# A mapping stores its sorted keys followed by their values, so it holds twice as many strings.
+_MAGIC = b"NEOPYSR1"
+_HEADER = struct.Struct("=8sQQ")
+_OFFSET = struct.Struct("=Q")
+_KIND_SEQUENCE = 0
+_KIND_MAPPING = 1
+
+# Resources this process hasn't closed yet. They are closed at exit, which also removes the
+# segments this process published.
+_open: set[SharedResource] = set()
+
+
+def load_json(name: str) -> Any:
+    """Load a JSON resource from ``RESOURCES``.
+
+    Args:
+        name: The name of the resource, like ``data.json``.
+
+    Returns:
+        The parsed resource.
+    """
+    with span("assets.load", resource=name), (RESOURCES / name).open() as json_fp:
+        return json.load(json_fp)
+
+
+class SharedStrings(Sequence[str]):
+    """Read-only sequence of strings laid out as an offset table and a UTF-8 blob."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        """Wrap an offset table and the blob it points into.
+
+        Args:
+            offsets: ``len + 1`` unsigned 64-bit offsets into ``blob``.
+            blob: The UTF-8 encoded strings, back to back.
+        """
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        """Return the number of strings.
+
+        Returns:
+            The number of strings.
+        """
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str:  # noqa: D105
+        ...  # pragma: no cover
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]:  # noqa: D105
+        ...  # pragma: no cover
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        """Decode one string, or a list of them for a slice.
+
+        Args:
+            index: The position or slice of positions.
+
+        Returns:
+            The decoded string or strings.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("shared string index out of range")
+        return str(self.raw(index), "utf-8")
+
+    def raw(self, index: int) -> bytes:
+        """Return one string without decoding it.
+
+        Args:
+            index: The non-negative position.
+
+        Returns:
+            The UTF-8 encoded string.
+        """
+        return self._blob[self._offsets[index] : self._offsets[index + 1]].tobytes()
+
+    def release(self) -> None:
+        """Release the views into shared memory so the segment can be closed."""
+        self._offsets.release()
+        self._blob.release()
+
+
+class SharedMapping(Mapping[str, str]):
+    """Read-only string-to-string mapping over sorted :class:`SharedStrings`."""
+
+    def __init__(self, strings: SharedStrings) -> None:
+        """Wrap a table of sorted keys followed by their values.
+
+        Args:
+            strings: The keys in sorted order, then the value of each key in the same order.
+        """
+        self._strings = strings
+        self._length = len(strings) // 2
+        self._keys: list[str] | None = None
+
+    def _key_table(self) -> list[str]:
+        # Bisecting decoded strings is a C loop; decoding a key at every step of the search
+        # made each lookup two orders of magnitude slower than a dictionary.
+        if self._keys is None:
+            self._keys = self._strings[: self._length]
+        return self._keys
+
+    def __getitem__(self, key: str) -> str:
+        """Look a key up with a binary search over the decoded keys.
+
+        The keys are decoded once per mapping, on the first lookup, and kept by this
+        process. Values stay in shared memory and are decoded one at a time.
+
+        Args:
+            key: The key.
+
+        Returns:
+            The value of the key.
+
+        Raises:
+            KeyError: If the key is missing.
+        """
+        keys = self._key_table()
+        position = bisect_left(keys, key)
+        if position == self._length or keys[position] != key:
+            raise KeyError(key)
+        return str(self._strings.raw(self._length + position), "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys in sorted order.
+
+        Returns:
+            An iterator over the keys.
+        """
+        return iter(self._key_table())
+
+    def __len__(self) -> int:
+        """Return the number of keys.
+
+        Returns:
+            The number of keys.
+        """
+        return self._length
+
+
+class SharedResource:
+    """A resource published to shared memory once and attached to by worker processes.
+
+    The parent calls :meth:`publish` (or :meth:`create`) and passes its ``name`` to its
+    workers, which call :meth:`attach`. Workers share the parent's pages instead of each
+    parsing their own copy. Use either as a context manager: leaving the block detaches,
+    and the publishing process also removes the segment. Segments the publisher never
+    closed are removed when it exits.
+    """
+
+    def __init__(self, segment: SharedMemory, *, owner: bool) -> None:
+        """Map a segment that holds a shared resource.
+
+        Use :meth:`publish`, :meth:`create` or :meth:`attach` instead.
+
+        Args:
+            segment: The shared memory segment.
+            owner: Whether this process created the segment and must remove it.
+
+        Raises:
+            ValueError: If the segment doesn't hold a shared resource.
+        """
+        self.segment = segment
+        self.owner = owner
+        buffer = segment.buf
+        magic, kind, count = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            segment.close()
+            raise ValueError(
+                f"shared memory segment {segment.name} does not hold a shared resource"
+            )
+        offsets_end = _HEADER.size + (count + 1) * _OFFSET.size
+        self.strings = SharedStrings(
+            buffer[_HEADER.size : offsets_end].cast("Q"), buffer[offsets_end:].toreadonly()
+        )
+        self._kind = kind
+        self._mapping: SharedMapping | None = None
+        _open.add(self)
+
+    @property
+    def name(self) -> str:
+        """The name of the segment, to be passed to :meth:`attach`."""
+        return self.segment.name
+
+    @property
+    def mapping(self) -> SharedMapping:
+        """The published mapping.
+
+        The same mapping is returned every time, so its keys are decoded once per process.
+
+        Returns:
+            The mapping of strings to strings.
+
+        Raises:
+            TypeError: If a sequence was published.
+        """
+        if self._kind != _KIND_MAPPING:
+            raise TypeError(f"shared memory segment {self.name} holds a sequence")
+        if self._mapping is None:
+            self._mapping = SharedMapping(self.strings)
+        return self._mapping
+
+    @property
+    def sequence(self) -> SharedStrings:
+        """The published sequence.
+
+        Returns:
+            The sequence of strings.
+
+        Raises:
+            TypeError: If a mapping was published.
+        """
+        if self._kind != _KIND_SEQUENCE:
+            raise TypeError(f"shared memory segment {self.name} holds a mapping")
+        return self.strings
+
+    @classmethod
+    def create(cls, data: Mapping[str, str] | Sequence[str]) -> SharedResource:
+        """Publish strings, or a mapping of strings to strings, to a new segment.
+
+        Only flat data is supported: numbers, nested lists or objects and other values that
+        aren't strings are rejected rather than converted.
+
+        Args:
+            data: The data to publish.
+
+        Returns:
+            The published resource, owned by this process.
+
+        Raises:
+            TypeError: If the data isn't made of strings only.
+        """
+        with span("assets.create"):
+            if isinstance(data, Mapping):
+                keys = sorted(data)
+                strings = [*keys, *(data[key] for key in keys)]
+                kind = _KIND_MAPPING
+            else:
+                strings = list(data)
+                kind = _KIND_SEQUENCE
+            if not all(isinstance(string, str) for string in strings):
+                raise TypeError("shared resources can only hold strings")
+
+            encoded = [string.encode() for string in strings]
+            offsets = [0]
+            for item in encoded:
+                offsets.append(offsets[-1] + len(item))
+            table = struct.pack(f"={len(offsets)}Q", *offsets)
+            blob = b"".join(encoded)
+
+            size = _HEADER.size + len(table) + len(blob)
+            segment = SharedMemory(create=True, size=size)
+            _HEADER.pack_into(segment.buf, 0, _MAGIC, kind, len(strings))
+            segment.buf[_HEADER.size : _HEADER.size + len(table)] = table
+            segment.buf[_HEADER.size + len(table) : size] = blob
+            return cls(segment, owner=True)
+
+    @classmethod
+    def publish(cls, name: str) -> SharedResource:
+        """Load a JSON resource from ``RESOURCES`` and publish it.
+
+        The resource must be a list of strings or an object whose values are all strings:
+        :meth:`create` raises ``TypeError`` for anything else.
+
+        Args:
+            name: The name of the resource, like ``data.json``.
+
+        Returns:
+            The published resource, owned by this process.
+        """
+        with span("assets.publish", resource=name):
+            return cls.create(load_json(name))
+
+    @classmethod
+    def attach(cls, name: str) -> SharedResource:
+        """Attach to a resource published by another process.
+
+        Args:
+            name: The ``name`` of the published resource.
+
+        Returns:
+            The resource, which this process must close but not remove.
+        """
+        with span("assets.attach"):
+            resource = cls(SharedMemory(name=name), owner=False)
+            # Before Python 3.13, attaching registers the segment with the resource tracker, which
+            # removes it when the processes sharing the tracker exit. The publisher and its
+            # multiprocessing children share one tracker, where the segment stays registered.
+            shares_tracker = multiprocessing.parent_process() is not None or any(
+                other.owner and other.name == resource.name for other in _open
+            )
+            if not shares_tracker:
+                resource_tracker.unregister(
+                    resource.segment._name, "shared_memory"  # type: ignore[attr-defined]
+                )
+            return resource
+
+    def close(self) -> None:
+        """Detach from the segment, and remove it if this process published it.
+
+        Closing a resource again does nothing.
+        """
+        if self not in _open:
+            return
+        _open.discard(self)
+        self.strings.release()
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+
+    def __enter__(self) -> SharedResource:
+        """Enter the lifetime of the resource.
+
+        Returns:
+            This resource.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the resource.
+
+        Args:
+            exc_type: The type of the exception raised in the block, if any.
+            exc_value: The exception raised in the block, if any.
+            traceback: The traceback of the exception, if any.
+        """
+        self.close()
+
+
+@atexit.register
+def _close_all() -> None:
+    for resource in list(_open):
+        resource.close()
+
+
+__all__ = (
+    "RESOURCES",
+    "SharedMapping",
+    "SharedResource",
+    "SharedStrings",
+    "load_json",
+)
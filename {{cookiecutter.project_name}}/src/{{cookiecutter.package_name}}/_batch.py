@@ -0,0 +1,191 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+# Without ``from __future__ import annotations``, pyupgrade leaves the ``Optional`` parameters
+# of the typer command alone; typer 0.9 can't parse the ``X | None`` it would rewrite them to.
+import os
+import sys
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from itertools import islice
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+import typer
+
+from ._output import selected_format
+from ._output import write_rows
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def read_records(paths: Iterable[Path]) -> Iterator[str]:
+    """Stream records, one per line, without reading whole files into memory.
+
+    Args:
+        paths: The files to read in order. ``-`` or no files at all reads standard input.
+
+    Yields:
+        Each line without its line ending.
+    """
+    paths = list(paths) or [Path("-")]
+    for path in paths:
+        if path == Path("-"):
+            yield from (line.rstrip("\r\n") for line in sys.stdin)
+            continue
+        with path.open(encoding="utf-8") as records_fp:
+            yield from (line.rstrip("\r\n") for line in records_fp)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split a stream into lists of a fixed size.
+
+    Args:
+        items: The stream.
+        size: The length of every list but the last.
+
+    Yields:
+        The lists, in order.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _apply(function: Callable[[T], R], chunk: list[T]) -> list[R]:
+    # Module-level so that process pools can pickle it.
+    return [function(item) for item in chunk]
+
+
+def _take(pending: deque[Future[list[R]]], ordered: bool) -> Iterator[list[R]]:
+    if ordered:
+        done = [pending.popleft()]
+    else:
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        done = [future for future in pending if future in finished]
+        for future in done:
+            pending.remove(future)
+    for future in done:
+        yield future.result()
+
+
+def process_records(
+    records: Iterable[T],
+    function: Callable[[T], R],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int | None = None,
+    processes: bool = False,
+    ordered: bool = True,
+    max_in_flight: int | None = None,
+) -> Iterator[list[R]]:
+    """Apply a function to a stream of records in chunks, concurrently.
+
+    At most ``max_in_flight`` chunks are submitted but not yet consumed, so a fast reader
+    can't pile up the whole input in memory ahead of slow workers or a slow consumer.
+
+    Args:
+        records: The stream of records.
+        function: What to apply to each record. It must be picklable if ``processes`` is set.
+        chunk_size: How many records each task processes.
+        workers: The number of threads or processes, by default the number of CPUs.
+        processes: Whether to use processes instead of threads, for CPU-bound functions.
+        ordered: Whether to yield results in input order, instead of as soon as they're ready.
+        max_in_flight: The bound on pending chunks, by default twice the number of workers.
+
+    Yields:
+        The results of each chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = max_in_flight or 2 * workers
+    executor: Executor = (
+        ProcessPoolExecutor(max_workers=workers)
+        if processes
+        else ThreadPoolExecutor(max_workers=workers)
+    )
+    with executor:
+        pending: deque[Future[list[R]]] = deque()
+        for chunk in chunked(records, chunk_size):
+            while len(pending) >= limit:
+                yield from _take(pending, ordered)
+            pending.append(executor.submit(_apply, function, chunk))
+        while pending:
+            yield from _take(pending, ordered)
+
+
+def batch_command(
+    app: typer.Typer, name: str | None = None
+) -> Callable[[Callable[[str], str]], Callable[[str], str]]:
+    """Register a function of one record as a streaming batch command of a typer app.
+
+    The command reads records from files or standard input and writes one ``result`` row
+    per record in the format selected with ``--output``. The function is returned unchanged.
+
+    Args:
+        app: The typer app to add the command to.
+        name: The name of the command, by default the name of the function with dashes.
+
+    Returns:
+        A decorator.
+    """
+
+    def decorator(function: Callable[[str], str]) -> Callable[[str], str]:
+        def command(
+            context: typer.Context,
+            files: Optional[List[Path]] = typer.Argument(
+                None, help="Files with one record per line. Reads stdin if none or '-' is given."
+            ),
+            chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, min=1, help="Records per task."),
+            workers: Optional[int] = typer.Option(
+                None, min=1, help="Workers, by default one per CPU."
+            ),
+            processes: bool = typer.Option(
+                False, "--processes", help="Use processes instead of threads."
+            ),
+            ordered: bool = typer.Option(
+                True, "--ordered/--unordered", help="Keep the input order."
+            ),
+        ) -> None:
+            chunks = process_records(
+                read_records(files or []),
+                function,
+                chunk_size=chunk_size,
+                workers=workers,
+                processes=processes,
+                ordered=ordered,
+            )
+            rows = ({"result": result} for chunk in chunks for result in chunk)
+            write_rows(rows, selected_format(context))
+
+        command.__doc__ = function.__doc__
+        app.command(name=name or function.__name__.replace("_", "-"))(command)
+        return function
+
+    return decorator
+
+
+__all__ = (
+    "DEFAULT_CHUNK_SIZE",
+    "batch_command",
+    "chunked",
+    "process_records",
+    "read_records",
+)
@@ -0,0 +1,303 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import pickle  # nosec
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from typing import TypeVar
+from typing import cast
+
+from ._memory import MIB
+from ._metadata import __version__
+
+
+# mypyc can't compile ParamSpec, so the decorator keeps the type of the function instead.
+F = TypeVar("F", bound=Callable[..., Any])
+
+CACHE_DIR_VARIABLE = "{{cookiecutter.environ_prefix}}CACHE_DIR"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+"""
+# Deletes the least recently used entries beyond the first ``max_size`` bytes.
+_EVICT = """
+DELETE FROM entries WHERE key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total FROM entries
+    ) WHERE total > ?
+)
+"""
+# How often expired and least recently used entries are removed, on average, while the
+# size limit's worth of bytes is written. Removing them on every write would scan the table.
+_EVICTIONS_PER_MAX_SIZE = 8
+# A hit refreshes the recency of an entry at most this often, in seconds, so most hits
+# don't write to the database.
+_ACCESS_RESOLUTION = 60.0
+_MISSING = object()
+
+
+def default_cache_dir() -> Path:
+    """Return the directory of the default cache.
+
+    Returns:
+        The directory named by ``{{cookiecutter.environ_prefix}}CACHE_DIR``, or a directory
+        for the current user in the temporary directory.
+    """
+    override = os.environ.get(CACHE_DIR_VARIABLE)
+    if override:
+        return Path(override)
+    user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return Path(tempfile.gettempdir(), f"{__package__}-cache-{user}")
+
+
+class DiskCache:
+    """A size-bounded LRU cache of pickled values in a SQLite database.
+
+    Any number of threads and processes can share the same database: SQLite's write-ahead
+    log lets readers proceed while one writer holds the lock, and writers wait for each
+    other for up to ``timeout`` seconds.
+
+    Expired and least recently used entries are removed now and then rather than on every
+    write, so the database can exceed ``max_size`` by about an eighth, and the recency of
+    entries is only tracked to the minute.
+
+    Values are unpickled when read, so the database must only be writable by its owner.
+    The directory is created private to the current user, and an existing one owned by
+    someone else is refused.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_size: int = 64 * MIB,
+        ttl: float | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        """Open or create a cache.
+
+        Args:
+            directory: Where to keep the database.
+            max_size: The total size of the pickled values to keep, in bytes.
+            ttl: The default lifetime of an entry in seconds, or None to keep it until evicted.
+            timeout: How long to wait for another process to finish writing, in seconds.
+
+        Raises:
+            PermissionError: If the directory belongs to another user.
+        """
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if hasattr(os, "getuid") and directory.stat().st_uid != os.getuid():
+            raise PermissionError(f"cache directory {directory} belongs to another user")
+        self.path = directory / "cache.sqlite"
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't cross threads, and must not be used after a fork.
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            # The journal mode is stored in the database. Switching it takes an exclusive lock,
+            # which the busy timeout doesn't always wait for, so only the first connection does.
+            if connection.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+                connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        """Read an entry and mark it as recently used.
+
+        Args:
+            key: The key of the entry.
+            default: What to return if the entry is missing or expired.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, accessed FROM entries"
+            " WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return default
+        value, accessed = row
+        if now - accessed >= _ACCESS_RESOLUTION:
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)  # nosec
+
+    def set(self, key: bytes, value: Any, ttl: float | None = None) -> None:
+        """Write an entry, and now and then evict expired and least recently used entries.
+
+        Eviction runs with a probability proportional to the size of the entry, so that it
+        happens about every ``max_size / 8`` bytes written, however many processes write.
+
+        Args:
+            key: The key of the entry.
+            value: Anything that can be pickled.
+            ttl: The lifetime of the entry in seconds, instead of the default one.
+        """
+        now = time.time()
+        lifetime = self.ttl if ttl is None else ttl
+        expires = None if lifetime is None else now + lifetime
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        connection = self._connection()
+        # Commits, or rolls back on error. Taking the write lock up front makes concurrent
+        # writers wait for each other instead of failing to upgrade a read lock.
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), expires, now),
+            )
+            if random.random() * self.max_size < len(blob) * _EVICTIONS_PER_MAX_SIZE:  # nosec
+                connection.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+                connection.execute(_EVICT, (self.max_size,))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._connection().execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __len__(self) -> int:
+        """Return the number of entries, including expired ones that weren't evicted yet.
+
+        Returns:
+            The number of entries.
+        """
+        count: int = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return count
+
+
+@functools.cache
+def default_cache() -> DiskCache:
+    """Return the cache shared by every memoized function.
+
+    Returns:
+        A cache in the directory of ``default_cache_dir()``, opened on first use.
+    """
+    return DiskCache(default_cache_dir())
+
+
+def _canonical(value: Any) -> Any:
+    # Sets pickle in iteration order, which depends on the hash seed of the process for
+    # strings, so they are replaced by their pickled items in sorted order.
+    if isinstance(value, (set, frozenset)):
+        items = sorted(
+            pickle.dumps(_canonical(item), protocol=pickle.HIGHEST_PROTOCOL) for item in value
+        )
+        return ("<set>", tuple(items))
+    if type(value) is tuple:
+        return tuple(_canonical(item) for item in value)
+    if type(value) is list:
+        return [_canonical(item) for item in value]
+    if type(value) is dict:
+        return {_canonical(key): _canonical(item) for key, item in value.items()}
+    return value
+
+
+def cache_key(
+    function: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    version: str = __version__,
+) -> bytes:
+    """Derive the key of a call.
+
+    The key includes the version of the package, so upgrading invalidates every entry.
+    Sets, including those in tuples, lists and dicts, give the same key in every process.
+    Sets inside other objects don't, so pass them directly.
+
+    Args:
+        function: The memoized function.
+        args: The positional arguments of the call.
+        kwargs: The keyword arguments of the call.
+        version: The version of the package.
+
+    Returns:
+        A SHA-256 digest of the function, the version and the pickled arguments.
+    """
+    call = (
+        function.__module__,
+        function.__qualname__,
+        version,
+        _canonical(args),
+        sorted(_canonical(kwargs).items()),
+    )
+    return hashlib.sha256(pickle.dumps(call, protocol=pickle.HIGHEST_PROTOCOL)).digest()
+
+
+def memoize(*, ttl: float | None = None, cache: DiskCache | None = None) -> Callable[[F], F]:
+    """Cache the results of a function on disk, across runs and processes.
+
+    The arguments and the result must be picklable. Use it for expensive, deterministic
+    work: a hit still costs a database read.
+
+    Args:
+        ttl: How long results stay valid in seconds, or None to keep them until evicted.
+        cache: Where to keep the results, instead of :func:`default_cache`.
+
+    Returns:
+        A decorator.
+    """
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            store = cache if cache is not None else default_cache()
+            key = cache_key(function, args, kwargs)
+            result = store.get(key, _MISSING)
+            if result is _MISSING:
+                result = function(*args, **kwargs)
+                store.set(key, result, ttl)
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+__all__ = (
+    "CACHE_DIR_VARIABLE",
+    "DiskCache",
+    "cache_key",
+    "default_cache",
+    "default_cache_dir",
+    "memoize",
+)
@@ -0,0 +1,439 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import sys
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+from typing import Any
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    import click
+
+# This module is imported on every Tab press, so it must stay cheap to import: typer, click,
+# rich and the command modules are only imported when the command line actually runs.
+
+# A module compiled by mypyc gets its __file__ only after it has run, so use the package's.
+_PACKAGE_DIRECTORY = os.path.dirname(sys.modules["{{cookiecutter.package_name}}"].__file__ or "")
+INDEX = os.path.join(_PACKAGE_DIRECTORY, "resources", "completion.json")
+FULL_COMPLETION_VARIABLE = "{{cookiecutter.environ_prefix}}FULL_COMPLETION"
+SHELLS = ("bash", "zsh", "fish")
+
+Index = Mapping[str, Any]
+Node = Mapping[str, Any]
+
+
+def complete_variable(prog_name: str) -> str:
+    """Return the environment variable click sets to request completions.
+
+    Args:
+        prog_name: The name the program was invoked as.
+
+    Returns:
+        The name of the variable, like ``_PROG_NAME_COMPLETE``.
+    """
+    return f"_{prog_name}_COMPLETE".replace("-", "_").replace(".", "_").upper()
+
+
+def load_index(path: str = INDEX) -> Index | None:
+    """Load the command tree generated by ``tools/generate-completions.py``.
+
+    Args:
+        path: The index file.
+
+    Returns:
+        The index, or None if it doesn't exist.
+    """
+    try:
+        with open(path, encoding="utf-8") as index_fp:
+            index: Index = json.load(index_fp)
+    except FileNotFoundError:
+        return None
+    return index
+
+
+def _split(line: str) -> list[str]:
+    # Like click.parser.split_arg_string: an unterminated quote ends the last word.
+    lexer = shlex.shlex(line, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    words = []
+    try:
+        for word in lexer:
+            words.append(word)
+    except ValueError:
+        words.append(lexer.token)
+    return words
+
+
+def _option(node: Node, word: str) -> Node | None:
+    name = word.partition("=")[0]
+    option: Node
+    for option in node["options"]:
+        if name in option["names"]:
+            return option
+    return None
+
+
+def candidates(index: Index, args: list[str], incomplete: str) -> list[tuple[str, str]] | None:
+    """Find the completions of a word from the index.
+
+    Args:
+        index: The command tree.
+        args: The words before the one being completed, without the program name.
+        incomplete: The word being completed.
+
+    Returns:
+        Pairs of completion and help, or None if only the full program can answer.
+    """
+    path = ""
+    node = index["commands"][path]
+    expecting: Node | None = None
+    for word in args:
+        if expecting is not None:
+            expecting = None
+            continue
+        option = _option(node, word)
+        if option is not None:
+            if option["value"] and "=" not in word:
+                expecting = option
+        elif word in node["commands"]:
+            path = f"{path} {word}".strip()
+            node = index["commands"][path]
+
+    if expecting is None and incomplete.startswith("-"):
+        return [
+            (name, option["help"])
+            for option in node["options"]
+            for name in option["names"]
+            if name.startswith(incomplete)
+        ]
+    if expecting is None and node["commands"]:
+        return [
+            (name, help) for name, help in node["commands"].items() if name.startswith(incomplete)
+        ]
+
+    value = expecting or node["arguments"]
+    if value is None:
+        return []
+    if value["dynamic"]:
+        return None
+    return [(choice, "") for choice in value["choices"] if choice.startswith(incomplete)]
+
+
+def _quote_zsh(text: str) -> str:
+    escaped = text.replace('"', '""').replace("'", "''").replace("$", "\\$").replace("`", "\\`")
+    return '"' + escaped + '"'
+
+
+def complete(
+    environ: Mapping[str, str], prog_name: str, index_path: str = INDEX
+) -> tuple[str, int] | None:
+    """Answer a completion request of the scripts installed by ``--install-completion``.
+
+    Args:
+        environ: The environment of the request.
+        prog_name: The name the program was invoked as.
+        index_path: The index file.
+
+    Returns:
+        What to print and the exit status, or None to let the full program answer.
+    """
+    instruction = environ.get(complete_variable(prog_name), "")
+    shell = instruction.partition("_")[2]
+    if not instruction.startswith("complete_") or shell not in SHELLS:
+        return None
+    if environ.get(FULL_COMPLETION_VARIABLE):
+        return None
+    index = load_index(index_path)
+    if index is None:
+        return None
+
+    if shell == "bash":
+        words = _split(environ.get("COMP_WORDS", ""))
+        cword = int(environ.get("COMP_CWORD", "0"))
+        args = words[1:cword]
+        incomplete = words[cword] if cword < len(words) else ""
+    else:
+        line = environ.get("_TYPER_COMPLETE_ARGS", "")
+        args = _split(line)[1:]
+        incomplete = args.pop() if args and not line.endswith(" ") else ""
+
+    items = candidates(index, args, incomplete)
+    if items is None:
+        return None
+    if shell == "bash":
+        return "\n".join(value for value, _ in items), 0
+    if shell == "zsh":
+        if not items:
+            return "_files", 0
+        formatted = "\n".join(
+            f"{_quote_zsh(value)}:{_quote_zsh(help)}" if help else _quote_zsh(value)
+            for value, help in items
+        )
+        return f"_arguments '*: :(({formatted}))'", 0
+    if environ.get("_TYPER_COMPLETE_FISH_ACTION") == "is-args":
+        # Exiting with an error lets fish fall back to completing files.
+        return "", 0 if items else 1
+    return (
+        "\n".join(f"{value}\t{' '.join(help.split())}" if help else value for value, help in items),
+        0,
+    )
+
+
+def main() -> None:
+    """Run the command line, answering completion requests without importing it."""
+    answer = complete(os.environ, os.path.basename(sys.argv[0]))
+    if answer is not None:
+        output, status = answer
+        if output:
+            sys.stdout.write(output + "\n")
+        sys.exit(status)
+
+    from .__main__ import cli
+
+    cli()
+
+
+def build_index(command: click.Command, prog_name: str) -> dict[str, Any]:
+    """Describe a command tree for :func:`candidates`.
+
+    Args:
+        command: The root click command, like ``typer.main.get_command(cli)``.
+        prog_name: The name of the installed program.
+
+    Returns:
+        The index, ready to be saved as JSON.
+    """
+    import click
+
+    commands: dict[str, Any] = {}
+
+    def values(param: click.Parameter) -> dict[str, Any]:
+        choices = list(param.type.choices) if isinstance(param.type, click.Choice) else []
+        # Custom completion callbacks need the full program to run.
+        return {"choices": choices, "dynamic": param._custom_shell_complete is not None}
+
+    def visit(command: click.Command, path: str) -> None:
+        context = click.Context(command, info_name=prog_name)
+        options = []
+        arguments: dict[str, Any] | None = None
+        for param in command.get_params(context):
+            if isinstance(param, click.Option) and not param.hidden:
+                options.append(
+                    {
+                        "names": [*param.opts, *param.secondary_opts],
+                        "help": param.help or "",
+                        "value": not param.is_flag and not param.count,
+                        **values(param),
+                    }
+                )
+            elif isinstance(param, click.Argument) and arguments is None:
+                arguments = values(param)
+        subcommands = {}
+        if isinstance(command, click.Group):
+            for name, subcommand in command.commands.items():
+                if not subcommand.hidden:
+                    subcommands[name] = subcommand.get_short_help_str(limit=80)
+                    visit(subcommand, f"{path} {name}".strip())
+        commands[path] = {"options": options, "arguments": arguments, "commands": subcommands}
+
+    visit(command, "")
+    return {"prog": prog_name, "commands": commands}
+
+
+def _walk(index: Index, words: str) -> list[str]:
+    # Shell code that follows the subcommands typed so far into $cmdpath.
+    lines = [
+        '    local cmdpath="" i',
+        f"    for (({words})); do",
+        '        case "$cmdpath:${words_i}" in',
+    ]
+    for path, node in index["commands"].items():
+        for name in node["commands"]:
+            pattern = shlex.quote(f"{path}:{name}")
+            lines.append(
+                f"            {pattern}) cmdpath={shlex.quote(f'{path} {name}'.strip())} ;;"
+            )
+    lines += ["        esac", "    done"]
+    return lines
+
+
+def _option_values(index: Index, complete: str) -> list[str]:
+    # Shell code that completes the choices of the option before the cursor, if it has any.
+    lines = []
+    for path, node in index["commands"].items():
+        for option in node["options"]:
+            if option["value"]:
+                patterns = "|".join(shlex.quote(f"{path}:{name}") for name in option["names"])
+                choices = " ".join(map(shlex.quote, option["choices"]))
+                action = f"{complete.format(choices=choices)}; " if choices else ""
+                lines.append(f"        {patterns}) {action}return ;;")
+    return lines
+
+
+def _render_bash(index: Index, function: str) -> list[str]:
+    lines = [
+        function + "() {",
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    local options="" commands=""',
+        *_walk(index, "i = 1; i < COMP_CWORD; i++"),
+        '    case "$cmdpath:$prev" in',
+        *_option_values(index, 'COMPREPLY=($(compgen -W "{choices}" -- "$cur"))'),
+        "    esac",
+        '    case "$cmdpath" in',
+    ]
+    for path, node in index["commands"].items():
+        options = shlex.quote(
+            " ".join(name for option in node["options"] for name in option["names"])
+        )
+        commands = shlex.quote(" ".join(node["commands"]))
+        lines.append(f"        {shlex.quote(path)}) options={options}; commands={commands} ;;")
+    lines += [
+        "    esac",
+        "    if [[ $cur == -* ]]; then",
+        '        COMPREPLY=($(compgen -W "$options" -- "$cur"))',
+        "    else",
+        '        COMPREPLY=($(compgen -W "$commands" -- "$cur"))',
+        "    fi",
+        "}",
+        "",
+        f"complete -o default -F {function} {index['prog']}",
+    ]
+    return [line.replace("${words_i}", "${COMP_WORDS[i]}") for line in lines]
+
+
+def _render_zsh(index: Index, function: str) -> list[str]:
+    def describe(name: str, help: str) -> str:
+        entry = name.replace(":", "\\:") + (f":{' '.join(help.split())}" if help else "")
+        return shlex.quote(entry)
+
+    lines = [
+        f"#compdef {index['prog']}",
+        "",
+        function + "() {",
+        "    local -a options commands",
+        *_walk(index, "i = 2; i < CURRENT; i++"),
+        '    case "$cmdpath:${words[CURRENT-1]}" in',
+        *_option_values(index, "compadd -- {choices}"),
+        "    esac",
+        '    case "$cmdpath" in',
+    ]
+    for path, node in index["commands"].items():
+        options = " ".join(
+            describe(name, option["help"]) for option in node["options"] for name in option["names"]
+        )
+        commands = " ".join(describe(name, help) for name, help in node["commands"].items())
+        lines.append(f"        {shlex.quote(path)}) options=({options}); commands=({commands}) ;;")
+    lines += [
+        "    esac",
+        "    if [[ ${words[CURRENT]} == -* ]]; then",
+        "        _describe option options",
+        "    elif (( $#commands )); then",
+        "        _describe command commands",
+        "    else",
+        "        _files",
+        "    fi",
+        "}",
+        "",
+        "if [[ $zsh_eval_context[-1] == loadautofunc ]]; then",
+        f'    {function} "$@"',
+        "else",
+        f"    compdef {function} {index['prog']}",
+        "fi",
+    ]
+    return [line.replace("${words_i}", "${words[i]}") for line in lines]
+
+
+def _quote_fish(text: str) -> str:
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _fish_option_flags(option: Node) -> list[str]:
+    flags = []
+    for name in option["names"]:
+        if name.startswith("--"):
+            flags.append(f"-l {name[2:]}")
+        else:
+            flags.append(f"-{'s' if len(name) == 2 else 'o'} {name[1:]}")
+    if option["value"]:
+        flags.append("-r")
+    if option["choices"]:
+        flags.append(f"-f -a {_quote_fish(' '.join(option['choices']))}")
+    if option["help"]:
+        flags.append(f"-d {_quote_fish(' '.join(option['help'].split()))}")
+    return flags
+
+
+def _render_fish(index: Index) -> list[str]:
+    prog = index["prog"]
+    lines = []
+    for path, node in index["commands"].items():
+        condition = (
+            f"__fish_seen_subcommand_from {path.split()[-1]}" if path else "__fish_use_subcommand"
+        )
+        prefix = f"complete -c {prog} -n {_quote_fish(condition)}"
+        if node["commands"] or (node["arguments"] is not None and node["arguments"]["choices"]):
+            # No files where only subcommands or choices are valid.
+            lines.append(f"{prefix} -f")
+        for name, help in node["commands"].items():
+            lines.append(
+                f"{prefix} -a {_quote_fish(name)} -d {_quote_fish(' '.join(help.split()))}"
+            )
+        if node["arguments"] is not None and node["arguments"]["choices"]:
+            lines.append(f"{prefix} -a {_quote_fish(' '.join(node['arguments']['choices']))}")
+        for option in node["options"]:
+            lines.append(f"{prefix} {' '.join(_fish_option_flags(option))}")
+    return lines
+
+
+def render_script(index: Index, shell: str) -> str:
+    """Render a static completion script that never runs the program.
+
+    Args:
+        index: The command tree.
+        shell: One of ``SHELLS``.
+
+    Returns:
+        The script.
+
+    Raises:
+        ValueError: If the shell isn't supported.
+    """
+    function = "_" + index["prog"].replace("-", "_").replace(".", "_") + "_static_completion"
+    header = f"# {shell} completion for {index['prog']}, generated from its command tree."
+    if shell == "bash":
+        lines = _render_bash(index, function)
+    elif shell == "zsh":
+        lines = _render_zsh(index, function)
+        # The #compdef line must come first.
+        lines.insert(1, header)
+        return "\n".join(lines) + "\n"
+    elif shell == "fish":
+        lines = _render_fish(index)
+    else:
+        raise ValueError(f"unsupported shell {shell!r}, expected one of {', '.join(SHELLS)}")
+    return "\n".join([header, *lines]) + "\n"
+
+
+__all__ = (
+    "FULL_COMPLETION_VARIABLE",
+    "INDEX",
+    "SHELLS",
+    "build_index",
+    "candidates",
+    "complete",
+    "complete_variable",
+    "load_index",
+    "main",
+    "render_script",
+)
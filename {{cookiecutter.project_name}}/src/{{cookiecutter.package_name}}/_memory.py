@@ -0,0 +1,226 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+
+
+MIB = 1024 * 1024
+
+# Allocations made by the tracker itself or by the import machinery are noise in a report.
+# Compiled by mypyc, this module has no __file__ while it runs, nor frames to trace, so it is
+# matched by a pattern.
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "*/" + __name__.replace(".", "/") + ".py"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# The trackers that are tracing, outermost first.
+_active: list[MemoryTracker] = []
+
+
+def format_size(size: int) -> str:
+    """Format a number of bytes for humans.
+
+    Args:
+        size: The number of bytes.
+
+    Returns:
+        The size in the largest unit that keeps it above one.
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def peak_rss() -> int | None:
+    """Return the peak resident set size of this process.
+
+    This is a high-water mark for the whole process, not just the tracked block.
+
+    Returns:
+        The peak resident set size in bytes, or None if the platform doesn't report it.
+    """
+    if sys.platform == "win32":  # pragma: no cover
+        return None
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes, macOS reports bytes.
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    """A source line and the memory still allocated by it."""
+
+    filename: str
+    lineno: int
+    size: int
+    count: int
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Memory used while a :class:`MemoryTracker` was active.
+
+    ``rss_peak`` is the high-water mark of the whole process when the tracker exited, which
+    earlier code may have set, so it is reported for context rather than budgeted.
+    """
+
+    traced_peak: int
+    rss_peak: int | None
+    top: tuple[AllocationSite, ...]
+
+    def format(self) -> str:
+        """Render the report as human-readable text.
+
+        Returns:
+            The peaks followed by one line per allocation site.
+        """
+        rss = "unavailable" if self.rss_peak is None else format_size(self.rss_peak)
+        lines = [f"traced peak: {format_size(self.traced_peak)}", f"process rss peak: {rss}"]
+        lines.extend(
+            f"  {format_size(site.size):>10} in {site.count:>6} blocks  {site.filename}:{site.lineno}"
+            for site in self.top
+        )
+        return "\n".join(lines)
+
+
+class MemoryTracker:
+    """Context manager that measures memory allocated by the code it wraps.
+
+    If ``enabled`` is false, entering and exiting does nothing and ``report`` stays None,
+    so the tracker can wrap code unconditionally. Trackers may nest: each reports the peak of
+    its own block.
+    """
+
+    def __init__(self, *, enabled: bool = True, limit: int = 10) -> None:
+        """Create a tracker.
+
+        Args:
+            enabled: Whether to trace allocations at all.
+            limit: How many of the largest allocation sites to keep in the report.
+        """
+        self.enabled = enabled
+        self.limit = limit
+        self.report: MemoryReport | None = None
+        self._started = False
+        # The peak before a nested tracker reset it.
+        self._earlier_peak = 0
+
+    def __enter__(self) -> MemoryTracker:
+        """Start tracing allocations.
+
+        Returns:
+            This tracker.
+        """
+        if self.enabled:
+            # Nested trackers share the tracer that is already running, and save the peak
+            # of the enclosing ones before resetting it.
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+            _, peak = tracemalloc.get_traced_memory()
+            for tracker in _active:
+                tracker._earlier_peak = max(tracker._earlier_peak, peak)
+            tracemalloc.reset_peak()
+            self._earlier_peak = 0
+            _active.append(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop tracing and build the report.
+
+        Args:
+            exc_type: The type of the exception raised in the block, if any.
+            exc_value: The exception raised in the block, if any.
+            traceback: The traceback of the exception, if any.
+        """
+        if not self.enabled:
+            return
+        _active.remove(self)
+        _, peak = tracemalloc.get_traced_memory()
+        traced_peak = max(peak, self._earlier_peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        if self._started:
+            tracemalloc.stop()
+        self.report = MemoryReport(
+            traced_peak=traced_peak,
+            rss_peak=peak_rss(),
+            top=tuple(
+                AllocationSite(
+                    filename=stat.traceback[0].filename,
+                    lineno=stat.traceback[0].lineno,
+                    size=stat.size,
+                    count=stat.count,
+                )
+                for stat in snapshot.statistics("lineno")[: self.limit]
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class MemoryBudget:
+    """Upper bounds for a :class:`MemoryReport`, usually read from ``[tool.memory-budget]``."""
+
+    traced_peak_mib: float | None = None
+
+    @classmethod
+    def from_mapping(cls, table: Mapping[str, Any]) -> MemoryBudget:
+        """Build a budget from a ``[tool.memory-budget]`` table.
+
+        Args:
+            table: The parsed table. Missing keys leave that budget unenforced.
+
+        Returns:
+            The budget.
+        """
+        return cls(traced_peak_mib=table.get("traced-peak-mib"))
+
+    def violations(self, report: MemoryReport) -> list[str]:
+        """Compare a report against this budget.
+
+        Args:
+            report: The report to check.
+
+        Returns:
+            A message for every budget the report exceeds.
+        """
+        violations = []
+        if self.traced_peak_mib is not None and report.traced_peak > self.traced_peak_mib * MIB:
+            violations.append(
+                f"traced peak {format_size(report.traced_peak)} exceeds {self.traced_peak_mib:g} MiB"
+            )
+        return violations
+
+
+__all__ = (
+    "AllocationSite",
+    "MemoryBudget",
+    "MemoryReport",
+    "MemoryTracker",
+    "format_size",
+    "peak_rss",
+)
@@ -0,0 +1,175 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import sys
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any
+from typing import BinaryIO
+
+import typer
+
+
+Row = Mapping[str, Any]
+Styles = Mapping[str, Mapping[str, Any]]
+
+BUFFER_SIZE = 1 << 16
+
+
+class OutputFormat(str, Enum):
+    """How commands render their results."""
+
+    TEXT = "text"
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def selected_format(context: typer.Context) -> OutputFormat:
+    """Return the format chosen with the ``--output`` option of the root command.
+
+    Args:
+        context: The context of the running command.
+
+    Returns:
+        The chosen format, or text if the root command has no ``--output`` option.
+    """
+    # Click keeps the raw choice; typer only converts it to the enum for the callback.
+    return OutputFormat(context.find_root().params.get("output") or OutputFormat.TEXT)
+
+
+def use_color(stream: BinaryIO) -> bool:
+    """Decide whether to style text for a stream.
+
+    Args:
+        stream: Where the text goes.
+
+    Returns:
+        True if the stream is a terminal and ``NO_COLOR`` isn't set.
+    """
+    return stream.isatty() and "NO_COLOR" not in os.environ
+
+
+def _text(rows: Iterable[Row], styles: Styles, color: bool) -> Iterator[str]:
+    if not (color and styles):
+        for row in rows:
+            yield " ".join(map(str, row.values())) + "\n"
+        return
+    for row in rows:
+        values = (
+            typer.style(str(value), **styles[key]) if color and key in styles else str(value)
+            for key, value in row.items()
+        )
+        yield " ".join(values) + "\n"
+
+
+def _json(rows: Iterable[Row]) -> Iterator[str]:
+    # A streamed array: one element per line, without holding the rows in memory.
+    separator = "[\n"
+    for row in rows:
+        yield separator + json.dumps(row, default=str)
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+def _ndjson(rows: Iterable[Row]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+
+
+def _csv(rows: Iterable[Row]) -> Iterator[str]:
+    # The header comes from the keys of the first row.
+    buffer = io.StringIO()
+    writer: csv.DictWriter[str] | None = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row), lineterminator="\n")
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def write_rows(
+    rows: Iterable[Row],
+    output: OutputFormat = OutputFormat.TEXT,
+    stream: BinaryIO | None = None,
+    *,
+    styles: Styles | None = None,
+    color: bool | None = None,
+    buffer_size: int = BUFFER_SIZE,
+) -> int:
+    """Render rows in a format and write them to a binary stream.
+
+    Rows are consumed one at a time, so a generator of any length is written in constant
+    memory. The output is collected into writes of about ``buffer_size`` bytes.
+
+    Args:
+        rows: Mappings of column names to values. Values that JSON can't represent are
+            written as strings.
+        output: The format to render the rows in.
+        stream: The binary stream to write to, by default standard output.
+        styles: Keyword arguments of :func:`typer.style` for columns of the text format.
+        color: Whether to apply ``styles``, by default only if the stream is a terminal.
+        buffer_size: How many characters to collect before each write.
+
+    Returns:
+        The number of rows written.
+    """
+    if stream is None:
+        sys.stdout.flush()
+        stream = sys.stdout.buffer
+    if color is None:
+        color = use_color(stream)
+
+    count = 0
+
+    def counted() -> Iterator[Row]:
+        nonlocal count
+        for count, row in enumerate(rows, 1):  # noqa: B007
+            yield row
+
+    if output is OutputFormat.TEXT:
+        pieces = _text(counted(), styles or {}, color)
+    elif output is OutputFormat.JSON:
+        pieces = _json(counted())
+    elif output is OutputFormat.NDJSON:
+        pieces = _ndjson(counted())
+    else:
+        pieces = _csv(counted())
+
+    pending: list[str] = []
+    size = 0
+    for piece in pieces:
+        pending.append(piece)
+        size += len(piece)
+        if size >= buffer_size:
+            stream.write("".join(pending).encode())
+            pending.clear()
+            size = 0
+    stream.write("".join(pending).encode())
+    stream.flush()
+    return count
+
+
+__all__ = (
+    "BUFFER_SIZE",
+    "OutputFormat",
+    "Row",
+    "selected_format",
+    "use_color",
+    "write_rows",
+)
@@ -0,0 +1,490 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+from typing import TypeVar
+
+from ._assets import RESOURCES
+from ._tracing import span
+
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_QUEUE_SIZE = 4
+# The data files among the resources, which also hold the completion index of the CLI.
+DOCUMENTS = ("data.json",)
+
+# Posted to a queue once every worker writing to it is done.
+_END = object()
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A step of a pipeline: a generator function from a stream of items to a stream of results.
+
+    Every worker of the stage calls the function once, with an iterator over the items it
+    takes from the shared input queue. Generator functions run in threads, one per worker;
+    async generator functions run as tasks on the event loop.
+    """
+
+    function: Callable[[Any], Any]
+    name: str
+    workers: int = 1
+    batch_size: int | None = None
+    queue_size: int | None = None
+
+
+def stage(
+    *,
+    name: str | None = None,
+    workers: int = 1,
+    batch_size: int | None = None,
+    queue_size: int | None = None,
+) -> Callable[[Callable[[Any], Any]], Stage]:
+    """Turn a generator function or an async generator function into a pipeline stage.
+
+    Args:
+        name: The name of the stage in its statistics, by default the name of the function.
+        workers: How many generators consume the input of the stage concurrently.
+        batch_size: How many results to pass to the next stage at once, by default the
+            batch size of the pipeline.
+        queue_size: How many batches may wait for the next stage, by default the queue size
+            of the pipeline.
+
+    Returns:
+        A decorator.
+    """
+
+    def decorator(function: Callable[[Any], Any]) -> Stage:
+        return Stage(function, name or function.__name__, workers, batch_size, queue_size)
+
+    return decorator
+
+
+@dataclass
+class StageStats:
+    """Counters of a stage, or of the source, over one run of a pipeline."""
+
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    busy: float = 0.0
+    waiting: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Results per second over the time the stage was running."""
+        return self.items_out / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        """Render the counters as one human-readable line.
+
+        Returns:
+            The counters, with the time spent working and waiting on queues.
+        """
+        return (
+            f"{self.name:<16} x{self.workers:<3} {self.items_in:>9} in {self.items_out:>9} out"
+            f"  {self.throughput:>12.1f}/s  busy {self.busy:8.3f}s  waiting {self.waiting:8.3f}s"
+        )
+
+
+class _Channel:
+    # A bounded queue of batches between the workers of two stages.
+
+    def __init__(self, size: int, producers: int) -> None:
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(size)
+        self._producers = producers
+
+    async def put(self, batch: list[Any]) -> None:
+        await self._queue.put(batch)
+
+    async def close(self) -> None:
+        self._producers -= 1
+        if self._producers == 0:
+            await self._queue.put(_END)
+
+    async def get(self) -> list[Any] | None:
+        batch = await self._queue.get()
+        if batch is _END:
+            # Leave the marker for the other consumers; there's room since it was just taken.
+            self._queue.put_nowait(_END)
+            return None
+        return batch  # type: ignore[no-any-return]
+
+
+class _Worker:
+    # One generator of a stage, or the source, with its own counters.
+
+    def __init__(
+        self,
+        produce: Callable[[Any], Any],
+        inbox: _Channel | None,
+        outbox: _Channel,
+        batch_size: int,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        self.produce = produce
+        self.inbox = inbox
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.loop = loop
+        self.items_in = 0
+        self.items_out = 0
+        self.waiting = 0.0
+        self.started = 0.0
+        self.finished = 0.0
+        self._aborted = threading.Event()
+        self._pending: concurrent.futures.Future[Any] | None = None
+
+    @property
+    def threaded(self) -> bool:
+        return not inspect.isasyncgenfunction(self.produce)
+
+    async def _timed(self, operation: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await operation
+        finally:
+            self.waiting += time.perf_counter() - start
+
+    async def _aitems(self) -> AsyncIterator[Any]:
+        assert self.inbox is not None  # nosec
+        while (batch := await self._timed(self.inbox.get())) is not None:
+            self.items_in += len(batch)
+            for item in batch:
+                yield item
+
+    async def _emit(self, batch: list[Any]) -> None:
+        self.items_out += len(batch)
+        await self._timed(self.outbox.put(batch))
+
+    async def _run_async(self) -> None:
+        batch = []
+        async for result in self.produce(self._aitems()):
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                await self._emit(batch)
+                batch = []
+        if batch:
+            await self._emit(batch)
+        await self.outbox.close()
+
+    def _call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        # Runs a queue operation on the loop from a worker thread. Storing the future before
+        # checking for abort means abort() either sees it or is seen by this thread.
+        future = asyncio.run_coroutine_threadsafe(self._timed(operation()), self.loop)
+        self._pending = future
+        if self._aborted.is_set():
+            future.cancel()
+        return future.result()
+
+    def _items(self) -> Iterator[Any]:
+        assert self.inbox is not None  # nosec
+        inbox = self.inbox
+        while (batch := self._call(inbox.get)) is not None:
+            self.items_in += len(batch)
+            yield from batch
+
+    def _run_sync(self) -> None:
+        batch = []
+        for result in self.produce(self._items()):
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                self.items_out += len(batch)
+                self._call(functools.partial(self.outbox.put, batch))
+                batch = []
+        if batch:
+            self.items_out += len(batch)
+            self._call(functools.partial(self.outbox.put, batch))
+        self._call(self.outbox.close)
+
+    def abort(self) -> None:
+        self._aborted.set()
+        pending = self._pending
+        if pending is not None:
+            pending.cancel()
+
+    async def run(self, executor: concurrent.futures.Executor) -> None:
+        self.started = time.perf_counter()
+        try:
+            if not self.threaded:
+                await self._run_async()
+                return
+            # Carry context variables, like the current tracing span, into the thread.
+            context = contextvars.copy_context()
+            thread = executor.submit(lambda: context.run(self._run_sync))
+            try:
+                await asyncio.wrap_future(thread)
+            except asyncio.CancelledError:
+                # The thread may be blocked on a queue; unblock it and let it wind down.
+                self.abort()
+                await asyncio.wait([asyncio.wrap_future(thread)])
+                raise
+        finally:
+            self.finished = time.perf_counter()
+
+
+def _source_stage(source: Iterable[Any] | AsyncIterable[Any]) -> Callable[[Any], Any]:
+    # Wraps a source as a stage function that ignores its (missing) input.
+    if isinstance(source, AsyncIterable):
+
+        async def produce_async(_: Any) -> AsyncIterator[Any]:
+            async for item in source:
+                yield item
+
+        return produce_async
+
+    def produce(_: Any) -> Iterator[Any]:
+        yield from source
+
+    return produce
+
+
+class Pipeline:
+    """Stages connected by bounded queues, through which batches of items stream.
+
+    Items travel between stages in batches, which amortizes the cost of each queue
+    operation. Each queue holds a bounded number of batches, so a fast stage waits for a
+    slow one instead of buffering the whole stream.
+
+    Results arrive in the order they're produced: with several workers in a stage, that
+    isn't necessarily the order of the source.
+    """
+
+    def __init__(
+        self,
+        *stages: Stage,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        """Connect stages.
+
+        Args:
+            stages: The stages, in order.
+            batch_size: How many items each stage passes to the next at once, unless the
+                stage says otherwise. This also applies to the source.
+            queue_size: How many batches may wait between two stages, unless the stage
+                writing to the queue says otherwise.
+        """
+        self.stages = stages
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats: list[StageStats] = []
+
+    async def stream(self, source: Iterable[Any] | AsyncIterable[Any]) -> AsyncGenerator[Any, None]:
+        """Run the pipeline, yielding the results of the last stage as they arrive.
+
+        A synchronous source is read in a thread, so it may block. Close the iterator with
+        :func:`contextlib.aclosing` when not consuming it to the end. ``stats`` holds the
+        counters of the source and each stage once it's exhausted. The first exception raised
+        by a stage is raised here, after stopping the others. Its cause is the exception group
+        of every stage that failed.
+
+        Args:
+            source: The items to feed the first stage.
+
+        Yields:
+            The results of the last stage.
+        """
+        async with contextlib.aclosing(self._batches(source)) as batches:
+            async for batch in batches:
+                for item in batch:
+                    yield item
+
+    async def _batches(
+        self, source: Iterable[Any] | AsyncIterable[Any]
+    ) -> AsyncGenerator[list[Any], None]:
+        loop = asyncio.get_running_loop()
+        steps = [Stage(_source_stage(source), "source"), *self.stages]
+        workers: list[list[_Worker]] = []
+        inbox: _Channel | None = None
+        for step in steps:
+            outbox = _Channel(step.queue_size or self.queue_size, step.workers)
+            batch_size = step.batch_size or self.batch_size
+            workers.append(
+                [
+                    _Worker(step.function, inbox, outbox, batch_size, loop)
+                    for _ in range(step.workers)
+                ]
+            )
+            inbox = outbox
+        assert inbox is not None  # nosec
+        output = inbox
+
+        runner = asyncio.create_task(self._run(workers))
+        try:
+            while (batch := await _next(output, runner)) is not None:
+                yield batch
+            await runner
+        except ExceptionGroup as error:
+            raise error.exceptions[0] from error
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.wait([runner])
+            self.stats = [_merge(step, group) for step, group in zip(steps, workers, strict=True)]
+
+    @staticmethod
+    async def _run(workers: list[list[_Worker]]) -> None:
+        threads = sum(worker.threaded for group in workers for worker in group)
+        with concurrent.futures.ThreadPoolExecutor(max(threads, 1), "pipeline") as executor:
+            async with asyncio.TaskGroup() as tasks:
+                for group in workers:
+                    for worker in group:
+                        tasks.create_task(worker.run(executor))
+
+    def run(self, source: Iterable[Any] | AsyncIterable[Any]) -> Generator[Any, None, None]:
+        """Run the pipeline in a new event loop, yielding the results of the last stage.
+
+        The loop runs while the next batch of results is awaited, so the stages on it pause
+        while the caller works through a batch, and the threads once their queues are full.
+        ``stats`` holds the counters once the generator is exhausted or closed.
+
+        Args:
+            source: The items to feed the first stage.
+
+        Yields:
+            The results of the last stage.
+        """
+        with asyncio.Runner() as runner:
+            batches = self._batches(source)
+            try:
+                while (batch := runner.run(_wait(anext(batches, None)))) is not None:
+                    yield from batch
+            finally:
+                runner.run(_wait(batches.aclose()))
+
+
+async def _wait(awaitable: Awaitable[T]) -> T:
+    # asyncio.Runner.run only takes coroutines, which anext() and aclose() don't return.
+    return await awaitable
+
+
+async def _next(output: _Channel, runner: asyncio.Task[None]) -> list[Any] | None:
+    # The next batch of results, or the error that stopped the stages.
+    get = asyncio.ensure_future(output.get())
+    await asyncio.wait([get, runner], return_when=asyncio.FIRST_COMPLETED)
+    if not get.done() and runner.exception() is not None:
+        get.cancel()
+        runner.result()
+    return await get
+
+
+def _merge(step: Stage, workers: list[_Worker]) -> StageStats:
+    started = [worker.started for worker in workers if worker.started]
+    finished = [worker.finished for worker in workers if worker.finished]
+    waiting = sum(worker.waiting for worker in workers)
+    return StageStats(
+        name=step.name,
+        workers=step.workers,
+        items_in=sum(worker.items_in for worker in workers),
+        items_out=sum(worker.items_out for worker in workers),
+        busy=sum(worker.finished - worker.started for worker in workers if worker.finished)
+        - waiting,
+        waiting=waiting,
+        elapsed=max(finished) - min(started) if finished else 0.0,
+    )
+
+
+def resource_documents() -> Iterator[tuple[str, str]]:
+    """Read the JSON data files of the package resources, named in :const:`DOCUMENTS`.
+
+    Yields:
+        The name and text of each file, in order.
+    """
+    for name in DOCUMENTS:
+        with span("assets.read", resource=name):
+            text = (RESOURCES / name).read_text(encoding="utf-8")
+        yield name, text
+
+
+@stage(workers=2)
+def parse(documents: Iterator[tuple[str, str]]) -> Iterator[tuple[str, Any]]:
+    """Parse JSON documents.
+
+    Args:
+        documents: Names and texts.
+
+    Yields:
+        Names and parsed values.
+    """
+    for name, text in documents:
+        yield name, json.loads(text)
+
+
+@stage(batch_size=DEFAULT_BATCH_SIZE)
+async def flatten(documents: AsyncIterator[tuple[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """Flatten parsed documents into one row per scalar.
+
+    Args:
+        documents: Names and parsed values.
+
+    Yields:
+        Rows of the document name, the dotted path to a scalar and the scalar.
+    """
+    async for name, document in documents:
+        pending = [("", document)]
+        while pending:
+            path, value = pending.pop()
+            if isinstance(value, dict):
+                children = list(value.items())
+            elif isinstance(value, list):
+                children = list(enumerate(value))
+            else:
+                yield {"resource": name, "path": path, "value": value}
+                continue
+            pending.extend(
+                (f"{path}.{key}" if path else str(key), child) for key, child in reversed(children)
+            )
+
+
+def resource_pipeline() -> Pipeline:
+    """Build the sample pipeline over :func:`resource_documents`.
+
+    Returns:
+        A pipeline that parses the documents in two threads and flattens them on the loop.
+    """
+    # Documents are few and large, so hand them out one at a time to spread them over workers.
+    return Pipeline(parse, flatten, batch_size=1)
+
+
+__all__ = (
+    "DEFAULT_BATCH_SIZE",
+    "DEFAULT_QUEUE_SIZE",
+    "DOCUMENTS",
+    "Pipeline",
+    "Stage",
+    "StageStats",
+    "flatten",
+    "parse",
+    "resource_documents",
+    "resource_pipeline",
+    "stage",
+)
@@ -0,0 +1,543 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import math
+import random
+import signal
+import time
+import tomllib
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from typing import Literal
+
+import click
+
+from ._tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+# How many of the most recent run durations of a job the percentiles are computed from.
+DURATION_WINDOW = 1000
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+# Minute, hour, day of the month, month and day of the week, with 0 and 7 both Sunday.
+_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# Enough steps to find the next match of any satisfiable expression, even 29 February.
+_SEARCH_LIMIT = 10_000
+_JOB_KEYS = {"command", "every", "cron", "jitter", "timeout", "executor"}
+
+
+@dataclass(frozen=True)
+class Interval:
+    """Runs a job every so many seconds, counted from when the scheduler started.
+
+    The scheduler counts intervals on the monotonic clock of its event loop, so setting the
+    system clock doesn't shift them.
+    """
+
+    seconds: float
+
+    def __post_init__(self) -> None:
+        """Check the interval.
+
+        Raises:
+            ValueError: If it isn't positive.
+        """
+        if not self.seconds > 0:
+            raise ValueError(f"interval must be positive, not {self.seconds}")
+
+    def next_after(self, when: datetime) -> datetime:
+        """Return when the job is due next.
+
+        Args:
+            when: When it was last due.
+
+        Returns:
+            One interval later.
+        """
+        return when + timedelta(seconds=self.seconds)
+
+
+def _parse_field(text: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        base, _, step = part.partition("/")
+        try:
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start, end = (int(bound) for bound in base.split("-", 1))
+            else:
+                start = int(base)
+                # "5/15" means every 15 starting at 5.
+                end = high if step else start
+            increment = int(step) if step else 1
+        except ValueError:
+            raise ValueError(f"invalid cron field {text!r}") from None
+        if not low <= start <= end <= high or increment < 1:
+            raise ValueError(f"invalid cron field {text!r}")
+        values.update(range(start, end + 1, increment))
+    return frozenset(values)
+
+
+class Cron:
+    """Runs a job at the local times matching a cron expression, like ``*/15 9-17 * * 1-5``.
+
+    The five fields are the minute, hour, day of the month, month and day of the week, each
+    a ``*``, a number, a range like ``1-5``, a step like ``*/10`` or ``0-30/10``, or a list
+    of those. Macros like ``@hourly`` and ``@daily`` are understood too. As in cron, a day
+    matches if either day field does when both are restricted.
+    """
+
+    def __init__(self, expression: str) -> None:
+        """Parse a cron expression.
+
+        Args:
+            expression: The five fields separated by spaces, or a macro.
+
+        Raises:
+            ValueError: If the expression is malformed.
+        """
+        self.expression = expression
+        fields = _MACROS.get(expression.strip(), expression).split()
+        if len(fields) != len(_FIELDS):
+            raise ValueError(f"cron expression {expression!r} must have five fields")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, low, high) for text, (low, high) in zip(fields, _FIELDS, strict=True)
+        )
+        self.minutes = minutes
+        self.hours = hours
+        self.days = days
+        self.months = months
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        # Like cron, match either day field if both are restricted, else the restricted one.
+        self._any_day = fields[2] != "*" and fields[4] != "*"
+
+    def __repr__(self) -> str:
+        """Show the expression.
+
+        Returns:
+            Code that recreates the schedule.
+        """
+        return f"Cron({self.expression!r})"
+
+    def _day_matches(self, when: datetime) -> bool:
+        in_days = when.day in self.days
+        in_weekdays = (when.weekday() + 1) % 7 in self.weekdays
+        return in_days or in_weekdays if self._any_day else in_days and in_weekdays
+
+    def next_after(self, when: datetime) -> datetime:
+        """Return the first matching minute after a time.
+
+        Args:
+            when: When the job was last due.
+
+        Returns:
+            The next time the job is due.
+
+        Raises:
+            ValueError: If no date ever matches, like the 31st of February.
+        """
+        candidate = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(_SEARCH_LIMIT):
+            if candidate.month not in self.months:
+                candidate = (
+                    candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)
+                ).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron expression {self.expression!r} never matches")
+
+
+@dataclass
+class JobStats:
+    """Counters and run durations of a job since the scheduler started."""
+
+    name: str
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    durations: deque[float] = field(default_factory=lambda: deque(maxlen=DURATION_WINDOW))
+
+    def record(self, duration: float) -> None:
+        """Count a finished run.
+
+        Args:
+            duration: How long it took, in seconds.
+        """
+        self.runs += 1
+        self.durations.append(duration)
+
+    def percentile(self, share: float) -> float:
+        """Return a percentile of the recent run durations.
+
+        Args:
+            share: Which one, between zero and one, like ``0.95``.
+
+        Returns:
+            The duration in seconds that this share of recent runs didn't exceed, or zero
+            before the first run.
+        """
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+    @property
+    def mean(self) -> float:
+        """The mean of the recent run durations, in seconds."""
+        return sum(self.durations) / len(self.durations) if self.durations else 0.0
+
+    def format(self) -> str:
+        """Render the counters as one human-readable line.
+
+        Returns:
+            The counters, with the mean, median, 95th percentile and longest recent durations.
+        """
+        return (
+            f"{self.name:<16} {self.runs:>6} runs {self.failures:>4} failed"
+            f" {self.timeouts:>4} timed out {self.skipped:>4} skipped"
+            f"  mean {self.mean:8.3f}s  p50 {self.percentile(0.5):8.3f}s"
+            f"  p95 {self.percentile(0.95):8.3f}s  max {max(self.durations, default=0.0):8.3f}s"
+        )
+
+
+@dataclass(frozen=True)
+class Job:
+    """A function to run on a schedule.
+
+    A run that is still going when the job is due again makes the scheduler skip that
+    run, so runs of a job never overlap.
+    """
+
+    name: str
+    function: Callable[[], Any]
+    schedule: Interval | Cron
+    jitter: float = 0.0
+    timeout: float | None = None
+    executor: Literal["thread", "process"] = "thread"
+
+    def __post_init__(self) -> None:
+        """Check the options.
+
+        Raises:
+            ValueError: If the jitter or timeout is negative, or the executor is unknown.
+        """
+        if self.jitter < 0 or (self.timeout is not None and self.timeout <= 0):
+            raise ValueError(f"job {self.name}: jitter and timeout must be positive")
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"job {self.name}: executor must be 'thread' or 'process'")
+
+
+def _waits(
+    schedule: Interval | Cron,
+    clock: Callable[[], float],
+    wall_clock: Callable[[], datetime] = datetime.now,
+) -> Iterator[tuple[float, int]]:
+    # Yields the seconds until the job is next due, and how many due times were missed, while
+    # the loop was blocked or the system clock jumped, and are skipped. Intervals count on the
+    # monotonic clock, cron schedules on the wall clock.
+    if isinstance(schedule, Interval):
+        due = clock()
+        while True:
+            due += schedule.seconds
+            missed = max(math.ceil((clock() - due) / schedule.seconds), 0)
+            due += missed * schedule.seconds
+            yield due - clock(), missed
+    when = wall_clock()
+    while True:
+        when = schedule.next_after(when)
+        now = wall_clock()
+        missed = 0
+        while when < now:
+            when = schedule.next_after(when)
+            missed += 1
+        yield (when - now).total_seconds(), missed
+
+
+class Scheduler:
+    """Runs jobs on intervals and cron schedules in one asyncio event loop.
+
+    Coroutine functions run on the loop. Other functions run in a thread pool, or in a
+    process pool if they're CPU-bound, so they don't hold up the loop or each other.
+    Every run is traced as a ``job.<name>`` span, and timed into ``stats``.
+    """
+
+    def __init__(self, *, workers: int | None = None) -> None:
+        """Create a scheduler without jobs.
+
+        Args:
+            workers: The size of the thread and process pools, by default one per CPU.
+        """
+        self.workers = workers
+        self.jobs: dict[str, Job] = {}
+        self.stats: dict[str, JobStats] = {}
+        self._executors: dict[str, Executor] = {}
+
+    def add(self, job: Job) -> Job:
+        """Schedule a job.
+
+        Args:
+            job: The job.
+
+        Returns:
+            The job.
+
+        Raises:
+            ValueError: If another job has the same name.
+        """
+        if job.name in self.jobs:
+            raise ValueError(f"there is already a job named {job.name}")
+        self.jobs[job.name] = job
+        self.stats[job.name] = JobStats(job.name)
+        return job
+
+    def job(
+        self,
+        schedule: Interval | Cron,
+        *,
+        name: str | None = None,
+        jitter: float = 0.0,
+        timeout: float | None = None,
+        executor: Literal["thread", "process"] = "thread",
+    ) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+        """Schedule a function, as a decorator.
+
+        Args:
+            schedule: When to run it.
+            name: The name of the job, by default the name of the function.
+            jitter: The most seconds to delay each run by, chosen at random, so that jobs
+                due at the same time don't all start at once.
+            timeout: How many seconds a run may take before it counts as timed out.
+                Coroutines are cancelled then; functions in a pool can't be, and the next
+                run waits for them to finish.
+            executor: ``process`` to run a function that isn't a coroutine function in the
+                process pool instead of the thread pool. It must be picklable.
+
+        Returns:
+            A decorator that returns the function unchanged.
+        """
+
+        def decorator(function: Callable[[], Any]) -> Callable[[], Any]:
+            self.add(Job(name or function.__name__, function, schedule, jitter, timeout, executor))
+            return function
+
+        return decorator
+
+    async def _call(self, job: Job) -> None:
+        if inspect.iscoroutinefunction(job.function):
+            await asyncio.wait_for(job.function(), job.timeout)
+            return
+        loop = asyncio.get_running_loop()
+        if job.executor == "process":
+            future = loop.run_in_executor(self._executor("process"), job.function)
+        else:
+            context = contextvars.copy_context()
+            future = loop.run_in_executor(
+                self._executor("thread"), lambda: context.run(job.function)
+            )
+        done, _ = await asyncio.wait({future}, timeout=job.timeout)
+        if not done:
+            self.stats[job.name].timeouts += 1
+            logger.warning("job %s is taking longer than %ss", job.name, job.timeout)
+        # The pool can't stop the function, so the run lasts until it returns.
+        await future
+
+    def _executor(self, kind: str) -> Executor:
+        if kind not in self._executors:
+            pool = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+            self._executors[kind] = pool(max_workers=self.workers)
+        return self._executors[kind]
+
+    async def _run(self, job: Job) -> None:
+        stats = self.stats[job.name]
+        start = time.perf_counter()
+        try:
+            async with span(f"job.{job.name}"):
+                await self._call(job)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.warning("job %s timed out after %ss", job.name, job.timeout)
+        except Exception:
+            stats.failures += 1
+            logger.exception("job %s failed", job.name)
+        stats.record(time.perf_counter() - start)
+
+    async def _loop(self, job: Job, runs: set[asyncio.Task[None]]) -> None:
+        stats = self.stats[job.name]
+        running: asyncio.Task[None] | None = None
+        waits = _waits(job.schedule, asyncio.get_running_loop().time)
+        while True:
+            delay, missed = next(waits)
+            if missed:
+                stats.skipped += missed
+                logger.warning("skipping %s missed runs of job %s", missed, job.name)
+            await asyncio.sleep(delay + random.uniform(0, job.jitter))  # nosec
+            if running is not None and not running.done():
+                stats.skipped += 1
+                logger.warning("skipping job %s, its last run is still going", job.name)
+                continue
+            running = asyncio.create_task(self._run(job), name=f"job.{job.name}")
+            runs.add(running)
+            running.add_done_callback(runs.discard)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Run the jobs until asked to stop, then wait for the runs in progress.
+
+        Args:
+            stop: Set it to stop scheduling runs.
+        """
+        runs: set[asyncio.Task[None]] = set()
+        loops = [asyncio.create_task(self._loop(job, runs)) for job in self.jobs.values()]
+        try:
+            await stop.wait()
+        finally:
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+            if runs:
+                await asyncio.wait(runs)
+            for executor in self._executors.values():
+                executor.shutdown()
+            self._executors.clear()
+
+    async def serve(self, duration: float | None = None) -> None:
+        """Run the jobs until the process is interrupted or terminated.
+
+        Args:
+            duration: How many seconds to stop after instead, if any.
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        signals = (signal.SIGINT, signal.SIGTERM)
+        for signum in signals:
+            # Windows event loops don't support signal handlers.
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(signum, stop.set)
+        if duration is not None:
+            loop.call_later(duration, stop.set)
+        try:
+            await self.run(stop)
+        finally:
+            for signum in signals:
+                with contextlib.suppress(NotImplementedError):
+                    loop.remove_signal_handler(signum)
+
+
+@functools.cache
+def _command() -> click.Command:
+    import typer
+
+    from .__main__ import cli
+
+    return typer.main.get_command(cli)
+
+
+def run_command(args: tuple[str, ...], command: click.Command | None = None) -> None:
+    """Run a command of the command line in this process.
+
+    Args:
+        args: The arguments, like ``("resources", "--stats")``.
+        command: The command line to run, instead of the one of this package.
+
+    Raises:
+        RuntimeError: If the command exits with an error status.
+    """
+    command = command or _command()
+    status = command.main(list(args), "{{cookiecutter.project_name}}", standalone_mode=False)
+    if status:
+        raise RuntimeError(f"command {' '.join(args)!r} exited with status {status}")
+
+
+def load_jobs(path: Path) -> list[Job]:
+    """Read the commands to schedule from a TOML file.
+
+    Every table under ``jobs`` is a job named after it. It has the ``command`` to run, as a
+    list of arguments, and either a number of seconds to run it ``every`` or a ``cron``
+    expression. It may set ``jitter`` and ``timeout`` in seconds, and ``executor`` to
+    ``"process"`` for CPU-bound commands.
+
+    Args:
+        path: The file.
+
+    Returns:
+        The jobs.
+
+    Raises:
+        ValueError: If the file isn't valid TOML or describes a job wrongly.
+    """
+    with path.open("rb") as config_fp:
+        config = tomllib.load(config_fp)
+    jobs = []
+    for name, table in config.get("jobs", {}).items():
+        unknown = set(table) - _JOB_KEYS
+        if unknown:
+            raise ValueError(f"job {name}: unknown keys {', '.join(sorted(unknown))}")
+        if "command" not in table or ("every" in table) == ("cron" in table):
+            raise ValueError(f"job {name}: needs a command, and either every or cron")
+        schedule: Interval | Cron = (
+            Interval(float(table["every"])) if "every" in table else Cron(table["cron"])
+        )
+        function = functools.partial(run_command, tuple(table["command"]))
+        timeout = table.get("timeout")
+        jobs.append(
+            Job(
+                name,
+                function,
+                schedule,
+                jitter=float(table.get("jitter", 0)),
+                timeout=None if timeout is None else float(timeout),
+                executor=table.get("executor", "thread"),
+            )
+        )
+    return jobs
+
+
+__all__ = (
+    "Cron",
+    "DURATION_WINDOW",
+    "Interval",
+    "Job",
+    "JobStats",
+    "Scheduler",
+    "load_jobs",
+    "run_command",
+)
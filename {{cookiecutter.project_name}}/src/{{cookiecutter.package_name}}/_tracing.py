@@ -0,0 +1,381 @@
+"""{{ cookiecutter.friendly_name }}
+
+Copyright (C) {{ cookiecutter.copyright_year }}  {{ cookiecutter.author }}
+
+SPDX-License-Identifier: {% if cookiecutter.license == 'AGPL-3.0-or-later' -%}AGPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'Apache-2.0' -%}Apache-2.0{%- endif %}{% if cookiecutter.license == 'GPL-3.0-or-later' -%}GPL-3.0-or-later{%- endif %}{% if cookiecutter.license == 'MIT' -%}MIT{%- endif %}
+"""  # noqa: E501, B950, D415
+
+from __future__ import annotations
+
+import functools
+import inspect
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Coroutine
+from collections.abc import Mapping
+from contextvars import ContextVar
+from contextvars import Token
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+from typing import TypeVar
+from typing import cast
+
+
+# mypyc can't compile ParamSpec, so the decorator keeps the type of the function instead.
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACE_VARIABLE = "{{cookiecutter.environ_prefix}}TRACE"
+TRACE_FILE_VARIABLE = "{{cookiecutter.environ_prefix}}TRACE_FILE"
+DEFAULT_CAPACITY = 100_000
+
+_DISABLED = ("", "0", "false", "no", "off")
+
+# Whether the trace the current context belongs to is sampled, or None outside of any span.
+_sampled: ContextVar[bool | None] = ContextVar("sampled", default=None)
+# The spans open in the current context, innermost last, with when each started and the
+# token that ends the trace it started, if any. Keeping this per context rather than on
+# the span lets one span be entered by concurrent tasks and threads, and recursively.
+_open: ContextVar[tuple[tuple[Span, int, Token[bool | None] | None], ...]] = ContextVar(
+    "open", default=()
+)
+
+
+def sampling_rate(value: str) -> float:
+    """Parse the value of ``{{cookiecutter.environ_prefix}}TRACE``.
+
+    Args:
+        value: ``1`` or any other truthy word to trace every invocation, a fraction like
+            ``0.1`` to trace that share of them, or ``0`` to trace nothing.
+
+    Returns:
+        The share of traces to record, between zero and one.
+    """
+    if value.strip().lower() in _DISABLED:
+        return 0.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        return 1.0
+
+
+class Tracer:
+    """Records finished spans into a ring buffer, and exports them as a Chrome trace.
+
+    Only the most recent ``capacity`` spans are kept, so tracing a long-running process
+    uses bounded memory. Recording a span appends a tuple to a deque.
+    """
+
+    def __init__(self, *, rate: float = 1.0, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Create a tracer.
+
+        Args:
+            rate: The share of traces to record. A trace starts with a span that has no
+                parent, and every span within it shares its fate.
+            capacity: How many spans to keep.
+        """
+        self.rate = rate
+        self.spans: deque[tuple[str, int, int, int, Mapping[str, Any] | None]] = deque(
+            maxlen=capacity
+        )
+        self.tracks: dict[int, str] = {}
+        self.epoch = time.perf_counter_ns()
+        # Tasks and threads are tracked by object rather than id, since ids get reused.
+        self._track_numbers: weakref.WeakKeyDictionary[object, int] = weakref.WeakKeyDictionary()
+        self._next_track = itertools.count(1)
+
+    @classmethod
+    def from_environment(cls, environ: Mapping[str, str] = os.environ) -> Tracer:
+        """Create a tracer sampling as configured by ``{{cookiecutter.environ_prefix}}TRACE``.
+
+        Args:
+            environ: The environment.
+
+        Returns:
+            The tracer, which records nothing if the variable is unset.
+        """
+        return cls(rate=sampling_rate(environ.get(TRACE_VARIABLE, "")))
+
+    def record(self, name: str, start: int, end: int, attributes: Mapping[str, Any] | None) -> None:
+        """Add a finished span to the buffer.
+
+        Args:
+            name: The name of the span.
+            start: When it started, from :func:`time.perf_counter_ns`.
+            end: When it ended, from :func:`time.perf_counter_ns`.
+            attributes: Extra details to show with the span.
+        """
+        # Concurrent tasks get a track each, so their spans don't overlap on their thread's.
+        # asyncio is imported only once tracing records something, since every command
+        # imports this module and most of them don't use asyncio.
+        import asyncio
+
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # No event loop runs in this thread.
+            task = None
+        thread = threading.current_thread()
+        owner: object = thread if task is None else task
+        track = self._track_numbers.get(owner)
+        if track is None:
+            track = self._track_numbers[owner] = next(self._next_track)
+        if track not in self.tracks:
+            # At least a thousand tasks or threads have no spans left in the buffer.
+            if len(self.tracks) >= len(self.spans) + 1000:
+                self._forget_unused_tracks()
+            self.tracks[track] = (
+                thread.name if task is None else f"{thread.name}: {task.get_name()}"
+            )
+        self.spans.append((name, start, end, track, attributes))
+
+    def _forget_unused_tracks(self) -> None:
+        used = {record[3] for record in self.spans}
+        self.tracks = {track: name for track, name in self.tracks.items() if track in used}
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Convert the recorded spans to the Chrome trace event format.
+
+        Returns:
+            A JSON-serializable trace that Perfetto or ``chrome://tracing`` can open.
+        """
+        pid = os.getpid()
+        tids = {track: tid for tid, track in enumerate(dict.fromkeys(r[3] for r in self.spans), 1)}
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for track, tid in tids.items()
+            for name in (self.tracks.get(track, f"track {track}"),)
+        ]
+        for name, start, end, track, attributes in sorted(self.spans, key=lambda record: record[1]):
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.epoch) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tids[track],
+            }
+            if attributes:
+                event["args"] = attributes
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path) -> int:
+        """Write the recorded spans to a Chrome trace file.
+
+        Args:
+            path: The file to write.
+
+        Returns:
+            The number of spans written.
+        """
+        trace = self.chrome_trace()
+        path.write_text(json.dumps(trace, default=str), encoding="utf-8")
+        return len(self.spans)
+
+    def clear(self) -> None:
+        """Forget the recorded spans."""
+        self.spans.clear()
+        self.tracks.clear()
+
+
+@functools.cache
+def default_tracer() -> Tracer:
+    """Return the tracer every span records to.
+
+    Returns:
+        A tracer configured from the environment on first use.
+    """
+    return Tracer.from_environment()
+
+
+class Span:
+    """Times a block of code, a function or a coroutine function.
+
+    Use it as a context manager, an asynchronous one, or a decorator. Spans nest through a
+    context variable, so they follow asyncio tasks and threads started with a copied
+    context. A span that starts a trace decides whether the whole trace is sampled.
+    Tracing is off unless ``{{cookiecutter.environ_prefix}}TRACE`` is set, and a disabled
+    span costs little more than an empty ``with`` block.
+    """
+
+    __slots__ = ("name", "attributes")
+
+    def __init__(self, name: str, **attributes: Any) -> None:
+        """Describe a span.
+
+        Args:
+            name: What the span measures, like ``assets.load``.
+            attributes: Extra details to show with the span, like the resource loaded.
+        """
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        """Start the span.
+
+        Returns:
+            This span.
+        """
+        tracer = default_tracer()
+        if not tracer.rate:
+            return self
+        sampled = _sampled.get()
+        token = None
+        if sampled is None:
+            sampled = tracer.rate >= 1.0 or random.random() < tracer.rate  # nosec
+            token = _sampled.set(sampled)
+        start = time.perf_counter_ns() if sampled else 0
+        _open.set((*_open.get(), (self, start, token)))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """End the span and record it if its trace is sampled.
+
+        Args:
+            exc_type: The type of the exception raised in the block, if any.
+            exc_value: The exception raised in the block, if any.
+            traceback: The traceback of the exception, if any.
+        """
+        spans = _open.get()
+        # Nothing was opened if tracing was off when the span started.
+        if not spans or spans[-1][0] is not self:
+            return
+        _, start, token = spans[-1]
+        _open.set(spans[:-1])
+        if start:
+            attributes = self.attributes
+            if exc_type is not None:
+                attributes = {**attributes, "error": exc_type.__name__}
+            default_tracer().record(self.name, start, time.perf_counter_ns(), attributes)
+        if token is not None:
+            _sampled.reset(token)
+
+    async def __aenter__(self) -> Span:
+        """Start the span.
+
+        Returns:
+            This span.
+        """
+        return self.__enter__()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """End the span and record it if its trace is sampled.
+
+        Args:
+            exc_type: The type of the exception raised in the block, if any.
+            exc_value: The exception raised in the block, if any.
+            traceback: The traceback of the exception, if any.
+        """
+        self.__exit__(exc_type, exc_value, traceback)
+
+    def __call__(self, function: F) -> F:
+        """Time every call of a function, or every run of a coroutine function.
+
+        Args:
+            function: The function.
+
+        Returns:
+            The wrapped function.
+        """
+        if inspect.iscoroutinefunction(function):
+            coroutine_function = cast(Callable[..., Coroutine[Any, Any, Any]], function)
+
+            @functools.wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self:
+                    return await coroutine_function(*args, **kwargs)
+
+            return cast(F, async_wrapper)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return function(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+
+def span(name: str, **attributes: Any) -> Span:
+    """Describe a span, to use as a context manager or a decorator.
+
+    Args:
+        name: What the span measures, like ``assets.load``.
+        attributes: Extra details to show with the span, like the resource loaded.
+
+    Returns:
+        The span.
+    """
+    return Span(name, **attributes)
+
+
+def in_span() -> bool:
+    """Return whether a traced span is open in the current context.
+
+    Returns:
+        True inside a span while tracing is on.
+    """
+    return bool(_open.get())
+
+
+def trace_path(environ: Mapping[str, str] = os.environ) -> Path:
+    """Return where :func:`export_trace` writes the trace.
+
+    Args:
+        environ: The environment.
+
+    Returns:
+        The file named by ``{{cookiecutter.environ_prefix}}TRACE_FILE``, or a file named
+        after this process in the temporary directory.
+    """
+    override = environ.get(TRACE_FILE_VARIABLE)
+    if override:
+        return Path(override)
+    return Path(tempfile.gettempdir(), f"{__package__}-trace-{os.getpid()}.json")
+
+
+def export_trace() -> Path | None:
+    """Write the spans recorded so far by the default tracer, then forget them.
+
+    Returns:
+        The file written, or None if nothing was recorded.
+    """
+    tracer = default_tracer()
+    if not tracer.spans:
+        return None
+    path = trace_path()
+    tracer.export(path)
+    tracer.clear()
+    return path
+
+
+__all__ = (
+    "DEFAULT_CAPACITY",
+    "Span",
+    "TRACE_FILE_VARIABLE",
+    "TRACE_VARIABLE",
+    "Tracer",
+    "default_tracer",
+    "export_trace",
+    "in_span",
+    "sampling_rate",
+    "span",
+    "trace_path",
+)
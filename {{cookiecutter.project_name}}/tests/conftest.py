@@ -0,0 +1,59 @@
+"""Pytest plugin enforcing the memory budget configured in pyproject.toml."""
+
+import tomllib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from {{cookiecutter.package_name}}._memory import MemoryBudget
+from {{cookiecutter.package_name}}._memory import MemoryReport
+from {{cookiecutter.package_name}}._memory import MemoryTracker
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.terminal import TerminalReporter
+
+PYPROJECT = Path(__file__).parent.parent / "pyproject.toml"
+
+# The node ID and report of every test that used the ``memory_tracker`` fixture, and whether
+# it exceeded the budget.
+_reports: list[tuple[str, MemoryReport, bool]] = []
+
+
+@pytest.fixture(scope="session")
+def memory_budget() -> MemoryBudget:
+    """The ``[tool.memory-budget]`` table of pyproject.toml."""
+    with PYPROJECT.open("rb") as pyproject_fp:
+        pyproject = tomllib.load(pyproject_fp)
+    return MemoryBudget.from_mapping(pyproject.get("tool", {}).get("memory-budget", {}))
+
+
+@pytest.fixture
+def memory_tracker(
+    request: pytest.FixtureRequest, memory_budget: MemoryBudget
+) -> Iterator[MemoryTracker]:
+    """Track the memory used by a test and fail it if the budget is exceeded."""
+    with MemoryTracker(limit=5) as tracker:
+        yield tracker
+    report = tracker.report
+    assert report is not None
+    violations = memory_budget.violations(report)
+    _reports.append((request.node.nodeid, report, bool(violations)))
+    assert not violations, f"memory budget exceeded: {'; '.join(violations)}\n{report.format()}"
+
+
+def pytest_terminal_summary(terminalreporter: "TerminalReporter") -> None:
+    """Print the memory reports of tests that exceeded the budget, or of every test with ``-v``."""
+    reports = [
+        (nodeid, report)
+        for nodeid, report, exceeded in _reports
+        if exceeded or terminalreporter.verbosity > 0
+    ]
+    if not reports:
+        return
+    terminalreporter.section("memory usage")
+    for nodeid, report in reports:
+        terminalreporter.write_line(nodeid)
+        terminalreporter.write_line(report.format())
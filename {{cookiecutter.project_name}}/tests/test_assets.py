@@ -0,0 +1,147 @@
+"""Test cases for the _assets module."""
+
+import multiprocessing
+import subprocess  # nosec
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from {{cookiecutter.package_name}}._assets import SharedResource
+from {{cookiecutter.package_name}}._assets import _close_all
+
+
+IMPORT = "import sys; from {{cookiecutter.package_name}}._assets import SharedResource; "
+
+
+def lookup_in_worker(name: str, key: str) -> str:
+    """Attach to a shared mapping from a worker process and look a key up."""
+    with SharedResource.attach(name) as shared:
+        return shared.mapping[key]
+
+
+class TestSharedMapping:
+    """Test cases for mappings published to shared memory."""
+
+    def test_lookup(self) -> None:
+        """Looks values up by key."""
+        with SharedResource.create({"b": "two", "a": "one", "ü": "umlaut"}) as shared:
+            assert dict(shared.mapping) == {"a": "one", "b": "two", "ü": "umlaut"}
+            assert list(shared.mapping) == ["a", "b", "ü"]
+
+    def test_mapping_is_kept(self) -> None:
+        """Returns the same mapping every time, so its keys are decoded only once."""
+        with SharedResource.create({"a": "one"}) as shared:
+            assert shared.mapping is shared.mapping
+
+    @pytest.mark.parametrize("key", ["0", "aa", "z"])
+    def test_missing_key(self, key: str) -> None:
+        """Raises KeyError for keys before, between and after the stored keys."""
+        with SharedResource.create({"a": "one", "b": "two"}) as shared:
+            assert key not in shared.mapping
+
+    def test_publish(self) -> None:
+        """Publishes a JSON resource from the package."""
+        with SharedResource.publish("data.json") as shared:
+            assert dict(shared.mapping) == {"status": "Hello World!"}
+            with pytest.raises(TypeError):
+                shared.sequence
+
+    def test_worker_process(self) -> None:
+        """Workers read the data the parent published."""
+        context = multiprocessing.get_context("spawn")
+        with SharedResource.publish("data.json") as shared:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                future = executor.submit(lookup_in_worker, shared.name, "status")
+                assert future.result() == "Hello World!"
+            assert lookup_in_worker(shared.name, "status") == "Hello World!"
+
+
+class TestSharedStrings:
+    """Test cases for sequences published to shared memory."""
+
+    def test_indexing(self) -> None:
+        """Supports positive and negative indices and slices."""
+        with SharedResource.create(["x", "", "zz"]) as shared:
+            assert len(shared.sequence) == 3
+            assert shared.sequence[0] == "x"
+            assert shared.sequence[-1] == "zz"
+            assert shared.sequence[1:] == ["", "zz"]
+            with pytest.raises(TypeError):
+                shared.mapping
+
+    @pytest.mark.parametrize("index", [3, -4])
+    def test_out_of_range(self, index: int) -> None:
+        """Raises IndexError outside the sequence."""
+        with SharedResource.create(["x", "y", "z"]) as shared:
+            with pytest.raises(IndexError):
+                shared.sequence[index]
+
+    def test_only_strings(self) -> None:
+        """Refuses data that isn't made of strings."""
+        with pytest.raises(TypeError):
+            SharedResource.create([1, 2])  # type: ignore[list-item]
+
+
+class TestLifecycle:
+    """Test cases for attaching to and removing shared segments."""
+
+    def test_attach(self) -> None:
+        """Attached resources see the published data and leave the segment in place."""
+        with SharedResource.create(["x"]) as shared:
+            with SharedResource.attach(shared.name) as attached:
+                assert list(attached.sequence) == ["x"]
+            with SharedResource.attach(shared.name) as attached:
+                assert list(attached.sequence) == ["x"]
+
+    def test_unrelated_process_attaches(self) -> None:
+        """A process outside multiprocessing that attached leaves the segment when it exits."""
+        code = IMPORT + "print(list(SharedResource.attach(sys.argv[1]).sequence))"
+        with SharedResource.create(["x"]) as shared:
+            completed = subprocess.run(  # nosec
+                [sys.executable, "-c", code, shared.name],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            assert completed.stdout == "['x']\n"
+            with SharedResource.attach(shared.name) as attached:
+                assert list(attached.sequence) == ["x"]
+
+    def test_unrelated_process_publishes(self) -> None:
+        """Attaches to a resource published by a process outside multiprocessing."""
+        code = IMPORT + "shared = SharedResource.create(['x']); print(shared.name); input()"
+        with subprocess.Popen(  # nosec
+            [sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        ) as process:
+            assert process.stdout is not None
+            with SharedResource.attach(process.stdout.readline().strip()) as attached:
+                assert list(attached.sequence) == ["x"]
+            process.communicate("\n")
+        assert process.returncode == 0
+
+    def test_owner_removes_segment(self) -> None:
+        """The publisher removes the segment when it closes the resource."""
+        with SharedResource.create(["x"]) as shared:
+            name = shared.name
+        with pytest.raises(FileNotFoundError):
+            SharedResource.attach(name)
+
+    def test_removed_at_exit(self) -> None:
+        """Unclosed resources are closed at exit, and closing them again does nothing."""
+        shared = SharedResource.create(["x"])
+        _close_all()
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=shared.name)
+        shared.close()
+
+    def test_not_a_resource(self) -> None:
+        """Refuses to attach to segments that don't hold a shared resource."""
+        segment = SharedMemory(create=True, size=64)
+        try:
+            with pytest.raises(ValueError):
+                SharedResource.attach(segment.name)
+        finally:
+            segment.close()
+            segment.unlink()
@@ -0,0 +1,67 @@
+"""Test cases for the _batch module."""
+
+import io
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.package_name}}._batch import chunked
+from {{cookiecutter.package_name}}._batch import process_records
+from {{cookiecutter.package_name}}._batch import read_records
+
+
+def slow_for_small(number: int) -> int:
+    """Take longer for smaller numbers, so that later chunks finish first."""
+    time.sleep(0.05 * (5 - number))
+    return number * 2
+
+
+def test_chunked() -> None:
+    """Splits a stream into lists, with a shorter last list."""
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_read_records(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reads lines from files and standard input, without line endings."""
+    first = tmp_path / "first.txt"
+    first.write_bytes(b"a\r\nb\n")
+    monkeypatch.setattr("sys.stdin", io.StringIO("c\nd"))
+    assert list(read_records([first, Path("-")])) == ["a", "b", "c", "d"]
+
+
+def test_read_records_stdin(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reads standard input if no files are given."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("x\n"))
+    assert list(read_records([])) == ["x"]
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_ordered(processes: bool) -> None:
+    """Keeps the input order, with threads and processes alike."""
+    chunks = process_records(range(5), slow_for_small, chunk_size=1, workers=2, processes=processes)
+    assert [result for chunk in chunks for result in chunk] == [0, 2, 4, 6, 8]
+
+
+def test_unordered() -> None:
+    """Yields every result, completed chunks first."""
+    chunks = list(process_records(range(5), slow_for_small, chunk_size=1, workers=5, ordered=False))
+    assert sorted(result for chunk in chunks for result in chunk) == [0, 2, 4, 6, 8]
+    assert chunks[0] == [8]
+
+
+def test_bounded_in_flight() -> None:
+    """Doesn't read ahead of the results by more than the in-flight bound."""
+    read = []
+
+    def records() -> Iterator[int]:
+        for number in range(100):
+            read.append(number)
+            yield number
+
+    chunks = process_records(records(), str, chunk_size=10, workers=1, max_in_flight=2)
+    assert next(chunks) == [str(number) for number in range(10)]
+    assert len(read) <= 30
+    assert len(list(chunks)) == 9
@@ -0,0 +1,257 @@
+"""Test cases for the _cache module."""
+
+import multiprocessing
+import os
+import random
+import subprocess  # nosec
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.package_name}}._cache import CACHE_DIR_VARIABLE
+from {{cookiecutter.package_name}}._cache import DiskCache
+from {{cookiecutter.package_name}}._cache import cache_key
+from {{cookiecutter.package_name}}._cache import default_cache
+from {{cookiecutter.package_name}}._cache import default_cache_dir
+from {{cookiecutter.package_name}}._cache import memoize
+
+
+def write_in_worker(directory: str, worker: int) -> int:
+    """Write entries to a shared cache from a worker process, then read them back."""
+    cache = DiskCache(Path(directory))
+    for number in range(20):
+        cache.set(f"{worker}-{number}".encode(), number)
+    return sum(cache.get(f"{worker}-{number}".encode()) for number in range(20))
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[DiskCache]:
+    """An empty cache in a temporary directory."""
+    cache = DiskCache(tmp_path / "cache")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Freeze the time seen by the cache at the value in the returned list."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def evict_always(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make every write evict, instead of now and then."""
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+
+
+class TestDiskCache:
+    """Test cases for the on-disk cache."""
+
+    def test_round_trip(self, cache: DiskCache) -> None:
+        """Returns what was stored, and the default for missing keys."""
+        cache.set(b"key", {"nested": [1, 2.5, None]})
+        assert cache.get(b"key") == {"nested": [1, 2.5, None]}
+        assert cache.get(b"other", "default") == "default"
+
+    def test_persists(self, tmp_path: Path) -> None:
+        """Entries survive reopening the cache."""
+        DiskCache(tmp_path).set(b"key", "value")
+        assert DiskCache(tmp_path).get(b"key") == "value"
+
+    @pytest.mark.usefixtures("evict_always")
+    def test_ttl(self, tmp_path: Path, clock: list[float]) -> None:
+        """Entries expire after the default or their own lifetime, and are evicted on write."""
+        cache = DiskCache(tmp_path, ttl=10)
+        cache.set(b"default", 1)
+        cache.set(b"short", 2, ttl=1)
+        clock[0] += 5
+        assert cache.get(b"default") == 1
+        assert cache.get(b"short") is None
+        clock[0] += 10
+        assert cache.get(b"default") is None
+        cache.set(b"new", 3)
+        assert len(cache) == 1
+
+    @pytest.mark.usefixtures("evict_always")
+    def test_evicts_least_recently_used(self, tmp_path: Path, clock: list[float]) -> None:
+        """Keeps the most recently used entries that fit in the size limit."""
+        cache = DiskCache(tmp_path, max_size=2500)
+        for key in (b"a", b"b"):
+            cache.set(key, bytes(1000))
+            clock[0] += 60
+        assert cache.get(b"a") is not None
+        clock[0] += 1
+        cache.set(b"c", bytes(1000))
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") is not None
+        assert cache.get(b"c") is not None
+
+    def test_evicts_now_and_then(self, cache: DiskCache, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Evicts with a probability proportional to the size of the entry."""
+        cache.max_size = 800
+        monkeypatch.setattr(random, "random", lambda: 0.99)
+        cache.set(b"a", bytes(760))
+        # Small enough to skip eviction, although the cache is now over its limit.
+        cache.set(b"b", bytes(50))
+        assert len(cache) == 2
+        cache.set(b"c", bytes(100))
+        assert cache.get(b"a") is None
+        assert len(cache) == 2
+
+    def test_recency_resolution(self, cache: DiskCache, clock: list[float]) -> None:
+        """Hits only write the time they were used at once it changed by a minute."""
+        cache.set(b"key", 1)
+        connection = cache._connection()
+        clock[0] += 30
+        assert cache.get(b"key") == 1
+        assert connection.execute("SELECT accessed FROM entries").fetchone() == (1000.0,)
+        clock[0] += 30
+        assert cache.get(b"key") == 1
+        assert connection.execute("SELECT accessed FROM entries").fetchone() == (1060.0,)
+
+    def test_expires_index(self, cache: DiskCache) -> None:
+        """Finds expired entries without scanning the table."""
+        plan = cache._connection().execute(
+            "EXPLAIN QUERY PLAN DELETE FROM entries WHERE expires <= 0"
+        )
+        assert "entries_expires" in str(plan.fetchall())
+
+    def test_clear(self, cache: DiskCache) -> None:
+        """Removes every entry."""
+        cache.set(b"key", 1)
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_close_reopens(self, cache: DiskCache) -> None:
+        """Reconnects on the next use after closing, and closing twice does nothing."""
+        cache.set(b"key", 1)
+        cache.close()
+        cache.close()
+        assert cache.get(b"key") == 1
+
+    def test_thread_connections(self, cache: DiskCache) -> None:
+        """Every thread uses a connection of its own."""
+        results = []
+        thread = threading.Thread(target=lambda: results.append(cache.get(b"key", 0)))
+        thread.start()
+        thread.join()
+        assert results == [0]
+
+    def test_reconnects_after_fork(self, cache: DiskCache, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Opens a new connection when used from another process."""
+        cache.set(b"key", 1)
+        monkeypatch.setattr(os, "getpid", lambda: -1)
+        assert cache.get(b"key") == 1
+
+    def test_concurrent_processes(self, tmp_path: Path) -> None:
+        """Processes writing to the same cache at once don't lose entries."""
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=4, mp_context=context) as executor:
+            sums = list(executor.map(write_in_worker, [str(tmp_path)] * 4, range(4)))
+        assert sums == [sum(range(20))] * 4
+        assert len(DiskCache(tmp_path)) == 80
+        assert write_in_worker(str(tmp_path), 4) == sum(range(20))
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX only")
+    def test_refuses_foreign_directory(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Refuses a directory that another user could have planted entries in."""
+        other_user = os.getuid() + 1
+        monkeypatch.setattr(os, "getuid", lambda: other_user)
+        with pytest.raises(PermissionError):
+            DiskCache(tmp_path)
+
+
+class TestMemoize:
+    """Test cases for the memoization decorator."""
+
+    def test_caches_calls(self, cache: DiskCache) -> None:
+        """Calls the function once per distinct arguments."""
+        calls = []
+
+        @memoize(cache=cache)
+        def square(number: int, *, offset: int = 0) -> int:
+            calls.append(number)
+            return number * number + offset
+
+        assert [square(3), square(3), square(4), square(3, offset=1)] == [9, 9, 16, 10]
+        assert calls == [3, 4, 3]
+
+    def test_caches_none(self, cache: DiskCache) -> None:
+        """Caches None like any other result."""
+        calls: list[None] = []
+
+        @memoize(cache=cache)
+        def nothing() -> None:
+            calls.append(None)
+
+        nothing()
+        nothing()
+        assert len(calls) == 1
+
+    def test_ttl(self, cache: DiskCache, clock: list[float]) -> None:
+        """Calls the function again once the result expired."""
+        calls: list[None] = []
+
+        @memoize(ttl=10, cache=cache)
+        def now() -> int:
+            calls.append(None)
+            return len(calls)
+
+        assert now() == now() == 1
+        clock[0] += 11
+        assert now() == 2
+
+    def test_set_arguments(self) -> None:
+        """Sets give the same key in processes with different hash seeds."""
+        code = (
+            "from {{cookiecutter.package_name}}._cache import cache_key, default_cache_dir;"
+            "print(cache_key(default_cache_dir, ([{'a', 'b', 'c', 'd'}],), "
+            "{'tags': frozenset('efgh')}).hex())"
+        )
+        keys = {
+            subprocess.run(  # nosec
+                [sys.executable, "-c", code],
+                env={**os.environ, "PYTHONHASHSEED": str(seed)},
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            for seed in range(4)
+        }
+        assert len(keys) == 1
+        assert cache_key(len, ({1, 2},), {}) != cache_key(len, ({1, 3},), {})
+        assert cache_key(len, ({"a": [1]},), {}) != cache_key(len, ((1,),), {})
+
+    def test_version_in_key(self) -> None:
+        """A new version of the package doesn't reuse old results."""
+        key = cache_key(default_cache_dir, (1,), {})
+        assert cache_key(default_cache_dir, (1,), {}, version="999") != key
+
+    def test_default_cache(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Uses the directory named by the environment variable."""
+        monkeypatch.setenv(CACHE_DIR_VARIABLE, str(tmp_path))
+        default_cache.cache_clear()
+
+        @memoize()
+        def identity(value: str) -> str:
+            return value
+
+        assert identity("value") == "value"
+        assert len(default_cache()) == 1
+        assert (tmp_path / "cache.sqlite").exists()
+        default_cache().close()
+        default_cache.cache_clear()
+
+    def test_default_cache_dir(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Defaults to a directory of the current user in the temporary directory."""
+        monkeypatch.delenv(CACHE_DIR_VARIABLE, raising=False)
+        assert default_cache_dir().name.startswith("{{cookiecutter.package_name}}-cache-")
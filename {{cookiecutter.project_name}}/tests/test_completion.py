@@ -0,0 +1,279 @@
+"""Test cases for the _completion module."""
+
+import json
+import shutil
+import subprocess  # nosec
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import pytest
+import typer
+from typer.main import get_command
+from typer.testing import CliRunner
+
+from {{cookiecutter.package_name}}.__main__ import cli
+from {{cookiecutter.package_name}}._completion import FULL_COMPLETION_VARIABLE
+from {{cookiecutter.package_name}}._completion import SHELLS
+from {{cookiecutter.package_name}}._completion import build_index
+from {{cookiecutter.package_name}}._completion import candidates
+from {{cookiecutter.package_name}}._completion import complete
+from {{cookiecutter.package_name}}._completion import complete_variable
+from {{cookiecutter.package_name}}._completion import load_index
+from {{cookiecutter.package_name}}._completion import main
+from {{cookiecutter.package_name}}._completion import render_script
+
+
+PROG = "{{cookiecutter.project_name}}"
+VARIABLE = complete_variable(PROG)
+
+
+@pytest.fixture
+def index() -> dict[str, Any]:
+    """The index of the command line."""
+    return build_index(get_command(cli), PROG)
+
+
+def values(items: Any) -> list[str]:
+    """The completions without their help."""
+    return [value for value, _ in items]
+
+
+def test_index_is_current() -> None:
+    """The packaged index matches the commands. Run tools/generate-completions.py if not."""
+    index = build_index(get_command(cli), PROG)
+    assert load_index() == json.loads(json.dumps(index))
+
+
+class Color(str, Enum):
+    """Choices of an argument."""
+
+    RED = "red"
+    BLUE = "blue"
+
+
+def test_build_index() -> None:
+    """Describes choices, dynamic values and visible parameters only."""
+
+    def paint(
+        color: Color,
+        target: str = typer.Argument(..., autocompletion=lambda: ["wall"]),
+        secret: bool = typer.Option(False, hidden=True),
+        coats: int = typer.Option(1),
+    ) -> None:
+        """Paint."""
+
+    def hidden() -> None:
+        """Hidden."""
+
+    app = typer.Typer()
+    app.command()(paint)
+    index = build_index(get_command(app), "paint")
+    paint_node = index["commands"][""]
+    assert paint_node["arguments"] == {"choices": ["red", "blue"], "dynamic": False}
+    assert [option["names"] for option in paint_node["options"]][0] == ["--coats"]
+    assert "--secret" not in render_script(index, "fish")
+    assert "-a 'red blue'" in render_script(index, "fish")
+    # Dynamic values are left to the full program, which runs the callback.
+    environ = {"_PAINT_COMPLETE": "complete_bash", "COMP_WORDS": "paint red w", "COMP_CWORD": "2"}
+    result = CliRunner().invoke(app, env=environ, prog_name="paint")
+    assert result.output == "wall\n"
+
+    group = typer.Typer()
+    group.command()(paint)
+    group.command(hidden=True)(hidden)
+    group.command(name="shown")(hidden)
+    commands = build_index(get_command(group), "paint")["commands"][""]["commands"]
+    assert list(commands) == ["paint", "shown"]
+
+
+def test_missing_index(tmp_path: Path) -> None:
+    """Returns None when there's no index."""
+    assert load_index(str(tmp_path / "missing.json")) is None
+
+
+class TestCandidates:
+    """Test cases for completing a word from the index."""
+
+    def test_commands(self, index: dict[str, Any]) -> None:
+        """Completes subcommands with their help."""
+        assert candidates(index, [], "le") == [
+            ("length", "Print the length of every record next to it.")
+        ]
+
+    def test_options(self, index: dict[str, Any]) -> None:
+        """Completes the options of the current subcommand."""
+        assert "--chunk-size" in values(candidates(index, ["length"], "--ch"))
+        assert "--memory-report" not in values(candidates(index, ["length"], "--"))
+
+    def test_option_choices(self, index: dict[str, Any]) -> None:
+        """Completes the choices of the option before the word."""
+        assert values(candidates(index, ["--output"], "n")) == ["ndjson"]
+
+    def test_skips_option_values(self, index: dict[str, Any]) -> None:
+        """Doesn't mistake option values for subcommands."""
+        assert values(candidates(index, ["-o", "json", "length", "--workers", "2"], "--un")) == [
+            "--unordered"
+        ]
+        assert values(candidates(index, ["--output=csv", "le"], "le")) == ["length"]
+
+    def test_arguments(self, index: dict[str, Any]) -> None:
+        """Leaves free arguments to the shell, and completes choices of arguments."""
+        assert candidates(index, ["length"], "") == []
+        index["commands"]["length"]["arguments"]["choices"] = ["alpha", "beta"]
+        assert values(candidates(index, ["length"], "a")) == ["alpha"]
+
+    def test_no_arguments(self, index: dict[str, Any]) -> None:
+        """Completes nothing where a command takes no arguments."""
+        index["commands"][""]["commands"] = {}
+        assert candidates(index, [], "x") == []
+
+    def test_dynamic(self, index: dict[str, Any]) -> None:
+        """Defers values with custom completion to the full program."""
+        index["commands"]["length"]["arguments"]["dynamic"] = True
+        assert candidates(index, ["length"], "") is None
+
+
+class TestComplete:
+    """Test cases for answering the completion protocol of the installed scripts."""
+
+    def test_bash(self) -> None:
+        """Answers with one completion per line."""
+        environ = {VARIABLE: "complete_bash", "COMP_WORDS": f"{PROG} -o ", "COMP_CWORD": "2"}
+        assert complete(environ, PROG) == ("text\njson\nndjson\ncsv", 0)
+
+    def test_zsh(self) -> None:
+        """Answers with an _arguments call, or files when there's nothing to complete."""
+        environ = {VARIABLE: "complete_zsh", "_TYPER_COMPLETE_ARGS": f"{PROG} le"}
+        answer = complete(environ, PROG)
+        assert answer is not None
+        assert answer[0].startswith('_arguments \'*: :(("length":"Print the length')
+        environ["_TYPER_COMPLETE_ARGS"] = f"{PROG} length "
+        assert complete(environ, PROG) == ("_files", 0)
+
+    def test_zsh_without_help(self) -> None:
+        """Leaves out the help of choices."""
+        environ = {VARIABLE: "complete_zsh", "_TYPER_COMPLETE_ARGS": f"{PROG} -o cs"}
+        assert complete(environ, PROG) == ("_arguments '*: :((\"csv\"))'", 0)
+
+    def test_fish(self) -> None:
+        """Answers with tab-separated help, and tells fish whether to complete files."""
+        environ = {
+            VARIABLE: "complete_fish",
+            "_TYPER_COMPLETE_ARGS": f"{PROG} length --un",
+            "_TYPER_COMPLETE_FISH_ACTION": "get-args",
+        }
+        assert complete(environ, PROG) == ("--unordered\tKeep the input order.", 0)
+        environ["_TYPER_COMPLETE_ARGS"] = f"{PROG} -o j"
+        assert complete(environ, PROG) == ("json", 0)
+        environ["_TYPER_COMPLETE_FISH_ACTION"] = "is-args"
+        assert complete(environ, PROG) == ("", 0)
+        environ["_TYPER_COMPLETE_ARGS"] = f"{PROG} length "
+        assert complete(environ, PROG) == ("", 1)
+
+    def test_unclosed_quote(self) -> None:
+        """Completes a word that opens a quote like click does."""
+        environ = {VARIABLE: "complete_bash", "COMP_WORDS": f"{PROG} 'le", "COMP_CWORD": "1"}
+        assert complete(environ, PROG) == ("length", 0)
+
+    @pytest.mark.parametrize(
+        "environ",
+        [
+            {},
+            {VARIABLE: "source_bash"},
+            {VARIABLE: "complete_powershell"},
+            {VARIABLE: "complete_bash", FULL_COMPLETION_VARIABLE: "1"},
+        ],
+    )
+    def test_falls_back(self, environ: dict[str, str]) -> None:
+        """Leaves everything but completion requests to the full program."""
+        assert complete(environ, PROG) is None
+
+    def test_falls_back_without_index(self, tmp_path: Path) -> None:
+        """Leaves completion to the full program when the index is missing."""
+        assert complete({VARIABLE: "complete_bash"}, PROG, str(tmp_path / "missing.json")) is None
+
+    def test_falls_back_for_dynamic_values(self, tmp_path: Path, index: dict[str, Any]) -> None:
+        """Leaves values with custom completion to the full program."""
+        index["commands"]["length"]["arguments"]["dynamic"] = True
+        path = tmp_path / "completion.json"
+        path.write_text(json.dumps(index))
+        environ = {VARIABLE: "complete_bash", "COMP_WORDS": f"{PROG} length ", "COMP_CWORD": "2"}
+        assert complete(environ, PROG, str(path)) is None
+
+
+class TestMain:
+    """Test cases for the entry point."""
+
+    def test_completes(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Prints the completions and exits."""
+        monkeypatch.setattr(sys, "argv", [f"/usr/bin/{PROG}"])
+        monkeypatch.setenv(VARIABLE, "complete_bash")
+        monkeypatch.setenv("COMP_WORDS", f"{PROG} le")
+        monkeypatch.setenv("COMP_CWORD", "1")
+        with pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 0
+        assert capsys.readouterr().out == "length\n"
+
+    def test_completes_nothing(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Prints nothing when there are no completions."""
+        monkeypatch.setattr(sys, "argv", [PROG])
+        monkeypatch.setenv(VARIABLE, "complete_bash")
+        monkeypatch.setenv("COMP_WORDS", f"{PROG} x")
+        monkeypatch.setenv("COMP_CWORD", "1")
+        with pytest.raises(SystemExit):
+            main()
+        assert capsys.readouterr().out == ""
+
+    def test_runs_cli(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Runs the command line otherwise."""
+        monkeypatch.setattr(sys, "argv", [PROG, "--output", "ndjson"])
+        monkeypatch.delenv(VARIABLE, raising=False)
+        with pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 0
+        assert capsys.readouterr().out.startswith('{"version": "')
+
+
+class TestRenderScript:
+    """Test cases for the static completion scripts."""
+
+    @pytest.mark.parametrize("shell", SHELLS)
+    def test_renders(self, index: dict[str, Any], shell: str) -> None:
+        """Mentions every subcommand and option."""
+        script = render_script(index, shell)
+        assert "length" in script
+        assert "chunk-size" in script
+        assert "ndjson" in script
+
+    def test_unknown_shell(self, index: dict[str, Any]) -> None:
+        """Refuses unsupported shells."""
+        with pytest.raises(ValueError):
+            render_script(index, "powershell")
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+    def test_bash_script(self, index: dict[str, Any], tmp_path: Path) -> None:
+        """The bash script completes subcommands, options and choices."""
+        script = tmp_path / "completion.bash"
+        script.write_text(render_script(index, "bash"))
+        function = f"_{PROG.replace('-', '_')}_static_completion"
+        results = []
+        for words in ([PROG, "le"], [PROG, "length", "--un"], [PROG, "-o", "nd"]):
+            line = " ".join(words)
+            command = (
+                f"source {script}; COMP_WORDS=({line}); COMP_CWORD={len(words) - 1}; "
+                f'{function}; echo "$COMPREPLY"'
+            )
+            completed = subprocess.run(  # nosec
+                ["bash", "-c", command], check=True, capture_output=True, text=True
+            )
+            results.append(completed.stdout.strip())
+        assert results == ["length", "--unordered", "ndjson"]
@@ -12,13 +12,60 @@ def runner() -> CliRunner:
     return CliRunner()
 
 
+@pytest.mark.usefixtures("memory_tracker")
 class TestCLI:
-    """Test cases for the command-line interface."""
+    """Test cases for the command-line interface.
+
+    Every test in this class is held to the memory budget in pyproject.toml.
+    """
 
     def test_main_succeeds(self, runner: CliRunner) -> None:
         """Calls the default command and exits with a status code of zero."""
         result = runner.invoke(cli)
         assert result.exit_code == 0
 
+    def test_memory_report(self, runner: CliRunner) -> None:
+        """Prints the memory report when asked to."""
+        result = runner.invoke(cli, ["--memory-report"])
+        assert result.exit_code == 0
+        assert "traced peak:" in result.output
+
+    @pytest.mark.parametrize(
+        ("output", "expected"),
+        [
+            ("text", "0"),
+            ("json", '[\n{"version": "'),
+            ("ndjson", '{"version": "'),
+            ("csv", "version,status\n"),
+        ],
+    )
+    def test_output(self, runner: CliRunner, output: str, expected: str) -> None:
+        """Formats the status as requested, without styling when not on a terminal."""
+        result = runner.invoke(cli, ["--output", output])
+        assert result.exit_code == 0
+        assert result.output.startswith(expected)
+        assert "\x1b[" not in result.output
+
+    def test_batch(self, runner: CliRunner) -> None:
+        """Processes records from standard input in order."""
+        result = runner.invoke(cli, ["length", "--chunk-size", "2"], input="a\nbb\nccc\n")
+        assert result.exit_code == 0
+        assert result.output == "1\ta\n2\tbb\n3\tccc\n"
+
+    def test_batch_output(self, runner: CliRunner) -> None:
+        """Formats batch results as requested."""
+        result = runner.invoke(cli, ["-o", "ndjson", "length"], input="a\n")
+        assert result.output == '{"result": "1\\ta"}\n'
+
+    def test_resources(self, runner: CliRunner) -> None:
+        """Lists the values of the resources, and the pipeline counters on request."""
+        result = runner.invoke(cli, ["-o", "csv", "resources"])
+        assert result.exit_code == 0
+        assert result.output == "resource,path,value\ndata.json,status,Hello World!\n"
+        result = runner.invoke(cli, ["-o", "csv", "resources", "--stats"])
+        assert result.exit_code == 0
+        assert result.output.startswith("resource,path,value\ndata.json,status,Hello World!\n")
+        assert "flatten" in result.output
+
 
 __all__ = ("TestCLI",)
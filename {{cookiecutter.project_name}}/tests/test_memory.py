@@ -0,0 +1,151 @@
+"""Test cases for the _memory module."""
+
+from typing import TYPE_CHECKING
+from typing import cast
+
+import pytest
+
+from {{cookiecutter.package_name}}._memory import MIB
+from {{cookiecutter.package_name}}._memory import AllocationSite
+from {{cookiecutter.package_name}}._memory import MemoryBudget
+from {{cookiecutter.package_name}}._memory import MemoryReport
+from {{cookiecutter.package_name}}._memory import MemoryTracker
+from {{cookiecutter.package_name}}._memory import format_size
+
+from . import conftest
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.terminal import TerminalReporter
+
+
+@pytest.fixture
+def report() -> MemoryReport:
+    """A report with a 2 MiB traced peak and a 100 MiB RSS peak."""
+    return MemoryReport(
+        traced_peak=2 * MIB,
+        rss_peak=100 * MIB,
+        top=(AllocationSite(filename="module.py", lineno=3, size=MIB, count=7),),
+    )
+
+
+class TestMemoryTracker:
+    """Test cases for the memory tracker."""
+
+    def test_records_allocations(self) -> None:
+        """Reports a peak at least as large as a buffer allocated inside the block."""
+        with MemoryTracker() as tracker:
+            buffer = bytearray(4 * MIB)
+            del buffer
+        assert tracker.report is not None
+        assert tracker.report.traced_peak >= 4 * MIB
+
+    def test_nested(self) -> None:
+        """An inner tracker reuses the outer tracer and keeps the peak of the outer one."""
+        with MemoryTracker() as outer:
+            buffer = bytearray(4 * MIB)
+            del buffer
+            with MemoryTracker(limit=1) as inner:
+                data = [str(number) for number in range(1000)]
+            del data
+        assert inner.report is not None
+        assert len(inner.report.top) <= 1
+        assert inner.report.traced_peak < 4 * MIB
+        assert outer.report is not None
+        assert outer.report.traced_peak >= 4 * MIB
+
+    def test_disabled(self) -> None:
+        """A disabled tracker produces no report."""
+        with MemoryTracker(enabled=False) as tracker:
+            pass
+        assert tracker.report is None
+
+
+class TestMemoryReport:
+    """Test cases for memory reports."""
+
+    def test_format(self, report: MemoryReport) -> None:
+        """Lists the peaks and the allocation sites."""
+        text = report.format()
+        assert "traced peak: 2.0 MiB" in text
+        assert "process rss peak: 100.0 MiB" in text
+        assert "module.py:3" in text
+
+    def test_format_without_rss(self) -> None:
+        """Says so when the platform doesn't report RSS."""
+        report = MemoryReport(traced_peak=0, rss_peak=None, top=())
+        assert "process rss peak: unavailable" in report.format()
+
+    @pytest.mark.parametrize(
+        ("size", "expected"),
+        [(512, "512.0 B"), (2048, "2.0 KiB"), (3 * MIB, "3.0 MiB"), (5 * 1024 * MIB, "5.0 GiB")],
+    )
+    def test_format_size(self, size: int, expected: str) -> None:
+        """Picks the largest unit that keeps the value above one."""
+        assert format_size(size) == expected
+
+
+class TestMemoryBudget:
+    """Test cases for memory budgets."""
+
+    def test_from_mapping(self) -> None:
+        """Reads the keys of the ``[tool.memory-budget]`` table."""
+        assert MemoryBudget.from_mapping({"traced-peak-mib": 1}) == MemoryBudget(traced_peak_mib=1)
+
+    def test_within_budget(self, report: MemoryReport) -> None:
+        """A report under every limit has no violations."""
+        assert MemoryBudget(traced_peak_mib=4).violations(report) == []
+
+    def test_unenforced(self, report: MemoryReport) -> None:
+        """Missing limits are not enforced."""
+        assert MemoryBudget().violations(report) == []
+
+    def test_exceeded(self, report: MemoryReport) -> None:
+        """An exceeded limit is reported."""
+        violations = MemoryBudget(traced_peak_mib=1).violations(report)
+        assert violations == ["traced peak 2.0 MiB exceeds 1 MiB"]
+
+
+class FakeReporter:
+    """Records what the terminal summary writes."""
+
+    def __init__(self, verbosity: int) -> None:
+        """Start with no output."""
+        self.verbosity = verbosity
+        self.lines: list[str] = []
+
+    def section(self, title: str) -> None:
+        """Record a section title."""
+        self.lines.append(f"== {title}")
+
+    def write_line(self, line: str) -> None:
+        """Record a line."""
+        self.lines.append(line)
+
+
+class TestTerminalSummary:
+    """Test cases for the memory usage section of the terminal summary."""
+
+    @pytest.fixture(autouse=True)
+    def reports(self, report: MemoryReport, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Replace the reports of this run with one within and one over the budget."""
+        monkeypatch.setattr(
+            conftest, "_reports", [("test_within", report, False), ("test_over", report, True)]
+        )
+
+    @pytest.mark.parametrize(
+        ("verbosity", "expected"), [(0, ["test_over"]), (1, ["test_within", "test_over"])]
+    )
+    def test_summary(self, verbosity: int, expected: list[str]) -> None:
+        """Reports tests over the budget, and every test when verbose."""
+        reporter = FakeReporter(verbosity)
+        conftest.pytest_terminal_summary(cast("TerminalReporter", reporter))
+        assert reporter.lines[0] == "== memory usage"
+        assert [line for line in reporter.lines if line.startswith("test_")] == expected
+
+    def test_nothing_to_report(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Leaves the section out when no test exceeded the budget."""
+        monkeypatch.setattr(conftest, "_reports", [])
+        reporter = FakeReporter(0)
+        conftest.pytest_terminal_summary(cast("TerminalReporter", reporter))
+        assert reporter.lines == []
@@ -0,0 +1,87 @@
+"""Test cases for the _output module."""
+
+import io
+import json
+from collections.abc import Iterator
+
+import pytest
+
+from {{cookiecutter.package_name}}._output import OutputFormat
+from {{cookiecutter.package_name}}._output import use_color
+from {{cookiecutter.package_name}}._output import write_rows
+
+
+ROWS = [{"name": "a", "size": 1}, {"name": "b,c", "size": 2}]
+
+
+def render(rows: "list[dict[str, object]]", output: OutputFormat, **kwargs: object) -> str:
+    """Write rows to memory and return the text."""
+    stream = io.BytesIO()
+    write_rows(rows, output, stream, **kwargs)  # type: ignore[arg-type]
+    return stream.getvalue().decode()
+
+
+class TerminalBytesIO(io.BytesIO):
+    """An in-memory stream that claims to be a terminal."""
+
+    def isatty(self) -> bool:
+        """Claim to be a terminal."""
+        return True
+
+
+@pytest.mark.parametrize(
+    ("output", "expected"),
+    [
+        (OutputFormat.TEXT, "a 1\nb,c 2\n"),
+        (OutputFormat.NDJSON, '{"name": "a", "size": 1}\n{"name": "b,c", "size": 2}\n'),
+        (OutputFormat.CSV, 'name,size\na,1\n"b,c",2\n'),
+    ],
+)
+def test_formats(output: OutputFormat, expected: str) -> None:
+    """Renders rows in each line-based format."""
+    assert render(ROWS, output) == expected
+
+
+def test_json() -> None:
+    """Renders a valid JSON array, also when empty."""
+    assert json.loads(render(ROWS, OutputFormat.JSON)) == ROWS
+    assert json.loads(render([], OutputFormat.JSON)) == []
+    assert render([], OutputFormat.CSV) == ""
+
+
+def test_non_json_values() -> None:
+    """Writes values JSON can't represent as strings."""
+    assert render([{"value": {1, 2}}], OutputFormat.NDJSON) == '{"value": "{1, 2}"}\n'
+
+
+def test_styles() -> None:
+    """Styles columns only when color is enabled."""
+    styles = {"name": {"bold": True}}
+    assert render(ROWS[:1], OutputFormat.TEXT, styles=styles, color=True) == "\x1b[1ma\x1b[0m 1\n"
+    assert render(ROWS[:1], OutputFormat.TEXT, styles=styles, color=False) == "a 1\n"
+
+
+def test_use_color(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Colors terminals unless NO_COLOR is set."""
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    assert use_color(TerminalBytesIO())
+    assert not use_color(io.BytesIO())
+    monkeypatch.setenv("NO_COLOR", "1")
+    assert not use_color(TerminalBytesIO())
+
+
+def test_streams_in_buffered_writes() -> None:
+    """Consumes generators lazily and writes in chunks of the buffer size."""
+    writes = []
+
+    class Recorder(io.BytesIO):
+        def write(self, data: "bytes") -> int:  # type: ignore[override]
+            writes.append(len(data))
+            return len(data)
+
+    def rows() -> Iterator[dict[str, int]]:
+        yield from ({"number": number} for number in range(1000))
+
+    assert write_rows(rows(), OutputFormat.TEXT, Recorder(), buffer_size=1024) == 1000
+    assert len(writes) > 2
+    assert all(size < 1100 for size in writes)
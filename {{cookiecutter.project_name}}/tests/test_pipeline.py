@@ -0,0 +1,200 @@
+"""Test cases for the _pipeline module."""
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from contextlib import aclosing
+from itertools import count
+from itertools import islice
+
+import pytest
+
+from {{cookiecutter.package_name}}._pipeline import Pipeline
+from {{cookiecutter.package_name}}._pipeline import StageStats
+from {{cookiecutter.package_name}}._pipeline import flatten
+from {{cookiecutter.package_name}}._pipeline import resource_documents
+from {{cookiecutter.package_name}}._pipeline import resource_pipeline
+from {{cookiecutter.package_name}}._pipeline import stage
+
+
+@stage()
+def double(items: Iterator[int]) -> Iterator[int]:
+    """Double every item."""
+    for item in items:
+        yield item * 2
+
+
+@stage(name="odd")
+async def odd(items: AsyncIterator[int]) -> AsyncIterator[int]:
+    """Keep odd items."""
+    async for item in items:
+        if item % 2:
+            yield item
+
+
+@stage()
+def fail(items: Iterator[int]) -> Iterator[int]:
+    """Fail on the third item."""
+    yield from islice(items, 2)
+    raise ValueError("third item")
+
+
+async def numbers(count: int) -> AsyncIterator[int]:
+    """An asynchronous source."""
+    for number in range(count):
+        await asyncio.sleep(0)
+        yield number
+
+
+class TestPipeline:
+    """Test cases for running pipelines."""
+
+    def test_run(self) -> None:
+        """Streams every item through every stage."""
+        pipeline = Pipeline(odd, double, batch_size=7)
+        assert sorted(pipeline.run(range(100))) == [number * 2 for number in range(1, 100, 2)]
+
+    def test_run_lazily(self) -> None:
+        """Yields results before the source is exhausted, and stops it when closed."""
+        pipeline = Pipeline(batch_size=1, queue_size=1)
+        results = pipeline.run(count())
+        assert next(results) == 0
+        results.close()
+        assert pipeline.stats[0].items_out < 10
+
+    def test_stream(self) -> None:
+        """Yields the results in a running event loop."""
+
+        async def collect() -> list[int]:
+            return [item async for item in Pipeline(odd, batch_size=3).stream(range(10))]
+
+        assert asyncio.run(collect()) == [1, 3, 5, 7, 9]
+
+    def test_async_source(self) -> None:
+        """Reads asynchronous sources on the loop."""
+        assert list(Pipeline(double, odd).run(numbers(10))) == []
+        assert list(Pipeline(odd).run(numbers(10))) == [1, 3, 5, 7, 9]
+
+    def test_no_stages(self) -> None:
+        """Passes the source through."""
+        assert list(Pipeline(batch_size=3).run(iter(range(10)))) == list(range(10))
+
+    def test_stats(self) -> None:
+        """Counts the items going in and out of every stage."""
+        pipeline = Pipeline(double, odd, batch_size=10)
+        assert sum(1 for _ in pipeline.run(range(1000))) == 0
+        source, doubled, kept = pipeline.stats
+        assert (source.name, source.items_in, source.items_out) == ("source", 0, 1000)
+        assert (doubled.name, doubled.items_in, doubled.items_out) == ("double", 1000, 1000)
+        assert (kept.name, kept.items_in, kept.items_out) == ("odd", 1000, 0)
+        assert doubled.elapsed > 0
+        assert doubled.throughput > 0
+        assert doubled.busy + doubled.waiting <= doubled.elapsed * doubled.workers + 0.01
+
+    def test_stats_format(self) -> None:
+        """Renders one line per stage, even one that never ran."""
+        line = StageStats("parse", 2, items_in=10, items_out=5, elapsed=0.5).format()
+        assert line.startswith("parse")
+        assert "10.0/s" in line
+        assert "0.0/s" in StageStats("idle", 1).format()
+
+    def test_workers(self) -> None:
+        """Runs the generators of a stage concurrently."""
+
+        @stage(workers=4)
+        def slow(items: Iterator[int]) -> Iterator[str]:
+            for _ in items:
+                time.sleep(0.02)
+                yield threading.current_thread().name
+
+        names = list(Pipeline(slow, batch_size=1).run(range(16)))
+        assert len(names) == 16
+        assert len(set(names)) > 1
+
+    def test_bounded_queues(self) -> None:
+        """Keeps a fast source at most a few batches ahead of a slow consumer."""
+        produced = 0
+
+        def source() -> Iterator[int]:
+            nonlocal produced
+            while True:
+                produced += 1
+                yield produced
+
+        async def consume() -> int:
+            pipeline = Pipeline(batch_size=1, queue_size=2)
+            async with aclosing(pipeline.stream(source())) as results:
+                consumed = 0
+                async for _ in results:
+                    consumed += 1
+                    await asyncio.sleep(0.001)
+                    # Queued batches, one waiting to be queued and one being consumed.
+                    assert produced - consumed <= 4
+                    if consumed == 50:
+                        break
+            return consumed
+
+        assert asyncio.run(consume()) == 50
+
+    def test_stage_error(self) -> None:
+        """Raises the first error of a stage, caused by the group of all, and stops the others."""
+        with pytest.raises(ValueError, match="third item") as info:
+            list(Pipeline(fail, double, batch_size=1, queue_size=1).run(range(1000)))
+        assert isinstance(info.value.__cause__, ExceptionGroup)
+        assert info.value in info.value.__cause__.exceptions
+
+    def test_async_stage_error(self) -> None:
+        """Stops a source that hasn't produced anything yet."""
+
+        @stage()
+        async def broken(items: AsyncIterator[int]) -> AsyncIterator[int]:
+            raise ValueError("broken")
+            yield 0  # pragma: no cover
+
+        def slow_source() -> Iterator[int]:
+            time.sleep(0.1)
+            yield from range(10)
+
+        with pytest.raises(ValueError, match="broken"):
+            list(Pipeline(broken).run(slow_source()))
+
+    def test_close_early(self) -> None:
+        """Stops busy worker threads when the results aren't read to the end."""
+
+        def delay(item: int) -> int:
+            time.sleep(0.01)
+            return item
+
+        @stage()
+        def slow(items: Iterator[int]) -> Iterator[int]:
+            yield from map(delay, items)
+
+        async def first() -> int:
+            async with aclosing(Pipeline(slow, batch_size=1).stream(count())) as results:
+                return int(await anext(results))
+
+        assert asyncio.run(first()) == 0
+
+
+class TestResourcePipeline:
+    """Test cases for the sample pipeline."""
+
+    def test_documents(self) -> None:
+        """Reads the JSON data files, not the completion index."""
+        assert list(dict(resource_documents())) == ["data.json"]
+
+    def test_rows(self) -> None:
+        """Flattens the data files into rows."""
+        rows = list(resource_pipeline().run(resource_documents()))
+        assert rows == [{"resource": "data.json", "path": "status", "value": "Hello World!"}]
+
+    def test_flatten(self) -> None:
+        """Names the scalars of nested objects and arrays by their dotted path."""
+        rows = Pipeline(flatten).run([("a.json", {"b": [1, {"c": None}], "d": "e"})])
+        assert [(row["path"], row["value"]) for row in rows] == [
+            ("b.0", 1),
+            ("b.1.c", None),
+            ("d", "e"),
+        ]
@@ -0,0 +1,318 @@
+"""Test cases for the _scheduler module."""
+
+import asyncio
+import functools
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+import pytest
+from typer.testing import CliRunner
+
+from {{cookiecutter.package_name}}.__main__ import cli
+from {{cookiecutter.package_name}}._scheduler import Cron
+from {{cookiecutter.package_name}}._scheduler import Interval
+from {{cookiecutter.package_name}}._scheduler import Job
+from {{cookiecutter.package_name}}._scheduler import JobStats
+from {{cookiecutter.package_name}}._scheduler import Scheduler
+from {{cookiecutter.package_name}}._scheduler import _waits
+from {{cookiecutter.package_name}}._scheduler import load_jobs
+from {{cookiecutter.package_name}}._scheduler import run_command
+
+
+START = datetime(2024, 1, 31, 23, 59, 30)  # A Wednesday.
+
+
+def run(scheduler: Scheduler, seconds: float) -> None:
+    """Run the jobs of a scheduler for a while."""
+
+    async def main() -> None:
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(seconds, stop.set)
+        await scheduler.run(stop)
+
+    asyncio.run(main())
+
+
+class TestInterval:
+    """Test cases for interval schedules."""
+
+    def test_next_after(self) -> None:
+        """Adds the interval without drifting."""
+        schedule = Interval(0.5)
+        assert schedule.next_after(schedule.next_after(START)) == datetime(2024, 1, 31, 23, 59, 31)
+
+    def test_waits(self) -> None:
+        """Counts on the given clock, skipping the due times it missed."""
+        now = [100.0]
+        waits = _waits(Interval(2), lambda: now[0])
+        assert next(waits) == (2.0, 0)
+        now[0] = 107.0
+        assert next(waits) == (1.0, 2)
+
+    def test_invalid(self) -> None:
+        """Rejects intervals that aren't positive."""
+        with pytest.raises(ValueError, match="positive"):
+            Interval(0)
+
+
+class TestCron:
+    """Test cases for cron schedules."""
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("* * * * *", datetime(2024, 2, 1, 0, 0)),
+            ("*/15 9-17 * * 1-5", datetime(2024, 2, 1, 9, 0)),
+            ("5/20 * * * *", datetime(2024, 2, 1, 0, 5)),
+            ("30 6 1,15 * *", datetime(2024, 2, 1, 6, 30)),
+            ("0 0 * 3 *", datetime(2024, 3, 1, 0, 0)),
+            ("0 0 * * 7", datetime(2024, 2, 4, 0, 0)),
+            ("0 0 29 2 *", datetime(2024, 2, 29, 0, 0)),
+            ("0 12 13 * 5", datetime(2024, 2, 2, 12, 0)),
+            ("@hourly", datetime(2024, 2, 1, 0, 0)),
+            ("@weekly", datetime(2024, 2, 4, 0, 0)),
+            ("@yearly", datetime(2025, 1, 1, 0, 0)),
+        ],
+    )
+    def test_next_after(self, expression: str, expected: datetime) -> None:
+        """Finds the next matching minute."""
+        assert Cron(expression).next_after(START) == expected
+
+    def test_repr(self) -> None:
+        """Shows the expression."""
+        assert repr(Cron("@daily")) == "Cron('@daily')"
+
+    @pytest.mark.parametrize(
+        "expression", ["* * * *", "60 * * * *", "a * * * *", "*/0 * * * *", "5-1 * * * *"]
+    )
+    def test_invalid(self, expression: str) -> None:
+        """Rejects malformed expressions."""
+        with pytest.raises(ValueError, match="cron"):
+            Cron(expression)
+
+    def test_never_matches(self) -> None:
+        """Rejects expressions matching no date."""
+        with pytest.raises(ValueError, match="never matches"):
+            Cron("0 0 31 2 *").next_after(START)
+
+    def test_waits(self) -> None:
+        """Counts on the wall clock, skipping the due times it missed."""
+        now = [START]
+        waits = _waits(Cron("* * * * *"), time.monotonic, lambda: now[0])
+        assert next(waits) == (30.0, 0)
+        now[0] = datetime(2024, 2, 1, 0, 2, 45)
+        assert next(waits) == (15.0, 2)
+
+
+class TestJobStats:
+    """Test cases for the run counters."""
+
+    def test_empty(self) -> None:
+        """Reports zero durations before the first run."""
+        stats = JobStats("job")
+        assert (stats.mean, stats.percentile(0.95)) == (0.0, 0.0)
+        assert "0 runs" in stats.format()
+
+    def test_percentiles(self) -> None:
+        """Computes the mean and percentiles of the durations."""
+        stats = JobStats("job")
+        for duration in range(1, 101):
+            stats.record(duration)
+        assert (stats.runs, stats.mean) == (100, 50.5)
+        assert (stats.percentile(0.5), stats.percentile(0.95), stats.percentile(0)) == (50, 95, 1)
+        assert "p95   95.000s" in stats.format()
+
+
+class TestScheduler:
+    """Test cases for running jobs."""
+
+    def test_invalid_job(self) -> None:
+        """Rejects invalid options."""
+        with pytest.raises(ValueError, match="positive"):
+            Job("job", print, Interval(1), jitter=-1)
+        with pytest.raises(ValueError, match="positive"):
+            Job("job", print, Interval(1), timeout=0)
+        with pytest.raises(ValueError, match="executor"):
+            Job("job", print, Interval(1), executor="fiber")  # type: ignore[arg-type]
+
+    def test_duplicate(self) -> None:
+        """Rejects two jobs with the same name."""
+        scheduler = Scheduler()
+        scheduler.add(Job("job", print, Interval(1)))
+        with pytest.raises(ValueError, match="already"):
+            scheduler.add(Job("job", print, Interval(1)))
+
+    def test_runs(self) -> None:
+        """Runs coroutine functions, functions in threads and functions in processes."""
+        scheduler = Scheduler(workers=1)
+        calls: list[str] = []
+
+        @scheduler.job(Interval(0.02), jitter=0.001)
+        async def coroutine() -> None:
+            calls.append("coroutine")
+
+        @scheduler.job(Interval(0.02), name="thread")
+        def function() -> None:
+            calls.append("thread")
+
+        scheduler.add(Job("process", os.getpid, Interval(0.02), executor="process"))
+        run(scheduler, 0.15)
+        assert {"coroutine", "thread"} <= set(calls)
+        assert all(stats.runs >= 2 and not stats.failures for stats in scheduler.stats.values())
+
+    def test_failure(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Counts and logs failed runs."""
+        scheduler = Scheduler()
+
+        @scheduler.job(Interval(0.02))
+        def failing() -> None:
+            raise RuntimeError("broken")
+
+        run(scheduler, 0.07)
+        assert scheduler.stats["failing"].failures == scheduler.stats["failing"].runs >= 1
+        assert "job failing failed" in caplog.text
+
+    def test_overlap(self) -> None:
+        """Skips runs while the previous one is still going, and waits for it on stopping."""
+        scheduler = Scheduler()
+        scheduler.add(Job("slow", functools.partial(time.sleep, 0.1), Interval(0.02)))
+        run(scheduler, 0.09)
+        stats = scheduler.stats["slow"]
+        assert stats.runs == 1 and stats.skipped >= 2
+        assert stats.durations[0] >= 0.1
+
+    def test_missed(self) -> None:
+        """Skips and counts the runs missed while the event loop was blocked."""
+        scheduler = Scheduler()
+
+        @scheduler.job(Interval(0.01))
+        async def blocking() -> None:
+            time.sleep(0.05)
+
+        run(scheduler, 0.1)
+        assert 1 <= scheduler.stats["blocking"].runs <= 3
+        assert scheduler.stats["blocking"].skipped >= 1
+
+    def test_timeout(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Cancels coroutines that time out, and counts functions that do."""
+        scheduler = Scheduler()
+
+        @scheduler.job(Interval(0.02), timeout=0.01)
+        async def coroutine() -> None:
+            await asyncio.sleep(1)
+
+        scheduler.add(
+            Job("thread", functools.partial(time.sleep, 0.04), Interval(0.02), timeout=0.01)
+        )
+        run(scheduler, 0.07)
+        assert scheduler.stats["coroutine"].timeouts == scheduler.stats["coroutine"].runs >= 1
+        assert scheduler.stats["thread"].timeouts == scheduler.stats["thread"].runs >= 1
+        assert scheduler.stats["thread"].durations[0] >= 0.04
+        assert "job coroutine timed out" in caplog.text
+        assert "job thread is taking longer" in caplog.text
+
+    def test_serve_duration(self) -> None:
+        """Stops after the given duration."""
+        scheduler = Scheduler()
+        start = time.perf_counter()
+        asyncio.run(scheduler.serve(0.02))
+        assert time.perf_counter() - start < 1
+
+    def test_serve_signal(self) -> None:
+        """Stops on a termination signal."""
+        scheduler = Scheduler()
+
+        @scheduler.job(Interval(0.01))
+        def terminate() -> None:
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        asyncio.run(scheduler.serve())
+        assert scheduler.stats["terminate"].runs >= 1
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+
+class TestCommands:
+    """Test cases for running commands on a schedule."""
+
+    def test_run_command(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Runs a command in this process."""
+        run_command(("resources",))
+        run_command(("--help",))
+        assert "Usage:" in capsys.readouterr().out
+
+    def test_run_command_status(self) -> None:
+        """Fails if the command exits with an error status."""
+        command = click.Command("fail", callback=lambda: click.get_current_context().exit(3))
+        with pytest.raises(RuntimeError, match="status 3"):
+            run_command((), command)
+
+    def test_load_jobs(self, tmp_path: Path) -> None:
+        """Reads the jobs from a TOML file."""
+        path = tmp_path / "jobs.toml"
+        path.write_text(
+            "[jobs.resources]\n"
+            'command = ["resources"]\n'
+            "every = 60\n"
+            "jitter = 5\n"
+            "timeout = 30\n"
+            "[jobs.report]\n"
+            'command = ["-o", "json"]\n'
+            'cron = "@daily"\n'
+            'executor = "process"\n'
+        )
+        resources, report = load_jobs(path)
+        assert (resources.name, resources.schedule, resources.jitter, resources.timeout) == (
+            "resources",
+            Interval(60),
+            5,
+            30,
+        )
+        assert (repr(report.schedule), report.timeout, report.executor) == (
+            "Cron('@daily')",
+            None,
+            "process",
+        )
+        assert isinstance(report.function, functools.partial)
+        assert report.function.args == (("-o", "json"),)
+
+    @pytest.mark.parametrize(
+        ("text", "message"),
+        [
+            ('[jobs.a]\ncommand = ["resources"]\nevery = 1\nretries = 3\n', "unknown keys retries"),
+            ('[jobs.a]\ncommand = ["resources"]\n', "either every or cron"),
+            (
+                '[jobs.a]\ncommand = ["resources"]\nevery = 1\ncron = "@daily"\n',
+                "either every or cron",
+            ),
+            ("[jobs.a]\nevery = 1\n", "needs a command"),
+        ],
+    )
+    def test_load_jobs_invalid(self, tmp_path: Path, text: str, message: str) -> None:
+        """Rejects jobs described wrongly."""
+        path = tmp_path / "jobs.toml"
+        path.write_text(text)
+        with pytest.raises(ValueError, match=message):
+            load_jobs(path)
+
+    def test_schedule(self, tmp_path: Path) -> None:
+        """Runs the jobs of a file for a while and prints their counters."""
+        path = tmp_path / "jobs.toml"
+        path.write_text('[jobs.resources]\ncommand = ["resources"]\nevery = 0.02\n')
+        result = CliRunner(mix_stderr=False).invoke(
+            cli, ["schedule", str(path), "--run-for", "0.1"]
+        )
+        assert result.exit_code == 0, result.stderr
+        assert result.stderr.startswith("resources ")
+        assert "0 failed" in result.stderr
+
+    def test_schedule_invalid(self, tmp_path: Path) -> None:
+        """Reports an invalid file as a usage error."""
+        path = tmp_path / "jobs.toml"
+        path.write_text('[jobs.a]\ncommand = ["resources"]\ncron = "daily"\n')
+        result = CliRunner(mix_stderr=False).invoke(cli, ["schedule", str(path)])
+        assert result.exit_code == 2
+        assert "five fields" in result.stderr
@@ -0,0 +1,282 @@
+"""Test cases for the _tracing module."""
+
+import asyncio
+import json
+import os
+import random
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from typer.testing import CliRunner
+
+from {{cookiecutter.package_name}}.__main__ import cli
+from {{cookiecutter.package_name}}._assets import SharedResource
+from {{cookiecutter.package_name}}._tracing import TRACE_FILE_VARIABLE
+from {{cookiecutter.package_name}}._tracing import TRACE_VARIABLE
+from {{cookiecutter.package_name}}._tracing import Tracer
+from {{cookiecutter.package_name}}._tracing import default_tracer
+from {{cookiecutter.package_name}}._tracing import export_trace
+from {{cookiecutter.package_name}}._tracing import sampling_rate
+from {{cookiecutter.package_name}}._tracing import span
+from {{cookiecutter.package_name}}._tracing import trace_path
+
+
+@pytest.fixture
+def tracer(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Tracer]:
+    """The default tracer, recording every trace to a temporary file."""
+    monkeypatch.setenv(TRACE_VARIABLE, "1")
+    monkeypatch.setenv(TRACE_FILE_VARIABLE, str(tmp_path / "trace.json"))
+    default_tracer.cache_clear()
+    yield default_tracer()
+    default_tracer.cache_clear()
+
+
+def names(tracer: Tracer) -> list[str]:
+    """The names of the recorded spans, in the order they ended."""
+    return [record[0] for record in tracer.spans]
+
+
+def events(tracer: Tracer) -> list[dict[str, Any]]:
+    """The span events of the Chrome trace."""
+    return [event for event in tracer.chrome_trace()["traceEvents"] if event["ph"] == "X"]
+
+
+@pytest.mark.parametrize(
+    ("value", "rate"),
+    [("", 0.0), ("0", 0.0), ("off", 0.0), ("1", 1.0), ("true", 1.0), ("0.25", 0.25), ("7", 1.0)],
+)
+def test_sampling_rate(value: str, rate: float) -> None:
+    """Parses the sampling rate of the environment variable."""
+    assert sampling_rate(value) == rate
+
+
+class TestSpan:
+    """Test cases for recording spans."""
+
+    def test_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Records nothing unless tracing is enabled."""
+        monkeypatch.delenv(TRACE_VARIABLE, raising=False)
+        default_tracer.cache_clear()
+        with span("ignored"):
+            pass
+        assert not default_tracer().spans
+
+    def test_nested(self, tracer: Tracer) -> None:
+        """Records nested spans with their attributes, and the errors that ended them."""
+        with span("outer", size=3):
+            with pytest.raises(KeyError):
+                with span("inner"):
+                    raise KeyError("missing")
+        assert [(record[0], record[4]) for record in tracer.spans] == [
+            ("inner", {"error": "KeyError"}),
+            ("outer", {"size": 3}),
+        ]
+        outer, inner = events(tracer)
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert outer["args"] == {"size": 3}
+        assert inner["args"] == {"error": "KeyError"}
+
+    def test_decorator(self, tracer: Tracer) -> None:
+        """Records every call of a decorated function."""
+
+        @span("double")
+        def double(value: int) -> int:
+            return value * 2
+
+        assert double(2) + double(3) == 10
+        assert names(tracer) == ["double", "double"]
+
+    def test_async(self, tracer: Tracer) -> None:
+        """Records coroutines on a track per task."""
+
+        @span("work")
+        async def work(delay: float) -> float:
+            async with span("step"):
+                await asyncio.sleep(delay)
+            return delay
+
+        async def main() -> list[float]:
+            with span("main"):
+                return list(await asyncio.gather(work(0.02), work(0.01)))
+
+        assert asyncio.run(main()) == [0.02, 0.01]
+        assert sorted(names(tracer)) == ["main", "step", "step", "work", "work"]
+        tracks = {event["tid"] for event in events(tracer) if event["name"] == "work"}
+        assert len(tracks) == 2
+
+    def test_reentrant(self, tracer: Tracer) -> None:
+        """Times every level of a recursive call through the same span."""
+
+        @span("countdown")
+        def countdown(number: int) -> int:
+            return number and countdown(number - 1) + 1
+
+        assert countdown(3) == 3
+        starts = [record[1] for record in tracer.spans]
+        ends = [record[2] for record in tracer.spans]
+        assert len(starts) == 4
+        assert starts == sorted(starts, reverse=True)
+        assert ends == sorted(ends)
+
+    def test_shared_by_tasks(self, tracer: Tracer) -> None:
+        """Times the tasks and threads entering the same span at once separately."""
+        shared = span("shared")
+
+        async def work(delay: float) -> None:
+            async with shared:
+                await asyncio.sleep(delay)
+
+        async def main() -> None:
+            await asyncio.gather(work(0.03), work(0.01))
+
+        asyncio.run(main())
+        threads = [threading.Thread(target=shared(lambda: None)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        durations = sorted(record[2] - record[1] for record in tracer.spans)
+        assert len(durations) == 4
+        assert durations[-2] >= 10_000_000
+        assert durations[-1] >= 30_000_000
+        assert len({record[3] for record in tracer.spans}) == 4
+
+    def test_enabled_while_open(self, tracer: Tracer) -> None:
+        """Ignores the end of spans that started while tracing was off."""
+        tracer.rate = 0.0
+        with span("off"):
+            tracer.rate = 1.0
+        with span("outer"):
+            tracer.rate = 0.0
+            with span("inner"):
+                tracer.rate = 1.0
+        assert names(tracer) == ["outer"]
+
+    def test_sampling(self, tracer: Tracer, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Decides once per trace whether to record it."""
+        tracer.rate = 0.5
+        monkeypatch.setattr(random, "random", lambda: 0.9)
+        with span("dropped"):
+            with span("dropped child"):
+                pass
+        monkeypatch.setattr(random, "random", lambda: 0.1)
+        with span("kept"):
+            with span("kept child"):
+                pass
+        assert names(tracer) == ["kept child", "kept"]
+
+    def test_reused_task_ids(self, tracer: Tracer) -> None:
+        """Gives tasks a track each, even when a finished task's id is reused."""
+
+        async def main() -> None:
+            for number in range(5):
+                await asyncio.create_task(span("task")(asyncio.sleep)(0), name=f"task {number}")
+
+        asyncio.run(main())
+        assert sorted(tracer.tracks.values()) == [
+            f"MainThread: task {number}" for number in range(5)
+        ]
+
+    def test_forgets_unused_tracks(self) -> None:
+        """Drops the names of tasks without spans in the buffer once there are many."""
+        tracer = Tracer(capacity=3)
+
+        async def record() -> None:
+            tracer.record("task", 0, 1, None)
+
+        async def main() -> None:
+            for _ in range(1010):
+                await asyncio.create_task(record())
+
+        asyncio.run(main())
+        assert len(tracer.spans) == 3
+        assert len(tracer.tracks) < 1010
+        assert {record[3] for record in tracer.spans} <= set(tracer.tracks)
+
+    def test_ring_buffer(self) -> None:
+        """Keeps only the most recent spans."""
+        tracer = Tracer(capacity=3)
+        for number in range(5):
+            tracer.record(str(number), number, number + 1, None)
+        assert names(tracer) == ["2", "3", "4"]
+
+
+class TestExport:
+    """Test cases for exporting traces."""
+
+    def test_chrome_trace(self, tracer: Tracer, tmp_path: Path) -> None:
+        """Writes complete events in microseconds, and names their threads."""
+        tracer.record("load", tracer.epoch + 1000, tracer.epoch + 3000, {"resource": "data.json"})
+        path = tmp_path / "out.json"
+        assert tracer.export(path) == 1
+        trace = json.loads(path.read_text())
+        metadata, event = trace["traceEvents"]
+        assert metadata["ph"] == "M"
+        assert metadata["args"]["name"] == "MainThread"
+        assert event == {
+            "name": "load",
+            "ph": "X",
+            "ts": 1.0,
+            "dur": 2.0,
+            "pid": os.getpid(),
+            "tid": metadata["tid"],
+            "args": {"resource": "data.json"},
+        }
+
+    def test_unnamed_track(self, tracer: Tracer) -> None:
+        """Names tracks whose names were dropped by their number."""
+        tracer.record("load", tracer.epoch, tracer.epoch + 1000, None)
+        tracer.tracks.clear()
+        metadata, _ = tracer.chrome_trace()["traceEvents"]
+        assert metadata["args"]["name"] == "track 1"
+
+    def test_export_trace(self, tracer: Tracer, tmp_path: Path) -> None:
+        """Writes the spans to the configured file and forgets them, if there are any."""
+        assert export_trace() is None
+        with span("work"):
+            pass
+        assert export_trace() == tmp_path / "trace.json"
+        assert not tracer.spans
+        assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+
+    def test_trace_path(self) -> None:
+        """Defaults to a file of this process in the temporary directory."""
+        assert trace_path({}).name == f"{{cookiecutter.package_name}}-trace-{os.getpid()}.json"
+        assert trace_path({TRACE_FILE_VARIABLE: "out.json"}) == Path("out.json")
+
+
+class TestAutomaticSpans:
+    """Test cases for the spans around commands and resources."""
+
+    def test_cli(self, tracer: Tracer, tmp_path: Path) -> None:
+        """Traces every invocation, and writes the trace when it ends."""
+        result = CliRunner().invoke(cli)
+        assert result.exit_code == 0
+        assert "trace written to" in result.output
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        spans = [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"]
+        assert spans == ["cli.main", "assets.load"]
+
+    def test_scheduled_commands(self, tracer: Tracer, tmp_path: Path) -> None:
+        """Commands run by the scheduler add to the trace of the schedule command."""
+        path = tmp_path / "jobs.toml"
+        path.write_text('[jobs.a]\ncommand = ["resources"]\nevery = 0.02\n')
+        result = CliRunner(mix_stderr=False).invoke(
+            cli, ["schedule", str(path), "--run-for", "0.1"]
+        )
+        assert result.stderr.count("trace written to") == 1
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        spans = [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"]
+        assert spans.count("job.a") >= 2
+        assert spans.count("cli.resources") == spans.count("job.a")
+        assert spans.count("cli.schedule") == 1
+
+    def test_assets(self, tracer: Tracer) -> None:
+        """Traces loading, publishing and attaching to resources."""
+        with SharedResource.publish("data.json") as published:
+            SharedResource.attach(published.name).close()
+        assert names(tracer) == ["assets.load", "assets.create", "assets.publish", "assets.attach"]
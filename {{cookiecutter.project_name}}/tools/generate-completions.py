@@ -0,0 +1,51 @@
+"""Generate the completion index and the static completion scripts from the command tree.
+
+The index in the package resources lets the program answer completion requests without
+importing its commands. The static scripts for bash, zsh and fish don't run the program at all.
+The test suite fails when the index is out of date, so run this after changing any command.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from typer.main import get_command
+
+from {{cookiecutter.package_name}}.__main__ import cli
+from {{cookiecutter.package_name}}._completion import SHELLS
+from {{cookiecutter.package_name}}._completion import build_index
+from {{cookiecutter.package_name}}._completion import render_script
+
+
+PROG_NAME = "{{cookiecutter.project_name}}"
+INDEX_NAME = "completion.json"
+SUFFIXES = {"bash": ".bash", "zsh": ".zsh", "fish": ".fish"}
+
+
+def main() -> None:
+    """Write the completion index, and the static scripts if asked to."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--index", type=Path, default=Path("src", "{{cookiecutter.package_name}}", "resources", INDEX_NAME)
+    )
+    parser.add_argument(
+        "--scripts", type=Path, help="also write the static scripts to this directory"
+    )
+    args = parser.parse_args()
+
+    index = build_index(get_command(cli), PROG_NAME)
+    args.index.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n")
+    print(f"wrote {args.index}")
+
+    if args.scripts:
+        args.scripts.mkdir(parents=True, exist_ok=True)
+        for shell in SHELLS:
+            path = args.scripts / f"{PROG_NAME}{SUFFIXES[shell]}"
+            path.write_text(render_script(index, shell))
+            print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Map tests to the source lines they cover and select the tests affected by a change.
+
+``record`` turns coverage data collected with ``dynamic_context = "test_function"`` into an
+impact map stored in a small SQLite database, together with the commit it was recorded at.
+It records nothing outside a git repository with commits, or if tracked files have
+uncommitted changes, since the map would then describe code that isn't at any commit.
+
+``select REF`` diffs the working tree against REF and prints the node IDs of the tests that
+cover the functions enclosing the changed lines. If there's no git history, the impact map is
+missing or was recorded at a different commit, or the change touches something the map can't
+see (new modules, code outside functions, resources, configuration), it prints ``all``
+instead so the caller runs the full suite. Lines starting with ``#`` explain why.
+"""
+
+import argparse
+import ast
+import re
+import sqlite3
+import subprocess  # nosec
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+from coverage import Coverage
+
+
+DATABASE = Path(".test-impact.sqlite")
+HUNK_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+# Changes to these can't affect the result of any test.
+IGNORED_SUFFIXES = {".md", ".rst", ".txt", ".png", ".yml", ".yaml", ".cfg"}
+IGNORED_DIRECTORIES = {"docs", ".github", "tools"}
+
+
+class UnattributableError(Exception):
+    """The change can't be attributed to specific tests; the message says why."""
+
+
+def git(*args: str) -> str:
+    """Run a git command and return its output."""
+    return subprocess.run(  # nosec
+        ["git", *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def has_commits() -> bool:
+    """Return whether this is a git repository with at least one commit."""
+    try:
+        completed = subprocess.run(  # nosec
+            ["git", "rev-parse", "--verify", "--quiet", "HEAD"], capture_output=True
+        )
+    except FileNotFoundError:  # git isn't installed
+        return False
+    return completed.returncode == 0
+
+
+def nodeid_from_context(context: str) -> str:
+    """Convert a ``test_function`` context like ``tests.test_main.TestCLI.test_x`` to a node ID."""
+    parts = context.split(".")
+    for index in range(len(parts) - 1, 0, -1):
+        path = Path(*parts[:index]).with_suffix(".py")
+        if path.is_file():
+            return "::".join([path.as_posix(), *parts[index:]])
+    return ""
+
+
+def record(data_files: list[str]) -> None:
+    """Build the impact map from coverage data files."""
+    if not has_commits():
+        print(f"not recording {DATABASE}: not in a git repository with commits", file=sys.stderr)
+        return
+    if git("status", "--porcelain", "--untracked-files=no"):
+        print(f"not recording {DATABASE}: tracked files have uncommitted changes", file=sys.stderr)
+        return
+
+    coverage = Coverage(data_file=None)
+    coverage.combine(data_files, keep=True)
+    data = coverage.get_data()
+
+    # Untracked files aren't at the recorded commit, so ``select`` must not find them in the map.
+    tracked = set(git("ls-files").splitlines())
+    rows = []
+    for filename in data.measured_files():
+        path = Path(filename)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(Path.cwd())
+            except ValueError:
+                continue
+        if path.as_posix() not in tracked:
+            continue
+        for lineno, contexts in data.contexts_by_lineno(filename).items():
+            rows.extend(
+                (path.as_posix(), lineno, nodeid_from_context(context)) for context in contexts
+            )
+
+    DATABASE.unlink(missing_ok=True)
+    with sqlite3.connect(DATABASE) as connection:
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute("CREATE TABLE lines (path TEXT, lineno INTEGER, nodeid TEXT)")
+        connection.execute("CREATE INDEX lines_path ON lines (path, lineno)")
+        connection.execute(
+            "INSERT INTO meta VALUES ('commit', ?)", (git("rev-parse", "HEAD").strip(),)
+        )
+        connection.executemany("INSERT INTO lines VALUES (?, ?, ?)", rows)
+    print(f"recorded {len(rows)} covered lines from {len(data_files)} data files in {DATABASE}")
+
+
+@dataclass
+class Hunk:
+    """Lines of a file that a diff replaces, numbered as in the file at REF."""
+
+    start: int
+    count: int
+    added: list[str] = field(default_factory=list)
+
+
+def changed_hunks(ref: str) -> dict[str, list[Hunk]]:
+    """Return the hunks of each file changed since REF.
+
+    A pure insertion replaces no lines and goes after ``start``. Untracked files map to an empty
+    list.
+    """
+    changes: dict[str, list[Hunk]] = defaultdict(list)
+    path = ""
+    hunk = None
+    for line in git("diff", "-U0", "--no-color", "--no-renames", ref).splitlines():
+        if line.startswith("diff "):
+            path, hunk = "", None
+        elif hunk is None and line.startswith("--- "):
+            path = line[6:] if line.startswith("--- a/") else ""
+        elif hunk is None and line.startswith("+++ "):
+            path = path or line[6:]
+            changes.setdefault(path, [])
+        elif match := HUNK_PATTERN.match(line):
+            hunk = Hunk(int(match[1]), int(match[2] or 1))
+            changes[path].append(hunk)
+        elif hunk is not None and line.startswith("+"):
+            hunk.added.append(line[1:])
+    for untracked in git("ls-files", "--others", "--exclude-standard").splitlines():
+        changes.setdefault(untracked, [])
+    return changes
+
+
+def is_inert(line: str) -> bool:
+    """Return whether a line is blank or a comment, so changing it can't affect a test."""
+    return not line.strip() or line.lstrip().startswith("#")
+
+
+def function_bodies(source: str) -> list[tuple[int, int, int]]:
+    """Return the first and last line and the indentation of the body of every function."""
+    bodies = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            statement = node.body[0]
+            decorators = getattr(statement, "decorator_list", [])
+            first = min([statement.lineno, *(decorator.lineno for decorator in decorators)])
+            bodies.append((first, node.end_lineno or first, statement.col_offset))
+    return bodies
+
+
+def enclosing_function(
+    functions: list[tuple[int, int, int]], hunk: Hunk
+) -> tuple[int, int, int] | None:
+    """Return the body of the innermost function that encloses a hunk, if any."""
+    if hunk.count:
+        end = hunk.start + hunk.count - 1
+        candidates = [body for body in functions if body[0] <= hunk.start and end <= body[1]]
+    else:
+        # Lines inserted right after a body belong to it if they are indented as deeply.
+        code = next((line for line in hunk.added if not is_inert(line)), "")
+        indent = len(code) - len(code.lstrip())
+        candidates = [
+            body
+            for body in functions
+            if body[0] - 1 <= hunk.start < body[1] or (hunk.start == body[1] and indent >= body[2])
+        ]
+    candidates.sort(key=lambda body: body[1] - body[0])
+    return candidates[0] if candidates else None
+
+
+def affected_tests(
+    connection: sqlite3.Connection, ref: str, path: str, hunks: list[Hunk]
+) -> set[str]:
+    """Return the node IDs of the tests covering the functions that enclose the hunks.
+
+    Raises :class:`UnattributableError` if any test may depend on the change.
+    """
+    rows = connection.execute(
+        "SELECT lineno, group_concat(nodeid, char(10)) FROM lines WHERE path = ? GROUP BY lineno",
+        (path,),
+    ).fetchall()
+    if not path.endswith(".py") or not rows:
+        raise UnattributableError(f"{path} is not in the impact map")
+    measured = {lineno: set(nodeids.split("\n")) for lineno, nodeids in rows}
+
+    source = git("show", f"{ref}:{path}")
+    lines = source.splitlines()
+    functions = function_bodies(source)
+    selected: set[str] = set()
+    for hunk in hunks:
+        removed = lines[hunk.start - 1 : hunk.start - 1 + hunk.count]
+        if all(is_inert(line) for line in [*removed, *hunk.added]):
+            continue
+        body = enclosing_function(functions, hunk)
+        if body is None:
+            # Module and class bodies run on import, so any test may depend on them.
+            raise UnattributableError(f"{path}:{hunk.start} changes code outside functions")
+        for lineno, nodeids in measured.items():
+            if body[0] <= lineno <= body[1]:
+                if nodeids == {""}:
+                    # Only executed by fixtures, so any test may depend on it.
+                    raise UnattributableError(f"{path}:{lineno} is not covered by a specific test")
+                selected.update(nodeid for nodeid in nodeids if nodeid)
+    return selected
+
+
+def select(ref: str) -> list[str]:
+    """Return the node IDs of the affected tests, or ``["all"]`` to run the full suite."""
+    if not has_commits():
+        return ["# not in a git repository with commits", "all"]
+    if not DATABASE.exists():
+        return ["# no impact map recorded yet", "all"]
+
+    with sqlite3.connect(DATABASE) as connection:
+        [(commit,)] = connection.execute("SELECT value FROM meta WHERE key = 'commit'").fetchall()
+        if commit != git("rev-parse", ref).strip():
+            return [f"# impact map was recorded at {commit[:12]}, not at {ref}", "all"]
+
+        selected: set[str] = set()
+        try:
+            for path, hunks in sorted(changed_hunks(ref).items()):
+                file = Path(path)
+                if file.suffix in IGNORED_SUFFIXES or file.parts[0] in IGNORED_DIRECTORIES:
+                    continue
+                if file.parts[0] == "tests" and file.name.startswith("test_"):
+                    if file.exists():
+                        selected.add(file.as_posix())
+                    continue
+                selected |= affected_tests(connection, ref, path, hunks)
+        except UnattributableError as reason:
+            return [f"# {reason}", "all"]
+    return sorted(selected)
+
+
+def main() -> None:
+    """Parse the command line and run the subcommand."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser(
+        "record", help="build the impact map from coverage data files"
+    )
+    record_parser.add_argument("data_files", nargs="+")
+    select_parser = subparsers.add_parser(
+        "select", help="print the tests affected by changes since REF"
+    )
+    select_parser.add_argument("ref", nargs="?", default="HEAD")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.data_files)
+    else:
+        print("\n".join(select(args.ref)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())